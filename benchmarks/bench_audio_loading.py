@@ -0,0 +1,59 @@
+"""AudioService.load_audio_file on WAV and compressed recordings"""
+import shutil
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from conftest import ROOM_NOISE_DB, SAMPLE_RATE, peak_memory, record_rate, synthetic_speech
+
+DURATIONS = (60, 600)  # Seconds
+
+
+@pytest.fixture(scope='module')
+def audio_service():
+    from services.audio_service import AudioService
+    return AudioService()
+
+
+def _write_recording(path, seconds: float, sample_rate: int, subtype: str, file_format: str):
+    mono = synthetic_speech(seconds, SAMPLE_RATE, noise_db=ROOM_NOISE_DB)
+    # A typical device recording: 44.1 kHz stereo
+    resampled = np.interp(np.arange(int(seconds * sample_rate)) * SAMPLE_RATE / sample_rate,
+                          np.arange(len(mono)), mono).astype(np.float32)
+    sf.write(path, np.stack([resampled, resampled * 0.9], axis=1), sample_rate,
+             subtype=subtype, format=file_format)
+
+
+@pytest.fixture(scope='module', params=DURATIONS, ids=lambda seconds: f"{seconds}s")
+def wav_file(request, tmp_path_factory):
+    path = tmp_path_factory.mktemp('audio') / f"recording_{request.param}s.wav"
+    _write_recording(path, request.param, 44100, 'PCM_16', 'WAV')
+    return path, request.param
+
+
+@pytest.fixture(scope='module', params=DURATIONS, ids=lambda seconds: f"{seconds}s")
+def compressed_file(request, tmp_path_factory):
+    if shutil.which('ffmpeg') is None:
+        pytest.skip("ffmpeg is not installed")
+    path = tmp_path_factory.mktemp('audio') / f"recording_{request.param}s.flac"
+    _write_recording(path, request.param, 44100, 'PCM_16', 'FLAC')
+    return path, request.param
+
+
+def _bench_load(benchmark, audio_service, path, seconds):
+    audio = benchmark(audio_service.load_audio_file, str(path))
+    assert audio is not None and abs(len(audio) - seconds * SAMPLE_RATE) <= SAMPLE_RATE
+    benchmark.extra_info['audio_seconds'] = seconds
+    record_rate(benchmark, 'rtf', seconds)
+    benchmark.extra_info['peak_memory_bytes'] = peak_memory(audio_service.load_audio_file, str(path))
+
+
+def test_load_wav(benchmark, audio_service, wav_file):
+    path, seconds = wav_file
+    _bench_load(benchmark, audio_service, path, seconds)
+
+
+def test_load_compressed(benchmark, audio_service, compressed_file):
+    path, seconds = compressed_file
+    _bench_load(benchmark, audio_service, path, seconds)
@@ -0,0 +1,110 @@
+"""Redaction and re-identification of transcripts from 1k to 100k words.
+
+Analyzer results are generated alongside the synthetic transcript, so these
+measure the redaction code itself; Presidio is benchmarked separately when it
+is installed.
+"""
+import logging
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import peak_memory, record_rate
+
+WORD_COUNTS = (1000, 10000, 100000)
+PII_EVERY = 40  # Words between injected entities
+
+FILLER = ("the patient reports feeling tired most days and has trouble sleeping "
+          "since the last appointment with no change in appetite").split()
+ENTITIES = (
+    ("PERSON", "John Smith"), ("PERSON", "Maria Garcia"), ("PHONE_NUMBER", "555-0134"),
+    ("DATE_TIME", "March 3rd"), ("EMAIL_ADDRESS", "jsmith@example.com"), ("PERSON", "Dr. Patel"),
+)
+
+
+def synthetic_transcript(words: int):
+    """Transcript text plus analyzer-style results for the entities in it"""
+    parts = []
+    results = []
+    position = 0
+    for index in range(words):
+        if index % PII_EVERY == PII_EVERY - 1:
+            entity_type, surface = ENTITIES[(index // PII_EVERY) % len(ENTITIES)]
+            results.append(SimpleNamespace(start=position, end=position + len(surface),
+                                           entity_type=entity_type, score=0.85))
+            word = surface
+        else:
+            word = FILLER[index % len(FILLER)]
+        parts.append(word)
+        position += len(word) + 1
+    return " ".join(parts), results
+
+
+@pytest.fixture(scope='module', params=WORD_COUNTS, ids=lambda words: f"{words}w")
+def transcript(request):
+    text, results = synthetic_transcript(request.param)
+    return request.param, text, results
+
+
+def _record_per_word(benchmark, words):
+    benchmark.extra_info['words'] = words
+    record_rate(benchmark, 'ms_per_word', words, scale=1000)
+
+
+def test_redact(benchmark, transcript):
+    from services.redaction import redact
+    words, text, results = transcript
+    redaction = benchmark(redact, text, results)
+    assert "John Smith" not in redaction.text
+    _record_per_word(benchmark, words)
+    benchmark.extra_info['peak_memory_bytes'] = peak_memory(redact, text, results)
+
+
+def test_replace_pii_with_labels(benchmark, transcript):
+    """Re-identification of a generated note the size of the transcript"""
+    from services.llm_service import LLMService
+    from services.redaction import redact
+    words, text, results = transcript
+    redaction = redact(text, results)
+    # Only the logger and debug signal are used, so no service (or .env) is needed
+    service = SimpleNamespace(logger=logging.getLogger('bench'), debug_message=SimpleNamespace(emit=print))
+
+    restored = benchmark(LLMService.replace_pii_with_labels, service, redaction.text, [redaction.placeholders])
+    assert restored == text
+    _record_per_word(benchmark, words)
+    benchmark.extra_info['peak_memory_bytes'] = peak_memory(
+        LLMService.replace_pii_with_labels, service, redaction.text, [redaction.placeholders]
+    )
+
+
+def test_incremental_redaction(benchmark, transcript):
+    """Live redaction of the transcript in 30-word chunks with a regex analyzer"""
+    from services.redaction import IncrementalRedactor
+    words, text, _ = transcript
+    pattern = re.compile("|".join(re.escape(surface) for _, surface in ENTITIES))
+    analyze = lambda window: [SimpleNamespace(start=m.start(), end=m.end(), entity_type="PII", score=0.85)
+                              for m in pattern.finditer(window)]
+    tokens = text.split(" ")
+    chunks = [" ".join(tokens[start:start + 30]) for start in range(0, len(tokens), 30)]
+
+    def session():
+        redactor = IncrementalRedactor(analyze)
+        for chunk in chunks:
+            redactor.add(chunk)
+        return redactor.result_for(text)
+
+    redaction = benchmark.pedantic(session, rounds=3, iterations=1)
+    assert redaction is not None and "John Smith" not in redaction.text
+    _record_per_word(benchmark, words)
+
+
+@pytest.mark.parametrize('words', (1000, 10000), ids=lambda words: f"{words}w")
+def test_presidio_analyze(benchmark, words):
+    pytest.importorskip('presidio_analyzer')
+    from services.pii_analyzer import PIIAnalyzer
+    text, _ = synthetic_transcript(words)
+    analyzer = PIIAnalyzer.instance()
+    analyzer.engine()  # Construction is not part of the measurement
+    benchmark.pedantic(analyzer.analyze, args=(text,), rounds=3, iterations=1)
+    _record_per_word(benchmark, words)
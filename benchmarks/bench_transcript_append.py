@@ -0,0 +1,89 @@
+"""Per-append cost of live transcript updates in LLMPanel as the transcript grows.
+
+Compares the previous approach (read the whole text, concatenate, setText)
+with the cursor append LLMPanel uses now. Runs as part of the benchmark suite
+(`pytest benchmarks`) or standalone from the repository root:
+
+    python benchmarks/bench_transcript_append.py
+
+Exits non-zero if the cursor append at the largest size costs more than
+MAX_GROWTH times what it costs at the smallest.
+"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from PyQt6.QtWidgets import QApplication, QPushButton, QTextEdit
+
+from ui.components.llm_panel import LLMPanel
+
+WORDS_PER_CHUNK = 25
+SIZES = (1000, 5000, 10000, 20000)  # Words already in the transcript
+APPENDS = 20
+MAX_GROWTH = 4.0
+
+CHUNK = " ".join(["patient"] * WORDS_PER_CHUNK)
+
+
+def set_text_append(editor: QTextEdit, text: str):
+    """The original LLMPanel.append_input_text"""
+    current_text = editor.toPlainText()
+    editor.setText(f"{current_text} {text}".strip())
+
+
+def cursor_append(panel, text: str):
+    LLMPanel._append_to_input(panel, [text])
+
+
+def measure(app, append, words: int, separator: str) -> float:
+    """Mean seconds per append, including the re-layout it triggers.
+
+    `separator` joins the prefilled chunks the way each approach builds the
+    transcript: one growing paragraph for setText, one paragraph per batch for
+    the cursor append.
+    """
+    editor = QTextEdit()
+    editor.resize(800, 400)
+    editor.show()
+    panel = SimpleNamespace(input_text=editor, process_button=QPushButton(), llm_service=None)
+    editor.setPlainText(separator.join([CHUNK] * (words // WORDS_PER_CHUNK)))
+    app.processEvents()
+
+    started = time.perf_counter()
+    for _ in range(APPENDS):
+        append(panel, CHUNK)
+        app.processEvents()
+    elapsed = (time.perf_counter() - started) / APPENDS
+    editor.close()
+    return elapsed
+
+
+def test_cursor_append(benchmark, qapp):
+    """One append at each transcript size; the cost should not depend on the size"""
+    results = benchmark.pedantic(lambda: {words: measure(qapp, cursor_append, words, "\n") for words in SIZES},
+                                 rounds=1, iterations=1)
+    benchmark.extra_info['ms_per_append'] = {words: seconds * 1000 for words, seconds in results.items()}
+    assert results[SIZES[-1]] / results[SIZES[0]] <= MAX_GROWTH
+
+
+def main() -> int:
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    print(f"{'words':>8} {'setText ms':>12} {'cursor ms':>12}")
+    for words in SIZES:
+        legacy = measure(app, lambda panel, text: set_text_append(panel.input_text, text), words, " ")
+        cursor = measure(app, cursor_append, words, "\n")
+        results[words] = cursor
+        print(f"{words:>8} {legacy * 1000:>12.2f} {cursor * 1000:>12.2f}")
+
+    growth = results[SIZES[-1]] / results[SIZES[0]]
+    print(f"Cursor append cost grew {growth:.2f}x from {SIZES[0]} to {SIZES[-1]} words")
+    return 0 if growth <= MAX_GROWTH else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
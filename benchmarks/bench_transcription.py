@@ -0,0 +1,95 @@
+"""Buffering, segmentation and end-to-end chunking throughput of live transcription"""
+import time
+
+import numpy as np
+import pytest
+
+from conftest import ROOM_NOISE_DB, SAMPLE_RATE, peak_memory, record_rate, synthetic_speech
+
+CALLBACK_FRAMES = 4096  # AudioService.chunk_size
+SESSION_SECONDS = 300
+
+
+@pytest.fixture(scope='module')
+def session_audio():
+    return synthetic_speech(SESSION_SECONDS, seed=1, noise_db=ROOM_NOISE_DB)
+
+
+def _blocks(audio):
+    return [audio[start:start + CALLBACK_FRAMES] for start in range(0, len(audio), CALLBACK_FRAMES)]
+
+
+def _record_rtf(benchmark, seconds):
+    benchmark.extra_info['audio_seconds'] = seconds
+    record_rate(benchmark, 'rtf', seconds)
+
+
+def test_capture_buffer_round_trip(benchmark, session_audio):
+    """Callback-sized writes into the SPSC buffer, drained the way the capture thread reads"""
+    from utils.spsc_buffer import SPSCRingBuffer
+    blocks = _blocks(session_audio)
+    buffer = SPSCRingBuffer(SAMPLE_RATE * 30)
+
+    def round_trip():
+        for block in blocks:
+            buffer.write(block)
+            if buffer.available() >= SAMPLE_RATE:
+                buffer.read()
+        buffer.read()
+
+    benchmark(round_trip)
+    assert buffer.stats()['overruns'] == 0
+    _record_rtf(benchmark, SESSION_SECONDS)
+
+
+def test_speech_segmentation(benchmark, session_audio):
+    from services.vad import SpeechSegmenter
+    blocks = _blocks(session_audio)
+
+    def segment():
+        segmenter = SpeechSegmenter(sample_rate=SAMPLE_RATE)
+        segments = []
+        for block in blocks:
+            segments.extend(segmenter.process(block))
+        segments.extend(segmenter.flush())
+        return segments
+
+    segments = benchmark(segment)
+    assert segments
+    _record_rtf(benchmark, SESSION_SECONDS)
+    benchmark.extra_info['segments'] = len(segments)
+    benchmark.extra_info['peak_memory_bytes'] = peak_memory(segment)
+
+
+def test_live_session(benchmark, qapp, whisper_model, session_audio):
+    """A whole recording session, from capture buffer to final transcript, with the configured model"""
+    from services.transcription_service import TranscriptionService
+    from utils.spsc_buffer import SPSCRingBuffer
+
+    service = TranscriptionService(model_size=whisper_model)
+    service.attach_capture_buffer(SPSCRingBuffer(len(session_audio) + SAMPLE_RATE))
+    transcripts = []
+    service.transcription_complete.connect(transcripts.append)
+    blocks = _blocks(session_audio)
+
+    def session():
+        transcripts.clear()
+        service.start_processing()
+        for block in blocks:
+            service.capture_buffer.write(block)
+        service.stop_processing()
+        while not transcripts:
+            qapp.processEvents()
+            time.sleep(0.001)
+        return transcripts[0]
+
+    try:
+        transcript = benchmark.pedantic(session, rounds=3, iterations=1)
+    finally:
+        service.shutdown()
+    words = len(transcript.split())
+    assert words
+    _record_rtf(benchmark, SESSION_SECONDS)
+    benchmark.extra_info['model'] = whisper_model
+    benchmark.extra_info['words'] = words
+    record_rate(benchmark, 'ms_per_word', words, scale=1000)
@@ -0,0 +1,71 @@
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('LOG_CONSOLE_LEVEL', 'ERROR')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.synthetic_audio import synthetic_speech  # Shared with the tests
+
+SAMPLE_RATE = 16000
+ROOM_NOISE_DB = -60  # Floor under the benchmarks' synthetic speech
+
+
+def record_rate(benchmark, name: str, per: float, scale: float = 1.0):
+    """Store the mean time per unit (e.g. per second of audio) in extra_info.
+
+    Does nothing under --benchmark-disable, where each benchmark runs once as a
+    smoke test and there are no timings.
+    """
+    if benchmark.stats is None:
+        return
+    benchmark.extra_info[name] = benchmark.stats.stats.mean * scale / per
+
+
+def peak_memory(function, *args, **kwargs) -> int:
+    """Peak bytes allocated by one call, including numpy buffers"""
+    tracemalloc.start()
+    try:
+        function(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class StubWhisper:
+    """Stands in for a Whisper model: returns about 2.5 words per second of audio"""
+    WORDS_PER_SECOND = 2.5
+
+    def transcribe(self, audio, language=None, **kwargs):
+        words = max(1, int(len(audio) / SAMPLE_RATE * self.WORDS_PER_SECOND))
+        return {'text': " ".join(["word"] * words), 'segments': []}
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PyQt6.QtCore import QCoreApplication
+    from PyQt6.QtWidgets import QApplication
+    return QCoreApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def whisper_model(monkeypatch):
+    """Whisper for transcription benchmarks.
+
+    Uses a stub unless BENCH_WHISPER_MODEL names a real model size
+    (e.g. 'tiny'), which is then loaded through WhisperModelManager.
+    """
+    from services.model_manager import WhisperModelManager
+    size = os.getenv('BENCH_WHISPER_MODEL')
+    manager = WhisperModelManager.instance()
+    if size:
+        return size
+    stub = StubWhisper()
+    monkeypatch.setattr(manager, 'acquire', lambda model_size: stub)
+    monkeypatch.setattr(manager, 'release', lambda model_size: None)
+    monkeypatch.setattr(manager, 'get', lambda model_size: stub)
+    monkeypatch.setattr(manager, 'is_loaded', lambda model_size: True)
+    return 'stub'
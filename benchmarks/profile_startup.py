@@ -0,0 +1,95 @@
+"""Import-time profile and time-to-window check for application startup.
+
+Starts the main window the way main.py does, in a fresh interpreter with an
+offscreen Qt platform, and reports:
+
+- the slowest imports on the way to the first paint (python -X importtime);
+- the time from the first import to the window being shown;
+- whether any heavy stack was imported before the window appeared.
+
+Run from the repository root:
+
+    python benchmarks/profile_startup.py [--budget SECONDS] [--top N]
+
+Exits non-zero if the window takes longer than the budget or if a heavy
+module is loaded before it. tests/test_startup.py asserts the same in the
+test suite; this script is for finding out where the time goes.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Must not be imported before the window is shown
+HEAVY_MODULES = (
+    'numpy', 'torch', 'whisper', 'presidio_analyzer', 'spacy', 'openai',
+    'pyaudio', 'soundfile', 'docx', 'httpx', 'diskcache', 'tiktoken', 'dotenv', 'pydantic',
+)
+
+WINDOW_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from ui.main_window import MainWindow
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+app.processEvents()
+shown = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'shown': shown, 'heavy': heavy}}))
+"""
+
+
+def run_snippet(extra_args=()) -> subprocess.CompletedProcess:
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', PYTHONPATH=SRC_DIR, LOG_CONSOLE_LEVEL='ERROR')
+    return subprocess.run(
+        [sys.executable, *extra_args, '-c', WINDOW_SNIPPET.format(heavy=HEAVY_MODULES)],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def import_profile(top: int) -> list:
+    """(cumulative seconds, module) of the slowest top-level imports"""
+    stderr = run_snippet(('-X', 'importtime')).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Only top-level entries; nested imports are indented under their parent
+        if not name.startswith('  '):
+            entries.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(entries, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=float, default=float(os.getenv('STARTUP_BUDGET_S', 2.0)),
+                        help="Maximum seconds from the first import to a shown window")
+    parser.add_argument('--top', type=int, default=15, help="Number of imports to list")
+    args = parser.parse_args()
+
+    print("Slowest imports before the window is shown:")
+    for seconds, name in import_profile(args.top):
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    # Measured without -X importtime, whose bookkeeping slows imports down
+    result = json.loads(run_snippet().stdout.strip().splitlines()[-1])
+    print(f"Time to window: {result['shown']:.3f}s (budget {args.budget:.3f}s)")
+
+    failed = False
+    if result['heavy']:
+        print(f"FAIL: heavy modules imported before the window: {', '.join(result['heavy'])}")
+        failed = True
+    if result['shown'] > args.budget:
+        print("FAIL: window took longer than the budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
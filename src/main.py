@@ -1,7 +1,10 @@
+import multiprocessing
 import sys
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from ui.main_window import MainWindow
 from utils.config import setup_logger
+from utils.metrics import start_exporters
 
 def main():
 
@@ -21,6 +24,11 @@ def main():
         # Create and show main window
         main_window = MainWindow()
         main_window.show()
+
+        # Only Qt is loaded so far. Services, Whisper/torch, Presidio and the
+        # LLM client load in the background once the window has been painted
+        QTimer.singleShot(0, main_window.start_preloading)
+        start_exporters()
         
         # Start the event loop
         return app.exec()
@@ -38,4 +46,6 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # Required for the spawned transcription processes in the frozen app
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,415 @@
+"""Headless HTTP service: transcribe, redact and generate notes for several workstations.
+
+    python src/server.py --template path/to/template.docx
+
+POST audio to /jobs (raw body, or multipart with an `audio` field) and poll
+/jobs/{id}; the transcript, redacted text and note are served as plain text
+from /jobs/{id}/transcript, /jobs/{id}/redacted and /jobs/{id}/note once ready.
+Pass `?note=0` to stop after redaction. One Whisper model and one Presidio
+engine are shared by every request; at most SERVER_CONCURRENCY jobs run at a
+time and the rest wait their turn. Binds to localhost unless SERVER_HOST says
+otherwise: responses contain patient data.
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from aiohttp import web
+from utils import metrics
+from utils.config import (
+    setup_logger,
+    NOTE_TEMPLATE_PATH,
+    SERVER_CONCURRENCY,
+    SERVER_HOST,
+    SERVER_JOB_TTL,
+    SERVER_MAX_QUEUED,
+    SERVER_PORT,
+    WHISPER_MODEL_SIZE,
+)
+
+SAMPLE_RATE = 16000
+UPLOAD_CHUNK_BYTES = 256 * 1024
+MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
+PRUNE_INTERVAL = 60  # Seconds between sweeps for expired jobs
+PRUNE_TASK = web.AppKey('prune_task', asyncio.Task)
+
+JOBS_TOTAL = metrics.counter('server_jobs_total', "Jobs accepted by the HTTP service")
+JOB_FAILURES = metrics.counter('server_job_failures_total', "Jobs that failed")
+JOBS_IN_FLIGHT = metrics.gauge('server_jobs_in_flight', "Jobs accepted and not yet finished")
+JOB_SECONDS = metrics.histogram('server_job_seconds', "Upload to finished job, queueing included")
+
+logger = setup_logger(__name__)
+
+
+async def _field_chunks(field):
+    while True:
+        chunk = await field.read_chunk(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+class ServerJob:
+    """One uploaded recording moving through the pipeline"""
+    QUEUED = "queued"
+    DECODING = "decoding"
+    TRANSCRIBING = "transcribing"
+    REDACTING = "redacting"
+    GENERATING = "generating"
+    DONE = "done"
+    FAILED = "failed"
+
+    _ids = itertools.count(1)
+
+    def __init__(self, audio_path: str, with_note: bool):
+        self.job_id = str(next(self._ids))
+        self.audio_path = audio_path
+        self.with_note = with_note
+        self.status = self.QUEUED
+        self.created_at = time.time()
+        self.finished_at = None
+        self.stage_seconds = {}
+        self.audio_seconds = None
+        self.transcript = None
+        self.redacted = None
+        self.note = None
+        self.error = None
+        self.task = None
+        self.cancelled = threading.Event()  # Set on delete; checked by the worker threads
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED)
+
+    def to_dict(self) -> dict:
+        # Status only; the texts carry patient data and have their own endpoints
+        return {
+            'id': self.job_id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'audio_seconds': self.audio_seconds,
+            'stage_seconds': self.stage_seconds,
+            'error': self.error,
+            'transcript': self.transcript is not None,
+            'redacted': self.redacted is not None,
+            'note': self.note is not None,
+        }
+
+
+class PipelineServer:
+    """Runs jobs through the shared services on a bounded thread pool.
+
+    `transcription` and `notes` default to a TranscriptionService and an
+    LLMService created at startup; anything with the same blocking methods
+    can be passed in instead.
+    """
+
+    def __init__(self, template_path: str = NOTE_TEMPLATE_PATH, concurrency: int = SERVER_CONCURRENCY,
+                 max_queued: int = SERVER_MAX_QUEUED, job_ttl: float = SERVER_JOB_TTL,
+                 transcription=None, notes=None):
+        self.template_path = template_path
+        self.concurrency = max(1, concurrency)
+        self.max_queued = max_queued
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        self.upload_dir = tempfile.mkdtemp(prefix="medicalapp-uploads-")
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="pipeline")
+        self.slots = None  # asyncio.Semaphore, created on the server's event loop
+
+        self.transcription = transcription
+        self.notes = notes
+        self.notes_error = None
+        self.template = None
+
+    # Lifecycle
+
+    async def start(self, app):
+        self.slots = asyncio.Semaphore(self.concurrency)
+        # The heavy models load in the background; the first jobs wait for them
+        if self.transcription is None:
+            from services.model_manager import WhisperModelManager
+            from services.transcription_service import TranscriptionService
+            WhisperModelManager.instance().preload(WHISPER_MODEL_SIZE)
+            self.transcription = TranscriptionService()
+
+        try:
+            from services.note_template import load_template
+            if self.notes is None:
+                from services.llm_service import LLMService
+                from services.pii_analyzer import PIIAnalyzer
+                PIIAnalyzer.instance().preload()
+                self.notes = LLMService()
+            if self.template_path:
+                self.template = load_template(self.template_path)
+        except Exception as e:
+            # Transcripts are still served; redaction and notes report the error
+            self.notes_error = str(e)
+            logger.error("Note generation unavailable: %s", e)
+
+        app[PRUNE_TASK] = asyncio.create_task(self._prune_periodically())
+
+    async def stop(self, app):
+        app[PRUNE_TASK].cancel()
+        tasks = [job.task for job in self.jobs.values() if job.task is not None]
+        for job in list(self.jobs.values()):
+            self._discard(job)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        # Stages already running finish their current call; each upload goes when its task ends
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.notes is not None:
+            self.notes.note_cache.close()
+            self.notes.backend.close()
+
+    # Jobs
+
+    def submit(self, audio_path: str, with_note: bool) -> ServerJob:
+        job = ServerJob(audio_path, with_note)
+        self.jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job))
+        # Only once the task is over can no worker thread still be reading the upload
+        job.task.add_done_callback(lambda task: self._remove_upload(job))
+        JOBS_TOTAL.inc()
+        JOBS_IN_FLIGHT.set(self.unfinished())
+        return job
+
+    def unfinished(self) -> int:
+        return sum(1 for job in self.jobs.values() if not job.finished)
+
+    def delete(self, job: ServerJob):
+        self._discard(job)
+        self.jobs.pop(job.job_id, None)
+
+    async def _run(self, job: ServerJob):
+        try:
+            async with self.slots:
+                job.status = ServerJob.DECODING
+                audio_data = await self._stage(job, 'decode', self._decode, job.audio_path)
+                job.audio_seconds = len(audio_data) / SAMPLE_RATE
+
+                job.status = ServerJob.TRANSCRIBING
+                job.transcript = await self._stage(job, 'transcribe', self._transcribe, audio_data, job.cancelled.is_set)
+                del audio_data
+
+                if self.notes is None:
+                    raise RuntimeError(f"Redaction and note generation are unavailable: {self.notes_error}")
+                job.status = ServerJob.REDACTING
+                redaction = await self._stage(job, 'redact', self.notes.redact_transcript, job.transcript)
+                job.redacted = redaction.text
+
+                if job.with_note:
+                    if self.template is None:
+                        raise RuntimeError("No note template configured (NOTE_TEMPLATE_PATH or --template)")
+                    job.status = ServerJob.GENERATING
+                    job.note = await self._stage(
+                        job, 'note', self._generate_note, job.transcript, redaction, job.cancelled.is_set
+                    )
+            job.status = ServerJob.DONE
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            JOB_FAILURES.inc()
+            job.error = str(e)
+            job.status = ServerJob.FAILED
+            logger.error("Job %s failed: %s", job.job_id, e)
+        finally:
+            job.finished_at = time.time()
+            JOB_SECONDS.observe(job.finished_at - job.created_at)
+            JOBS_IN_FLIGHT.set(self.unfinished())
+
+    async def _stage(self, job: ServerJob, name: str, func, *args):
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self._in_worker, job, func, *args)
+        try:
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # A running thread cannot be interrupted: tell it to stop and wait
+            # for it, so the job only ends once nothing uses its upload
+            job.cancelled.set()
+            await asyncio.wait([future])
+            raise
+        job.stage_seconds[name] = time.perf_counter() - started
+        logger.info("Job %s: %s took %.2fs", job.job_id, name, job.stage_seconds[name])
+        return result
+
+    def _decode(self, audio_path: str):
+        from services.audio_decoder import load_audio
+        return load_audio(
+            audio_path,
+            os.getenv('FFMPEG_BINARY', 'ffmpeg'),
+            sample_rate=SAMPLE_RATE,
+            ffprobe_path=os.getenv('FFPROBE_BINARY', 'ffprobe'),
+        )
+
+    @staticmethod
+    def _in_worker(job: ServerJob, func, *args):
+        # A stage still queued for a thread when its job is deleted never starts
+        if job.cancelled.is_set():
+            raise RuntimeError("Job cancelled")
+        return func(*args)
+
+    def _transcribe(self, audio_data, should_stop):
+        # Every job shares the preloaded model; a process pool per long upload
+        # would load up to concurrency x TRANSCRIBE_WORKERS models at once
+        return self.transcription.transcribe(audio_data, parallel=False, should_stop=should_stop)
+
+    def _generate_note(self, transcript: str, redaction, should_stop):
+        return self.notes.generate_note(transcript, should_stop=should_stop, template=self.template,
+                                        redaction=redaction)
+
+    def _discard(self, job: ServerJob):
+        job.cancelled.set()
+        if job.task is not None and not job.task.done():
+            job.task.cancel()  # The upload is removed when the task ends
+        else:
+            self._remove_upload(job)
+
+    def _remove_upload(self, job: ServerJob):
+        if job.audio_path is None:
+            return
+        try:
+            os.remove(job.audio_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # E.g. still open elsewhere on Windows; the upload directory is temporary anyway
+            logger.warning("Could not remove upload of job %s: %s", job.job_id, e)
+        job.audio_path = None
+
+    def prune_expired(self) -> int:
+        """Drop finished jobs older than the TTL; returns how many were removed"""
+        cutoff = time.time() - self.job_ttl
+        expired = [job for job in self.jobs.values() if job.finished and job.finished_at <= cutoff]
+        for job in expired:
+            self.delete(job)
+        return len(expired)
+
+    async def _prune_periodically(self):
+        while True:
+            await asyncio.sleep(PRUNE_INTERVAL)
+            self.prune_expired()
+
+    # HTTP handlers
+
+    async def handle_upload(self, request: web.Request) -> web.Response:
+        if self.unfinished() >= self.max_queued:
+            raise web.HTTPServiceUnavailable(
+                text="Too many jobs queued, retry later", headers={'Retry-After': '30'}
+            )
+
+        if request.content_type.startswith('multipart/'):
+            reader = await request.multipart()
+            field = await reader.next()
+            while field is not None and field.name != 'audio':
+                field = await reader.next()
+            if field is None:
+                raise web.HTTPBadRequest(text="Multipart upload needs an 'audio' field")
+            suffix = os.path.splitext(field.filename or "")[1]
+            audio_path = await self._save_upload(suffix, _field_chunks(field))
+        else:
+            suffix = os.path.splitext(request.query.get('filename', ""))[1]
+            audio_path = await self._save_upload(suffix, request.content.iter_chunked(UPLOAD_CHUNK_BYTES))
+
+        with_note = request.query.get('note', '1') not in ('0', 'false', 'no')
+        job = self.submit(audio_path, with_note)
+        return web.json_response(job.to_dict(), status=202, headers={'Location': f"/jobs/{job.job_id}"})
+
+    async def _save_upload(self, suffix: str, chunks) -> str:
+        fd, audio_path = tempfile.mkstemp(suffix=suffix.lower(), dir=self.upload_dir)
+        loop = asyncio.get_running_loop()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > MAX_UPLOAD_BYTES:
+                        raise web.HTTPRequestEntityTooLarge(max_size=MAX_UPLOAD_BYTES, actual_size=size)
+                    # Disk writes go to the default executor, not the pipeline's threads
+                    await loop.run_in_executor(None, f.write, chunk)
+            if size == 0:
+                raise web.HTTPBadRequest(text="Empty upload")
+        except BaseException:
+            os.remove(audio_path)
+            raise
+        return audio_path
+
+    def _job(self, request: web.Request) -> ServerJob:
+        job = self.jobs.get(request.match_info['job_id'])
+        if job is None:
+            raise web.HTTPNotFound(text="Unknown job")
+        return job
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self._job(request).to_dict())
+
+    async def handle_delete(self, request: web.Request) -> web.Response:
+        self.delete(self._job(request))
+        return web.Response(status=204)
+
+    def text_handler(self, attribute: str):
+        async def handler(request: web.Request) -> web.Response:
+            job = self._job(request)
+            text = getattr(job, attribute)
+            if text is None:
+                # Not produced yet, skipped, or the job failed before reaching it
+                return web.json_response({'status': job.status, 'error': job.error}, status=409)
+            return web.Response(text=text)
+        return handler
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        from services.model_manager import WhisperModelManager
+        from services.pii_analyzer import PIIAnalyzer
+        return web.json_response({
+            'whisper_ready': WhisperModelManager.instance().is_loaded(WHISPER_MODEL_SIZE),
+            'pii_analyzer_ready': PIIAnalyzer.instance().is_ready(),
+            'notes_available': self.notes is not None,
+            'notes_error': self.notes_error,
+            'template': self.template is not None,
+            'jobs_unfinished': self.unfinished(),
+            'concurrency': self.concurrency,
+        })
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.REGISTRY.prometheus_text())
+
+
+def create_app(server: PipelineServer) -> web.Application:
+    app = web.Application()
+    app.on_startup.append(server.start)
+    app.on_cleanup.append(server.stop)
+    app.add_routes([
+        web.post('/jobs', server.handle_upload),
+        web.get('/jobs/{job_id}', server.handle_status),
+        web.delete('/jobs/{job_id}', server.handle_delete),
+        web.get('/jobs/{job_id}/transcript', server.text_handler('transcript')),
+        web.get('/jobs/{job_id}/redacted', server.text_handler('redacted')),
+        web.get('/jobs/{job_id}/note', server.text_handler('note')),
+        web.get('/health', server.handle_health),
+        web.get('/metrics', server.handle_metrics),
+    ])
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless transcription, redaction and note service")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--template', default=NOTE_TEMPLATE_PATH, help="Note template (.docx)")
+    args = parser.parse_args()
+
+    logger.info("Pipeline server starting on %s:%d", args.host, args.port)
+    web.run_app(create_app(PipelineServer(template_path=args.template)),
+                host=args.host, port=args.port, print=None)
+    return 0
+
+
+if __name__ == "__main__":
+    # Required for the spawned transcription processes in the frozen app
+    multiprocessing.freeze_support()
+    sys.exit(main())
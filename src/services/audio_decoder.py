@@ -0,0 +1,384 @@
+import math
+import mmap
+import os
+import struct
+import subprocess
+import tempfile
+import numpy as np
+
+# Keep ffmpeg from flashing a console window in the bundled Windows app
+_CREATION_FLAGS = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+_STDERR_TAIL_BYTES = 4096  # How much of ffmpeg's diagnostics an error message quotes
+
+
+def _ffmpeg_command(ffmpeg_path: str, file_path: str, sample_rate: int) -> list:
+    # Decode, downmix and resample inside ffmpeg; emit raw little-endian float32 on stdout
+    return [
+        ffmpeg_path, '-nostdin', '-hide_banner', '-nostats', '-loglevel', 'error',
+        '-i', file_path,
+        '-f', 'f32le', '-acodec', 'pcm_f32le',
+        '-ac', '1', '-ar', str(sample_rate),
+        'pipe:1',
+    ]
+
+
+def _spawn_ffmpeg(ffmpeg_path: str, file_path: str, sample_rate: int):
+    """Start ffmpeg with stdout piped and stderr captured in a temporary file.
+
+    A piped stderr that nobody reads fills up on a file with many decode
+    errors, and ffmpeg then blocks while we wait on stdout.
+    """
+    stderr = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(
+            _ffmpeg_command(ffmpeg_path, file_path, sample_rate),
+            stdout=subprocess.PIPE, stderr=stderr, creationflags=_CREATION_FLAGS,
+        )
+    except BaseException:
+        stderr.close()
+        raise
+    return process, stderr
+
+
+def probe_duration(file_path: str, ffprobe_path: str):
+    """Return the container duration in seconds, or None if ffprobe cannot tell"""
+    try:
+        output = subprocess.run(
+            [ffprobe_path, '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', file_path],
+            capture_output=True, text=True, check=True, creationflags=_CREATION_FLAGS,
+        ).stdout.strip()
+        return float(output)
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+
+
+def iter_ffmpeg_blocks(file_path: str, ffmpeg_path: str, sample_rate: int = 16000, block_seconds: float = 10):
+    """Yield the decoded 16 kHz mono float32 audio in blocks of `block_seconds`.
+
+    Each block is a fresh array, so callers may keep it.
+    """
+    block_bytes = int(sample_rate * block_seconds) * 4
+    process, stderr = _spawn_ffmpeg(ffmpeg_path, file_path, sample_rate)
+    completed = False
+    try:
+        while True:
+            block = bytearray(block_bytes)
+            view = memoryview(block)
+            filled = 0
+            while filled < block_bytes:
+                read = process.stdout.readinto(view[filled:])
+                if not read:
+                    break
+                filled += read
+            usable = filled - filled % 4
+            if usable:
+                yield np.frombuffer(block, dtype=np.float32, count=usable // 4)
+            if filled < block_bytes:
+                break
+        completed = True
+    finally:
+        # A consumer that stops early leaves ffmpeg blocked on a full pipe; kill it
+        _finish(process, stderr, completed)
+
+
+def decode_with_ffmpeg(file_path: str, ffmpeg_path: str, sample_rate: int = 16000, ffprobe_path: str = None) -> np.ndarray:
+    """Decode any ffmpeg-readable file straight into a float32 array at `sample_rate`.
+
+    The output array is preallocated from the probed duration and filled in place
+    from ffmpeg's stdout, so there is no intermediate WAV file or Python-level copy.
+    """
+    duration = probe_duration(file_path, ffprobe_path) if ffprobe_path else None
+    # One second of slack absorbs rounding in the container duration
+    capacity = int(((duration or 60) + 1) * sample_rate)
+    audio_data = np.empty(capacity, dtype=np.float32)
+
+    process, stderr = _spawn_ffmpeg(ffmpeg_path, file_path, sample_rate)
+    completed = False
+    try:
+        filled = 0  # Bytes written into audio_data
+        while True:
+            view = memoryview(audio_data).cast('B')
+            if filled == len(view):
+                # Duration unknown or underestimated: grow geometrically
+                grown = np.empty(len(audio_data) * 2, dtype=np.float32)
+                grown[:len(audio_data)] = audio_data
+                audio_data = grown
+                continue
+            read = process.stdout.readinto(view[filled:])
+            if not read:
+                break
+            filled += read
+        completed = True
+    finally:
+        _finish(process, stderr, completed)
+
+    n_samples = filled // 4
+    if n_samples < len(audio_data) * 3 // 4:
+        # Release the unused tail after an overestimate or a doubling
+        return audio_data[:n_samples].copy()
+    return audio_data[:n_samples]
+
+
+def _finish(process: subprocess.Popen, stderr, completed: bool):
+    if not completed:
+        process.kill()
+    process.stdout.close()
+    returncode = process.wait()
+    with stderr:
+        stderr.seek(max(0, stderr.seek(0, os.SEEK_END) - _STDERR_TAIL_BYTES))
+        message = stderr.read().decode(errors='replace').strip()
+    if completed and returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({returncode}): {message or 'no output'}")
+
+
+class WavInfo:
+    """Layout of the PCM payload of a WAV file"""
+    def __init__(self, format_tag, channels, sample_rate, bits_per_sample, data_offset, data_size):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits_per_sample = bits_per_sample
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.bits_per_sample // 8
+
+    @property
+    def n_frames(self) -> int:
+        return self.data_size // self.frame_bytes
+
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def read_wav_info(file_path: str) -> WavInfo:
+    """Parse the RIFF chunks of a WAV file up to the start of its data chunk.
+
+    A data chunk whose declared size is zero or runs past the end of the file
+    (e.g. a recording that was never closed) is taken to extend to end of file.
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError("Not a RIFF/WAVE file")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("WAV file has no data chunk")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+
+            if chunk_id == b'fmt ':
+                body = f.read(chunk_size)
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', body[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    # The real format is the first two bytes of the sub-format GUID
+                    format_tag = struct.unpack('<H', body[24:26])[0]
+                fmt = (format_tag, channels, sample_rate, bits)
+                if chunk_size & 1:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError("WAV data chunk precedes its fmt chunk")
+                offset = f.tell()
+                remaining = file_size - offset
+                if chunk_size == 0 or chunk_size > remaining:
+                    chunk_size = remaining
+                return WavInfo(*fmt, data_offset=offset, data_size=chunk_size)
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def _frame_view(buffer, info: WavInfo) -> np.ndarray:
+    """View the data chunk as (frames, channels) samples without copying"""
+    bits = info.bits_per_sample
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        dtype = np.dtype('<f4') if bits == 32 else np.dtype('<f8')
+    elif info.format_tag == WAVE_FORMAT_PCM and bits in (8, 16, 24, 32):
+        dtype = {8: np.dtype('u1'), 16: np.dtype('<i2'), 24: np.dtype('u1'), 32: np.dtype('<i4')}[bits]
+    else:
+        raise ValueError(f"Unsupported WAV encoding (format {info.format_tag}, {bits} bits)")
+
+    n_frames = info.n_frames
+    shape = (n_frames, info.channels, 3) if bits == 24 else (n_frames, info.channels)
+    return np.ndarray(shape, dtype=dtype, buffer=buffer, offset=info.data_offset)
+
+
+def _to_mono_float(frames: np.ndarray, info: WavInfo) -> np.ndarray:
+    """Convert a block of raw frames to a new mono float32 array in [-1, 1]"""
+    bits = info.bits_per_sample
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        samples = frames.astype(np.float32)
+        np.nan_to_num(samples, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    elif bits == 8:
+        samples = frames.astype(np.float32)
+        samples -= 128.0
+        samples /= 128.0
+    elif bits == 24:
+        packed = (frames[..., 0].astype(np.int32)
+                  | (frames[..., 1].astype(np.int32) << 8)
+                  | (frames[..., 2].astype(np.int32) << 16))
+        packed = (packed << 8) >> 8  # Sign-extend from 24 bits
+        samples = packed.astype(np.float32)
+        samples /= float(1 << 23)
+    else:
+        samples = frames.astype(np.float32)
+        samples /= float(1 << (bits - 1))
+
+    if info.channels == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1, dtype=np.float32)
+
+
+def _release_pages(mm, info: WavInfo, start_frame: int, stop_frame: int):
+    """Drop mapped pages of a processed block so they do not count towards RSS"""
+    if not hasattr(mmap, 'MADV_DONTNEED'):
+        return
+    start = info.data_offset + start_frame * info.frame_bytes
+    stop = info.data_offset + stop_frame * info.frame_bytes
+    start -= start % mmap.PAGESIZE
+    try:
+        mm.madvise(mmap.MADV_DONTNEED, start, stop - start)
+    except (OSError, ValueError):
+        pass
+
+
+def _lowpass_taps(cutoff: float, transition: float) -> np.ndarray:
+    """Blackman-windowed sinc low-pass; frequencies are fractions of the sample rate"""
+    count = int(math.ceil(5.5 / transition)) | 1  # Odd, so the filter has zero delay
+    n = np.arange(count) - count // 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(count)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+class _FIRFilter:
+    """Zero-phase FIR filtering ('same' length) by FFT overlap-add in fixed-size pieces"""
+    FFT_SIZE = 1 << 16
+
+    def __init__(self, taps: np.ndarray):
+        self.taps = len(taps)
+        self.step = self.FFT_SIZE - self.taps + 1
+        self.kernel = np.fft.rfft(taps, self.FFT_SIZE)
+
+    def __call__(self, samples: np.ndarray) -> np.ndarray:
+        out = np.zeros(len(samples) + self.taps - 1, dtype=np.float32)
+        for position in range(0, len(samples), self.step):
+            piece = samples[position:position + self.step]
+            length = len(piece) + self.taps - 1
+            out[position:position + length] += np.fft.irfft(
+                np.fft.rfft(piece, self.FFT_SIZE) * self.kernel, self.FFT_SIZE
+            )[:length]
+        delay = self.taps // 2
+        return out[delay:delay + len(samples)]
+
+
+def load_wav(file_path: str, sample_rate: int = 16000, block_seconds: float = 30) -> np.ndarray:
+    """Load a WAV file as DC-free, peak-limited mono float32 at `sample_rate`.
+
+    The PCM data is memory-mapped and processed in blocks of `block_seconds`:
+    a first pass measures the DC offset and range, a second pass downmixes,
+    removes the offset, scales and resamples each block straight into the
+    preallocated output. Downsampling low-passes each block below the new
+    Nyquist frequency before interpolating, so content above it cannot alias
+    into the speech band; blocks overlap by the filter length, so the edges
+    match a whole-file filter. Peak memory is the output array plus one block
+    of temporaries.
+    """
+    info = read_wav_info(file_path)
+    n_in = info.n_frames
+    if n_in == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    block = max(1, int(info.sample_rate * block_seconds))
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        frames = _frame_view(mm, info)
+        try:
+            # Pass 1: DC offset and range of the mono signal
+            total = 0.0
+            low = math.inf
+            high = -math.inf
+            for start in range(0, n_in, block):
+                mono = _to_mono_float(frames[start:start + block], info)
+                total += float(mono.sum(dtype=np.float64))
+                low = min(low, float(mono.min()))
+                high = max(high, float(mono.max()))
+                _release_pages(mm, info, start, start + len(mono))
+            mean = total / n_in
+            peak = max(high - mean, mean - low)
+            scale = 1.0 / peak if peak > 1.0 else 1.0
+
+            # Pass 2: downmix, resample and normalize into the output
+            ratio = info.sample_rate / sample_rate
+            if info.sample_rate == sample_rate:
+                n_out = n_in
+            else:
+                n_out = int((n_in - 1) / ratio) + 1
+            audio_data = np.empty(n_out, dtype=np.float32)
+
+            lowpass = None
+            context = 0
+            if info.sample_rate > sample_rate:
+                # Pass band to 90% of the output Nyquist, stop band from the Nyquist itself
+                nyquist = 0.5 * sample_rate / info.sample_rate
+                taps = _lowpass_taps(0.95 * nyquist, 0.1 * nyquist)
+                lowpass = _FIRFilter(taps)
+                context = len(taps) // 2
+
+            for start in range(0, n_in, block):
+                stop = min(start + block, n_in)
+                # Filter context on both sides, plus one frame for interpolation across the edge
+                lead = min(start, context)
+                mono = _to_mono_float(frames[start - lead:min(stop + 1 + context, n_in)], info)
+                mono -= mean
+                mono *= scale
+                if info.sample_rate == sample_rate:
+                    audio_data[start:stop] = mono[:stop - start]
+                else:
+                    if lowpass is not None:
+                        mono = lowpass(mono)
+                    first = -(-start * sample_rate // info.sample_rate)
+                    last = min(-(-stop * sample_rate // info.sample_rate), n_out)
+                    positions = np.arange(first, last) * ratio - (start - lead)
+                    audio_data[first:last] = np.interp(positions, np.arange(len(mono)), mono)
+                _release_pages(mm, info, max(0, start - lead), stop)
+        finally:
+            # Views into the mapping must be gone before it is closed
+            del frames
+
+    if info.sample_rate > sample_rate:
+        # Filter ripple can overshoot the peak measured before filtering
+        peak = max(float(audio_data.max()), -float(audio_data.min()))
+        if peak > 1.0:
+            audio_data /= peak
+    return audio_data
+
+
+def normalize_inplace(audio_data: np.ndarray) -> np.ndarray:
+    """Remove DC offset and limit the peak to 1.0 without allocating a new array"""
+    if len(audio_data) == 0:
+        return audio_data
+    np.nan_to_num(audio_data, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    audio_data -= audio_data.mean(dtype=np.float64)
+    peak = max(float(audio_data.max()), -float(audio_data.min()))
+    if peak > 1.0:
+        audio_data /= peak
+    return audio_data
+
+
+def load_audio(file_path: str, ffmpeg_path: str = 'ffmpeg', sample_rate: int = 16000,
+               ffprobe_path: str = None) -> np.ndarray:
+    """Load any audio file as normalized mono float32: PCM WAV directly, everything else through ffmpeg"""
+    if os.path.splitext(file_path)[1].lower() == '.wav':
+        try:
+            return load_wav(file_path, sample_rate=sample_rate)
+        except ValueError:
+            pass  # Compressed or unusual WAV encodings go through ffmpeg
+    return normalize_inplace(decode_with_ffmpeg(file_path, ffmpeg_path, sample_rate=sample_rate,
+                                                ffprobe_path=ffprobe_path))
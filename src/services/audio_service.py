@@ -5,17 +5,27 @@ import pyaudio
 import numpy as np
 from pathlib import Path
 from datetime import datetime
-from pydub import AudioSegment
-import wave
-from utils.config import setup_logger
+from services.audio_decoder import decode_with_ffmpeg, load_wav, normalize_inplace
+from services.recording_writer import RecordingWriter
+from utils import metrics
+from utils.config import setup_logger, RECORDING_FORMAT
+from utils.spsc_buffer import SPSCRingBuffer
 import platform
+import time
+
+RECORDED_SECONDS = metrics.counter('audio_recorded_seconds_total', "Seconds of audio captured from the microphone")
+CAPTURE_DROPPED = metrics.counter('audio_capture_dropped_seconds_total', "Captured audio dropped because transcription fell behind")
+CAPTURE_PEAK_BACKLOG = metrics.gauge('audio_capture_peak_backlog_seconds', "Largest capture backlog of the last recording")
+DECODE = metrics.histogram('audio_decode_seconds', "Time to load and decode an audio file")
+DECODED_SECONDS = metrics.counter('audio_decoded_seconds_total', "Seconds of audio decoded from files")
 
 class AudioService(QObject):
-    audio_data_ready = pyqtSignal(np.ndarray)
     recording_saved = pyqtSignal(str)
     file_loaded = pyqtSignal(np.ndarray)
     error_occurred = pyqtSignal(str)
 
+    CAPTURE_BUFFER_SECONDS = 30  # Backlog the transcription side may fall behind by
+
     def __init__(self):
         super().__init__()
 
@@ -76,7 +86,9 @@ class AudioService(QObject):
         # PyAudio setup
         self.audio = pyaudio.PyAudio()
         self.stream = None
-        self.frames = []
+        self.writer = None  # Streams the current recording to disk
+        # Live samples for transcription, handed over without the Qt event loop
+        self.capture_buffer = SPSCRingBuffer(self.sample_rate * self.CAPTURE_BUFFER_SECONDS)
         
         # Create recordings directory
         self.recordings_dir = os.path.join(os.path.expanduser('~/Documents'), 'medicalapp', 'recordings')
@@ -85,8 +97,13 @@ class AudioService(QObject):
     def start_recording(self):
         if not self.recording:
             try:
+                # Frames go to disk as they arrive instead of accumulating in memory
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = os.path.join(self.recordings_dir, f"recording_{timestamp}.{RECORDING_FORMAT}")
+                self.writer = RecordingWriter(filename, self.sample_rate, self.channels)
+                self.writer.start()
+                self.capture_buffer.reset_stats()
                 self.recording = True
-                self.frames = []
                 
                 self.stream = self.audio.open(
                     format=self.audio_format,
@@ -100,6 +117,12 @@ class AudioService(QObject):
             except Exception as e:
                 self.error_occurred.emit(f"Failed to start recording: {str(e)}")
                 self.recording = False
+                if self.writer is not None:
+                    writer, self.writer = self.writer, None
+                    try:
+                        writer.close()
+                    except Exception as close_error:
+                        self.logger.error(f"Error closing recording: {close_error}")
 
     def stop_recording(self):
         if self.recording:
@@ -108,24 +131,27 @@ class AudioService(QObject):
                 self.stream.stop_stream()
                 self.stream.close()
             
-            # Save the recording
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(self.recordings_dir, f"recording_{timestamp}.wav")
-            
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.audio.get_sample_size(self.audio_format))
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(b''.join(self.frames))
+            # Only the last few buffers are still queued; closing finalizes the header
+            writer, self.writer = self.writer, None
+            try:
+                writer.close()
+            except Exception as e:
+                self.error_occurred.emit(f"Failed to save recording: {str(e)}")
+                return None
             
-            self.recording_saved.emit(str(filename))
-            return str(filename)
+            # Counted here rather than in the callback, which must stay lock-free
+            RECORDED_SECONDS.inc(writer.frames_written / self.sample_rate)
+            CAPTURE_DROPPED.inc(self.capture_buffer.overruns / self.sample_rate)
+            CAPTURE_PEAK_BACKLOG.set(self.capture_buffer.peak_fill / self.sample_rate)
+
+            self.recording_saved.emit(str(writer.file_path))
+            return str(writer.file_path)
 
     def audio_callback(self, in_data, frame_count, time_info, status):
+        # Runs on PortAudio's real-time thread: no locks, no Qt signals
         if self.recording:
-            self.frames.append(in_data)
-            audio_data = np.frombuffer(in_data, dtype=np.float32)
-            self.audio_data_ready.emit(audio_data)
+            self.writer.write(in_data)
+            self.capture_buffer.write(np.frombuffer(in_data, dtype=np.float32))
         return (in_data, pyaudio.paContinue)
 
     def get_recordings_dir(self):
@@ -137,24 +163,29 @@ class AudioService(QObject):
     def load_audio_file(self, file_path: str):
         try:
             self.logger.info(f"Attempting to load audio file: {file_path}")
+            started = time.perf_counter()
             audio_data = None
             file_extension = Path(file_path).suffix.lower()
             self.logger.info(f"File extension: {file_extension}")
             
             if file_extension == '.wav':
                 self.logger.debug("Processing WAV file directly")
-                # Handle WAV files natively
-                with wave.open(file_path, 'rb') as wf:
-                    # Ensure we're getting the correct sample width
-                    sample_width = wf.getsampwidth()
-                    audio_data = np.frombuffer(wf.readframes(wf.getnframes()), 
-                        dtype=np.int16 if sample_width == 2 else np.int32)
-                    # Convert to float32 and normalize to [-1, 1]
-                    audio_data = audio_data.astype(np.float32) / (2**(8 * sample_width - 1))
+                # Memory-mapped and converted block by block; already normalized
+                try:
+                    audio_data = load_wav(file_path, sample_rate=self.sample_rate)
+                except ValueError as e:
+                    # Compressed or unusual WAV encodings go through ffmpeg
+                    self.logger.info(f"Falling back to ffmpeg for WAV file: {e}")
+                    audio_data = normalize_inplace(decode_with_ffmpeg(
+                        file_path,
+                        self.ffmpeg_path,
+                        sample_rate=self.sample_rate,
+                        ffprobe_path=self.ffprobe_path,
+                    ))
             else:
-                self.logger.debug("Processing WAV file directly")
+                self.logger.debug("Decoding file with ffmpeg")
                 # Improve error handling for non-WAV files
-                self.error_occurred.emit(f"Converting {file_extension} file to WAV format...")
+                self.error_occurred.emit(f"Decoding {file_extension} file...")
                 
                 try:
                     self.logger.debug(f"ffmpeg path: {self.ffmpeg_path}")
@@ -164,48 +195,25 @@ class AudioService(QObject):
                             raise Exception(f"ffmpeg not found at {self.ffmpeg_path}")
                         if not os.path.exists(self.ffprobe_path):
                             raise Exception(f"ffmpeg not found at {self.ffprobe_path}")
-                        
-                        # Update this section to use the new method
-                        AudioSegment.converter = self.ffmpeg_path
-                        self.logger.debug(f"Set ffmpeg converter path to: {self.ffmpeg_path}")
-
 
-                    self.logger.debug("Creating AudioSegment")
-                    audio = AudioSegment.from_file(file_path)
-
-                    self.logger.debug(f"Original audio: channels={audio.channels}, frame_rate={audio.frame_rate}")
-                    
-                    if audio.channels > 1:
-                        audio = audio.set_channels(1)
-                    audio = audio.set_frame_rate(self.sample_rate)
-                    
-                    # Use a temporary file instead of BytesIO
-                    temp_wav = os.path.join(self.recordings_dir, "temp_conversion.wav")
-                    self.logger.debug(f"Exporting to temp file: {temp_wav}")
-                    
-                    audio.export(temp_wav, format='wav', parameters=["-ac", "1", "-ar", str(self.sample_rate)])
-                    self.logger.debug("Export completed")
-                    
-                    with wave.open(temp_wav, 'rb') as wf:
-                        audio_data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
-                        audio_data = audio_data.astype(np.float32) / 32768.0
-                    # Clean up temporary file
-                    os.remove(temp_wav)
+                    # ffmpeg decodes, downmixes and resamples straight into a float32 array
+                    audio_data = normalize_inplace(decode_with_ffmpeg(
+                        file_path,
+                        self.ffmpeg_path,
+                        sample_rate=self.sample_rate,
+                        ffprobe_path=self.ffprobe_path,
+                    ))
+                    self.logger.debug(f"Decoded {len(audio_data) / self.sample_rate:.1f}s of audio")
                     
                 except Exception as e:
                     self.logger.error(f"Audio conversion error: {str(e)}")
                     self.error_occurred.emit(f"Audio conversion error: {str(e)}")
                     return None
 
-            # Additional safety checks and normalization
-            # Remove any DC offset
+            # DC removal, peak limiting and NaN cleanup were done in place by the loaders
             if audio_data is not None:
-                audio_data = audio_data - np.mean(audio_data)
-                max_val = np.abs(audio_data).max()
-                if max_val > 1.0:
-                    audio_data = audio_data / max_val
-                audio_data = np.nan_to_num(audio_data, nan=0.0, posinf=0.0, neginf=0.0)
-                
+                DECODE.observe(time.perf_counter() - started)
+                DECODED_SECONDS.inc(len(audio_data) / self.sample_rate)
                 self.file_loaded.emit(audio_data)
                 return audio_data
             else:
@@ -0,0 +1,102 @@
+# Whisper sizes from most to least expensive; '.en' variants step down within their family
+MODEL_LADDER = ('large', 'medium', 'small', 'base', 'tiny')
+
+
+def smaller_model(model_size: str, floor: str):
+    """The next cheaper Whisper size, or None when `model_size` is already at `floor`"""
+    family, _, suffix = model_size.partition('.')
+    family = 'large' if family.startswith('large') or family == 'turbo' else family
+    if family not in MODEL_LADDER or floor not in MODEL_LADDER:
+        return None
+    index = MODEL_LADDER.index(family)
+    if index >= MODEL_LADDER.index(floor):
+        return None
+    smaller = MODEL_LADDER[index + 1]
+    return f"{smaller}.{suffix}" if suffix else smaller
+
+
+class BackpressureController:
+    """Keeps live transcription close to real time.
+
+    Every finished chunk updates an exponentially weighted real-time factor
+    (inference time / audio duration) and the chunk's lag (queue wait plus
+    inference). While the RTF is above `target_rtf` or the lag above
+    `max_lag_s`, the controller escalates one step at a time: longer segments
+    first, since Whisper pays for a full 30 s window whatever the chunk length,
+    then a smaller model once segments are at their longest. When the pipeline
+    has caught up, segments shrink back toward their base length. The model is
+    never upgraded mid-session; the service restores it for the next one.
+    """
+    ALPHA = 0.3             # Weight of the newest chunk in the RTF average
+    RELAX_RTF_FRACTION = 0.6  # Segments shrink again once the RTF is this far under target
+    GROWTH = 1.5
+    COOLDOWN_CHUNKS = 2     # Chunks to observe after an adjustment before the next one
+
+    def __init__(self, base_segment_s: float, max_segment_s: float, model_size: str,
+                 min_model_size: str, target_rtf: float, max_lag_s: float):
+        self.base_segment_s = base_segment_s
+        self.max_segment_s = max(max_segment_s, base_segment_s)
+        self.min_model_size = min_model_size
+        self.target_rtf = target_rtf
+        self.max_lag_s = max_lag_s
+        self.reset(model_size)
+
+    def reset(self, model_size: str):
+        self.model_size = model_size
+        self.segment_s = self.base_segment_s
+        self.rtf = None
+        self.lag_s = 0.0
+        self.max_lag_seen_s = 0.0
+        self.adjustments = 0
+        self._cooldown = 0
+
+    def observe(self, audio_seconds: float, inference_seconds: float, wait_seconds: float) -> bool:
+        """Record a finished live chunk; returns True if segment length or model size changed"""
+        if audio_seconds <= 0:
+            return False
+        rtf = inference_seconds / audio_seconds
+        self.rtf = rtf if self.rtf is None else self.ALPHA * rtf + (1 - self.ALPHA) * self.rtf
+        self.lag_s = wait_seconds + inference_seconds
+        self.max_lag_seen_s = max(self.max_lag_seen_s, self.lag_s)
+
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return False
+
+        if self.rtf > self.target_rtf or self.lag_s > self.max_lag_s:
+            changed = self._escalate()
+        elif self.rtf < self.target_rtf * self.RELAX_RTF_FRACTION and self.lag_s < self.max_lag_s / 2:
+            changed = self._relax()
+        else:
+            changed = False
+
+        if changed:
+            self.adjustments += 1
+            self._cooldown = self.COOLDOWN_CHUNKS
+        return changed
+
+    def _escalate(self) -> bool:
+        if self.segment_s < self.max_segment_s:
+            self.segment_s = min(self.max_segment_s, self.segment_s * self.GROWTH)
+            return True
+        smaller = smaller_model(self.model_size, self.min_model_size)
+        if smaller is not None:
+            self.model_size = smaller
+            return True
+        return False
+
+    def _relax(self) -> bool:
+        if self.segment_s > self.base_segment_s:
+            self.segment_s = max(self.base_segment_s, self.segment_s / self.GROWTH)
+            return True
+        return False
+
+    def stats(self) -> dict:
+        return {
+            'rtf': self.rtf,
+            'lag_seconds': self.lag_s,
+            'max_lag_seconds': self.max_lag_seen_s,
+            'segment_seconds': self.segment_s,
+            'model_size': self.model_size,
+            'adjustments': self.adjustments,
+        }
@@ -0,0 +1,198 @@
+import json
+import os
+import socket
+import threading
+import httpx
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from utils.config import (
+    setup_logger, LLM_BACKEND, LLM_MODEL, OLLAMA_HOST,
+    LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT, LLM_MAX_RETRIES,
+)
+
+
+class LLMBackend:
+    """A chat completion engine that streams its answer.
+
+    Each backend owns one pooled, keep-alive HTTP client that is created on
+    first use and reused for every request. Opening a request is retried with
+    jittered exponential backoff on transient failures; a stream that already
+    produced text is never retried, so no output is duplicated.
+    """
+    name = None
+    DEFAULT_MODEL = None
+    CONTEXT_TOKENS = 8192
+
+    def __init__(self, model: str = None):
+        self.model = model or self.DEFAULT_MODEL
+        self.logger = setup_logger(__name__)
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def identity(self) -> str:
+        """Backend and model, e.g. for cache keys"""
+        return f"{self.name}:{self.model}"
+
+    @staticmethod
+    def _http_client(**kwargs) -> httpx.Client:
+        return httpx.Client(
+            timeout=httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=300),
+            **kwargs,
+        )
+
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = self._create_client()
+            return self._client
+
+    def _retrying(self) -> Retrying:
+        return Retrying(
+            stop=stop_after_attempt(max(1, LLM_MAX_RETRIES)),
+            wait=wait_exponential_jitter(multiplier=0.5, max=8),
+            retry=retry_if_exception(self._is_transient),
+            before_sleep=lambda state: self.logger.warning(
+                "%s request failed (%s), retrying", self.name, state.outcome.exception()
+            ),
+            reraise=True,
+        )
+
+    def stream_chat(self, messages: list, on_open=None):
+        """Yield the text of the answer to `messages` as it arrives.
+
+        Closing the generator early (e.g. on cancel) closes the underlying stream.
+        `on_open(abort)` is called once the response is open; `abort()` may be
+        called from any thread and ends the stream even while it waits for data.
+        """
+        raise NotImplementedError
+
+    def complete(self, messages: list) -> str:
+        return "".join(self.stream_chat(messages))
+
+    def close(self):
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    @staticmethod
+    def _aborter(response: httpx.Response):
+        def abort():
+            # Closing the response would not wake a thread blocked reading it;
+            # shutting the socket down makes that read fail at once
+            network_stream = response.extensions.get('network_stream')
+            sock = network_stream.get_extra_info('socket') if network_stream is not None else None
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass  # Already closed
+        return abort
+
+    def _create_client(self):
+        raise NotImplementedError
+
+    def _is_transient(self, error: Exception) -> bool:
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI chat completions; the API key comes from OPENAI_API_KEY"""
+    name = 'openai'
+    DEFAULT_MODEL = 'gpt-4o-mini'
+    CONTEXT_TOKENS = 128000
+
+    def _create_client(self):
+        import openai
+        # Retries are ours, so the SDK's own are disabled
+        return openai.OpenAI(http_client=self._http_client(), max_retries=0)
+
+    def _is_transient(self, error: Exception) -> bool:
+        import openai
+        return isinstance(error, (
+            openai.APIConnectionError,  # Includes timeouts
+            openai.RateLimitError,
+            openai.InternalServerError,
+        ))
+
+    def stream_chat(self, messages: list, on_open=None):
+        client = self.client()
+        stream = self._retrying()(
+            client.chat.completions.create, model=self.model, messages=messages, stream=True,
+        )
+        if on_open is not None:
+            on_open(self._aborter(stream.response))
+        try:
+            for event in stream:
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+        finally:
+            stream.close()
+
+
+class OllamaBackend(LLMBackend):
+    """A local Ollama server, so notes can be generated without leaving the clinic"""
+    name = 'ollama'
+    DEFAULT_MODEL = 'llama3.1'
+    KEEP_ALIVE = '30m'  # How long Ollama keeps the model loaded between requests
+
+    def _create_client(self):
+        return self._http_client(base_url=os.getenv('OLLAMA_HOST', OLLAMA_HOST))
+
+    def _is_transient(self, error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code == 429 or error.response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
+
+    def _open(self, messages: list) -> httpx.Response:
+        client = self.client()
+        request = client.build_request('POST', '/api/chat', json={
+            'model': self.model,
+            'messages': messages,
+            'stream': True,
+            'keep_alive': self.KEEP_ALIVE,
+            # Ollama silently truncates prompts to its default context unless told otherwise
+            'options': {'num_ctx': self.CONTEXT_TOKENS},
+        })
+        response = client.send(request, stream=True)
+        if response.is_error:
+            response.read()
+            response.close()
+            response.raise_for_status()
+        return response
+
+    def stream_chat(self, messages: list, on_open=None):
+        response = self._retrying()(self._open, messages)
+        if on_open is not None:
+            on_open(self._aborter(response))
+        try:
+            # Newline-delimited JSON, one object per chunk
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if 'error' in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                content = chunk.get('message', {}).get('content')
+                if content:
+                    yield content
+                if chunk.get('done'):
+                    break
+        finally:
+            response.close()
+
+
+BACKENDS = {backend.name: backend for backend in (OpenAIBackend, OllamaBackend)}
+
+
+def create_backend(name: str = None, model: str = None) -> LLMBackend:
+    """Build the backend selected for this deployment (LLM_BACKEND / LLM_MODEL)"""
+    # Read at call time, so settings from a .env loaded after import still apply
+    name = (name or os.getenv('LLM_BACKEND', LLM_BACKEND)).lower()
+    model = model or os.getenv('LLM_MODEL', LLM_MODEL)
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend '{name}' (expected one of: {', '.join(BACKENDS)})")
+    return backend_class(model or None)
@@ -1,26 +1,147 @@
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from datetime import datetime
 import json
+import logging
 import os
 from pathlib import Path
 import platform
 import re
 import sys
+import threading
+import time
 from docx import Document
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
 from dotenv import load_dotenv
 from pydantic import BaseModel
 import multiprocessing
 
-from utils.config import setup_logger
+from services.llm_backends import LLMBackend, create_backend
+from services.token_budget import count_message_tokens, count_tokens, split_sentences
+from services.note_cache import NoteCache
+from services.note_template import NoteTemplate, load_template
+from services.pii_analyzer import PIIAnalyzer
+from services.redaction import redact, reidentify, IncrementalRedactor, RedactionResult, StreamingReidentifier
+from utils import metrics
+from utils.config import setup_logger, LLM_PROMPT_TOKEN_BUDGET, LLM_MAP_CHUNK_TOKENS, LLM_MAP_CONCURRENCY
+from utils.worker_base import BaseWorker
+
+TIME_TO_FIRST_TOKEN = metrics.histogram('llm_time_to_first_token_seconds', "Request start to first streamed token")
+ROUND_TRIP = metrics.histogram('llm_round_trip_seconds', "Request start to the last streamed token")
+PROMPT_TOKENS = metrics.counter('llm_prompt_tokens_total', "Prompt tokens sent to the LLM")
+COMPLETION_TOKENS = metrics.counter('llm_completion_tokens_total', "Completion tokens received from the LLM")
+GENERATION_ERRORS = metrics.counter('llm_generation_errors_total', "Note generations that failed")
+CACHE_HITS = metrics.counter('note_cache_hits_total', "Notes served from the note cache")
+CACHE_MISSES = metrics.counter('note_cache_misses_total', "Notes that had to be generated")
+DOCX_EXPORT = metrics.histogram('docx_export_seconds', "Time to write a note to a Word document")
 
 load_dotenv()
 
+NOTE_SYSTEM_PROMPT = """You are a professional medical documentation assistant specializing in rewriting consultation notes.
+Your role is to synthesize clinical interview transcripts into polished, human-like consultation notes that are comprehensive, detailed, and empathetic while adhering to a professional structure.
+Ensure that sensitive information like HIPAA compliance identifying data are replaced with brackets like {name}, {age}, {date_of_birth}.
+Your notes should accurately reflect the patient’s symptoms, history, and context in a nuanced and relatable manner.
+Only return the same structured rewritten consultation notes without any additional information, style and formatting."""
+
+NOTE_INSTRUCTIONS = """Important:
+1. Retain the structure of the provided consultation note template, including all sections and subheadings.
+2. Ensure that all details mentioned in the transcription (e.g., demographic information, symptoms, history) are incorporated accurately into the rewritten note. Avoid omitting any relevant information unless it is not present in the transcription.
+3. Describe the patient’s symptoms in a human-like and relatable manner. For example:
+- Instead of stating "The patient reports a long-standing low mood," elaborate with, "The patient shared that their mood has felt persistently low, describing it as a constant ‘cloud’ that dampens their day-to-day experiences."
+- Include the patient's own words, where appropriate, to make the note more vivid.
+4. Provide clear and professional clinical reasoning in sections like ‘Impression’ and ‘Plan,’ integrating the patient’s history and symptoms into the assessment.
+5. Avoid over-reliance on placeholders (e.g., {name}) when the same placeholder is repeatedly used within the same section. Use pronouns appropriately for natural readability.
+6. Do not simply copy and paste verbatim from the provided template or transcript. Rewrite to ensure the note feels cohesive and thoughtfully composed.
+7. Avoid clinical jargon unless absolutely necessary, opting for plain, professional language that is accessible and clear.
+
+The rewritten note should present as a polished, nuanced, and complete consultation note, avoiding redundancy or omissions. It should read as though written by a highly experienced and empathetic clinician."""
+
+
+class GenerationCancelled(Exception):
+    """Raised inside a generation when the user cancels it"""
+
+
+class StreamCanceller:
+    """Polls `should_stop` while a response streams and aborts the stream when it is true.
+
+    Checking only between deltas would leave Stop waiting for a stalled
+    backend until its read timeout.
+    """
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, should_stop):
+        self.should_stop = should_stop
+        self.cancelled = False
+        self._abort = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def opened(self, abort):
+        """`on_open` callback for LLMBackend.stream_chat"""
+        with self._lock:
+            self._abort = abort
+            if self.cancelled:
+                abort()
+
+    def __enter__(self):
+        if self.should_stop is not None:
+            threading.Thread(target=self._watch, name="llm-cancel", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._done.set()
+
+    def _watch(self):
+        while not self._done.wait(self.POLL_INTERVAL):
+            if self.should_stop():
+                with self._lock:
+                    self.cancelled = True
+                    if self._abort is not None:
+                        self._abort()
+                return
+
+
+class GenerationWorker(BaseWorker):
+    """Runs one note generation off the UI thread.
+
+    Re-identified text is streamed through `signals.progress` as it arrives;
+    the final note goes to `signals.result`.
+    """
+    def __init__(self, service, transcription: str):
+        super().__init__()
+        self.service = service
+        self.transcription = transcription
+
+    def run(self):
+        try:
+            note = self.service.generate_note(
+                self.transcription,
+                on_token=self.signals.progress.emit,
+                should_stop=lambda: not self.is_running,
+            )
+            self.signals.result.emit(note)
+        except GenerationCancelled:
+            self.signals.error.emit("")
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        finally:
+            self.signals.finished.emit()
+
+
 class LLMService(QObject):
     response_ready = pyqtSignal(str)
+    response_chunk = pyqtSignal(str)       # Streamed, already re-identified text
+    generation_running = pyqtSignal(bool)
     debug_message = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self):
+    PROMPT_VERSION = "2"  # Bump whenever the prompt text changes so cached notes are not reused
+    OUTPUT_RESERVE_TOKENS = 4096
+    MAX_MAP_ROUNDS = 3
+    PREFIX_CACHE_MIN_TOKENS = 1024  # Shortest prompt prefix providers cache (OpenAI)
+
+    def __init__(self, backend: LLMBackend = None, note_cache: NoteCache = None):
+        """`backend` and `note_cache` default to the configured LLM backend and
+        the on-disk note cache; a `.env` is only required for the default backend."""
         super().__init__()
         
         self.logger = setup_logger(__name__)
@@ -44,7 +165,7 @@ class LLMService(QObject):
         # Load environment variables
         if os.path.exists(dotenv_path):
             load_dotenv(dotenv_path)
-        else:
+        elif backend is None:
             raise Exception(f".env file not found at {dotenv_path}")
         
 
@@ -55,11 +176,24 @@ class LLMService(QObject):
         self.output_dir = os.path.join(os.path.expanduser('~/Documents'), 'medicalapp', 'llm_outputs')
         os.makedirs(self.output_dir, exist_ok=True)
         
-        self.template_doc = None
-        self.template_structure = None
+        self.template_structure = None  # NoteTemplate
+        self._prefixes = {}
         self.current_response_doc = None
         self.llm = None
-
+        self.last_redaction = None  # RedactionResult of the last processed transcript
+        self.note_cache = note_cache if note_cache is not None else NoteCache()
+        self.backend = backend if backend is not None else create_backend()
+        self.logger.info(f"Generating notes with {self.backend.identity}")
+
+        # Generation runs on a worker thread so the window stays responsive
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(1)
+        self.worker = None
+
+        # Live transcript chunks are redacted as they arrive, in order, off the UI thread
+        self.live_redactor = IncrementalRedactor(lambda text: PIIAnalyzer.instance().analyze(text))
+        self._live_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-redaction")
+        self._live_pending = None
         
         load_dotenv(dotenv_path)
 
@@ -69,11 +203,18 @@ class LLMService(QObject):
             if not Path(template_path).exists():
                 raise FileNotFoundError(f"Template file not found: {template_path}")
                 
-            self.template_doc = Document(template_path)
+            started = time.perf_counter()
+            template = load_template(template_path)
             
             # Validate template
-            if not self.template_doc.paragraphs:
+            if not template.text.strip():
                 raise ValueError("Template document is empty")
+
+            self.template_structure = template
+            self.debug_message.emit(
+                f"Template ready in {(time.perf_counter() - started) * 1000:.1f}ms: "
+                f"{len(template.headings)} sections, {len(template.slots)} placeholder slots"
+            )
                 
             return True
             
@@ -84,141 +225,9 @@ class LLMService(QObject):
             return False
 
     def process_text(self, transcription: str):
-        """Process the transcription with the loaded template"""
+        """Process the transcription with the loaded template, blocking until done"""
         try:
-            if not transcription:
-                raise ValueError("No transcription provided")
-            
-            if not self.template_doc:
-                raise ValueError("No template loaded")
-
-            from presidio_analyzer import AnalyzerEngine
-            analyzer = AnalyzerEngine()
-            analyzer_results = analyzer.analyze(text=transcription, language='en')
-
-            entity_counters = {}
-            replacements = []
-            patient_data = []
-
-            self.logger.info("Identified these PII entities:")
-            for result in analyzer_results:
-                if result.score > 0.5:
-                    # Initialize counter for new entity types
-                    if result.entity_type not in entity_counters:
-                        entity_counters[result.entity_type] = 1
-                    
-                    # Create replacement with indexed entity type
-                    replacement = {
-                        'start': result.start,
-                        'end': result.end,
-                        'original': transcription[result.start:result.end],
-                        'replacement': f"{{{result.entity_type}_{entity_counters[result.entity_type]}}}"
-                    }
-                    replacements.append(replacement)
-                    
-                    # Increment counter for this entity type
-                    entity_counters[result.entity_type] += 1
-
-                    self.logger.info(f"- {transcription[result.start:result.end]} as {result.entity_type}")
-                    patient_data.append({f"{{{result.entity_type}_{entity_counters[result.entity_type]}}}": transcription[result.start:result.end]})
-
-            self.logger.info(f"Patient data: {patient_data}")
-            # Apply replacements from end to start to avoid index shifting
-            updated_transcription = transcription
-            for replacement in sorted(replacements, key=lambda x: x['start'], reverse=True):
-                updated_transcription = (
-                    updated_transcription[:replacement['start']] + 
-                    replacement['replacement'] + 
-                    updated_transcription[replacement['end']:]
-                )
-
-            print("Modified text:")
-            print(updated_transcription)
-
-            sample_note = '\n'.join([paragraph.text for paragraph in self.template_doc.paragraphs])
-
-            # Get list of placeholder keys from patient_data
-            placeholders = []
-            for data_dict in patient_data:
-                placeholders.extend(list(data_dict.keys()))
-
-            import openai
-            response = openai.chat.completions.create(
-                model="gpt-4o-mini",
-            #     # messages=[
-            #     #     {"role": "system", "content": "You are a bot that rewrites medical consultation notes using provided interview transcripts, ensuring the use of {name}, {age}, {date_of_birth}, {email}, {phone_number}."},
-            #     #     {"role": "user", "content":
-            #     #         f"""
-            #     #         Here is the original consultation note template:
-            #     #         {sample_note}
-
-            #     #         Please rewrite this consultation note using the following interview transcription:
-            #     #         {updated_transcription}"""
-            #     #         + """
-            #     #         Important:
-
-            #     #         Find all the available and possible patient's name, age, email, phone number and date of birth.
-
-            #     #         Replace them with {name}, {age}, {date_of_birth}, {email}, {phone_number} on new note.
-
-            #     #         Don't use any additional or creative labels except for {name}, {age}, {date_of_birth}, {email}, {phone_number}.
-
-            #     #         Do not retain any previous PII from the sample note.
-
-            #     #         Retain the original structure of the consultation note and do not include any explanations, comments, or additional text.
-            #     #         """
-            #     #     }
-            #     # ]
-                messages = [
-                    {
-                        "role": "system", "content":
-                            """You are a professional medical documentation assistant specializing in rewriting consultation notes.
-                            Your role is to synthesize clinical interview transcripts into polished, human-like consultation notes that are comprehensive, detailed, and empathetic while adhering to a professional structure.
-                            Ensure that sensitive information like HIPAA compliance identifying data are replaced with brackets like {name}, {age}, {date_of_birth}.
-                            Your notes should accurately reflect the patient’s symptoms, history, and context in a nuanced and relatable manner.
-                            Only return the same structured rewritten consultation notes without any additional information, style and formatting.
-                            """
-                    },
-                    {
-                        "role": "user",
-                        "content": f"""
-                        Here is the original consultation note template:
-                        {sample_note}
-
-                        Please rewrite this consultation note using the following interview transcription:
-                        {updated_transcription}
-
-                        These are placeholders that should be used on generated document: {placeholders}
-                        Use only these placeholders.
-                        
-                        Only return the same structured rewritten consultation notes without any additional information, style and formatting.
-                        """ + 
-
-                        
-                        """
-                        Important:
-                        1. Retain the structure of the provided consultation note template, including all sections and subheadings.
-                        2. Ensure that all details mentioned in the transcription (e.g., demographic information, symptoms, history) are incorporated accurately into the rewritten note. Avoid omitting any relevant information unless it is not present in the transcription.
-                        3. Describe the patient’s symptoms in a human-like and relatable manner. For example:
-                        - Instead of stating "The patient reports a long-standing low mood," elaborate with, "The patient shared that their mood has felt persistently low, describing it as a constant ‘cloud’ that dampens their day-to-day experiences."
-                        - Include the patient's own words, where appropriate, to make the note more vivid.
-                        4. Provide clear and professional clinical reasoning in sections like ‘Impression’ and ‘Plan,’ integrating the patient’s history and symptoms into the assessment.
-                        5. Avoid over-reliance on placeholders (e.g., {name}) when the same placeholder is repeatedly used within the same section. Use pronouns appropriately for natural readability.
-                        6. Do not simply copy and paste verbatim from the provided template or transcript. Rewrite to ensure the note feels cohesive and thoughtfully composed.
-                        7. Avoid clinical jargon unless absolutely necessary, opting for plain, professional language that is accessible and clear.
-
-
-
-                        The rewritten note should present as a polished, nuanced, and complete consultation note, avoiding redundancy or omissions. It should read as though written by a highly experienced and empathetic clinician."""
-                    }
-                ]
-            )
-            
-            new_note = response.choices[0].message.content
-            self.logger.info("\n" + new_note)
-
-            new_note = self.replace_pii_with_labels(new_note, patient_data)
-
+            new_note = self.generate_note(transcription)
             self.response_ready.emit(new_note)
             return new_note
                     
@@ -226,6 +235,320 @@ class LLMService(QObject):
             self.error_occurred.emit(str(e))
             return None
 
+    def process_text_async(self, transcription: str):
+        """Generate the note on a worker thread, streaming it through response_chunk"""
+        self.cancel_generation()
+
+        worker = GenerationWorker(self, transcription)
+        worker.signals.progress.connect(self.response_chunk.emit)
+        worker.signals.result.connect(self.response_ready.emit)
+        worker.signals.error.connect(self._handle_generation_error)
+        worker.signals.finished.connect(lambda: self._generation_finished(worker))
+        self.worker = worker
+        self.generation_running.emit(True)
+        self.thread_pool.start(worker)
+
+    def cancel_generation(self):
+        if self.worker is not None:
+            self.worker.stop()
+
+    def is_generating(self) -> bool:
+        return self.worker is not None
+
+    def _handle_generation_error(self, error: str):
+        if error:
+            GENERATION_ERRORS.inc()
+            self.error_occurred.emit(error)
+        else:
+            self.debug_message.emit("Generation cancelled")
+
+    def _generation_finished(self, worker):
+        if self.worker is worker:
+            self.worker = None
+            self.generation_running.emit(False)
+
+    def add_live_text(self, text: str):
+        """Redact a newly transcribed chunk in the background"""
+        self._live_pending = self._live_executor.submit(self._redact_live_chunk, text)
+
+    def reset_live_redaction(self):
+        """Start a new live session with a fresh placeholder map"""
+        self._live_pending = self._live_executor.submit(self.live_redactor.reset)
+
+    def _redact_live_chunk(self, text: str):
+        try:
+            self.live_redactor.add(text)
+        except Exception as e:
+            # The transcript will no longer match the session, so Process falls back to a full pass
+            self.logger.error(f"Live redaction failed: {e}")
+
+    def _live_redaction(self, transcription: str):
+        """Redaction computed during recording, if it covers exactly this transcript"""
+        pending = self._live_pending
+        if pending is not None:
+            pending.result()
+        redaction = self.live_redactor.result_for(transcription)
+        if redaction is not None:
+            self.debug_message.emit(
+                f"Using redaction computed during recording ({self.live_redactor.chunks} chunks, "
+                f"{self.live_redactor.analyze_seconds:.2f}s of analysis done ahead of time)"
+            )
+        return redaction
+
+    def redact_transcript(self, transcription: str) -> RedactionResult:
+        """Redact a transcript, reusing the live session's redaction when it covers the same text.
+
+        Blocking and safe to call from any thread.
+        """
+        if not transcription:
+            raise ValueError("No transcription provided")
+
+        redaction = self._live_redaction(transcription)
+        source_text = IncrementalRedactor.normalize(transcription)
+        if redaction is None:
+            analyzer = PIIAnalyzer.instance()
+            if not analyzer.is_ready():
+                self.debug_message.emit("Waiting for the PII analyzer to finish loading...")
+            analyzer_results = analyzer.analyze(transcription)
+            self.debug_message.emit(
+                f"PII analysis took {analyzer.last_analyze_seconds:.2f}s "
+                f"(analyzer built once in {analyzer.build_seconds:.2f}s)"
+            )
+
+            # Overlaps resolved by score, one placeholder per distinct entity, single pass
+            redaction = redact(transcription, analyzer_results)
+            source_text = transcription
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Identified these PII entities:")
+            for span in redaction.spans:
+                self.logger.debug("- %s as %s", source_text[span.start:span.end], span.entity_type)
+        return redaction
+
+    def generate_note(self, transcription: str, on_token=None, should_stop=None,
+                      template: NoteTemplate = None, redaction: RedactionResult = None) -> str:
+        """Redact, generate and re-identify a note. Safe to call from a worker thread.
+
+        `on_token` receives re-identified text as it streams in; `should_stop`
+        is polled between chunks and raises GenerationCancelled when true.
+        `template` defaults to the loaded one; pass a `redaction` of this
+        transcript from `redact_transcript` to skip redacting it again.
+        """
+        if not transcription:
+            raise ValueError("No transcription provided")
+        
+        template = template or self.template_structure
+        if template is None:
+            raise ValueError("No template loaded")
+
+        if redaction is None:
+            redaction = self.redact_transcript(transcription)
+        self.last_redaction = redaction
+
+        patient_data = [redaction.placeholders]
+        updated_transcription = redaction.text
+        self.logger.debug("Modified text:\n%s", updated_transcription)
+
+        placeholders = list(redaction.placeholders)
+
+        # Placeholder numbering is deterministic, so a cached placeholdered note
+        # re-identifies correctly against this redaction
+        cache_key = NoteCache.key_for(updated_transcription, template.text, self.backend.identity, self.PROMPT_VERSION)
+        cached_note = self.note_cache.get(cache_key)
+        if cached_note is not None:
+            CACHE_HITS.inc()
+            stats = self.note_cache.stats()
+            self.debug_message.emit(
+                f"Note served from cache (hit rate {stats['hit_rate']:.0%}, "
+                f"{stats['bytes_saved']} bytes not sent to the LLM)"
+            )
+            new_note = self.replace_pii_with_labels(cached_note, patient_data)
+            if on_token is not None:
+                on_token(new_note)
+            return new_note
+
+        CACHE_MISSES.inc()
+        started = time.perf_counter()
+        messages = self._note_messages(template, updated_transcription, placeholders)
+        build_seconds = time.perf_counter() - started
+        model = self.backend.model
+        prompt_tokens = count_message_tokens(messages, model)
+        budget = self._prompt_budget()
+        if prompt_tokens > budget:
+            condensed = self._condense_transcript(
+                updated_transcription, template, placeholders, budget, should_stop
+            )
+            messages = self._note_messages(template, condensed, placeholders)
+            prompt_tokens = count_message_tokens(messages, model)
+        prefix_tokens = count_tokens(messages[0]["content"], model)
+        prefix_cacheable = prefix_tokens >= self.PREFIX_CACHE_MIN_TOKENS
+        self.debug_message.emit(
+            f"Prompt is {prompt_tokens} tokens (budget {budget}), built in {build_seconds * 1000:.1f}ms; "
+            f"shared prefix {prefix_tokens} tokens, "
+            f"{'eligible' if prefix_cacheable else 'too short'} for provider prompt caching"
+        )
+
+        reidentifier = StreamingReidentifier(redaction.placeholders)
+        parts = []
+        first_token_time = None
+        with StreamCanceller(should_stop) as canceller:
+            stream = self.backend.stream_chat(messages, on_open=canceller.opened)
+            try:
+                for delta in stream:
+                    if should_stop is not None and should_stop():
+                        raise GenerationCancelled()
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter() - started
+                        TIME_TO_FIRST_TOKEN.observe(first_token_time)
+                        self.debug_message.emit(f"First token after {first_token_time:.2f}s")
+                    parts.append(delta)
+                    if on_token is not None:
+                        visible = reidentifier.feed(delta)
+                        if visible:
+                            on_token(visible)
+            except GenerationCancelled:
+                raise
+            except Exception:
+                # An aborted stream fails with whatever error its transport reports
+                if canceller.cancelled:
+                    raise GenerationCancelled()
+                raise
+            finally:
+                stream.close()
+            if canceller.cancelled:
+                raise GenerationCancelled()
+
+        if on_token is not None:
+            tail = reidentifier.flush()
+            if tail:
+                on_token(tail)
+
+        total_time = time.perf_counter() - started
+        self.debug_message.emit(
+            f"LLM response complete in {total_time:.2f}s "
+            f"(time to first token {first_token_time or total_time:.2f}s)"
+        )
+        
+        new_note = "".join(parts)
+        completion_tokens = count_tokens(new_note, model)
+        ROUND_TRIP.observe(total_time)
+        PROMPT_TOKENS.inc(prompt_tokens)
+        COMPLETION_TOKENS.inc(completion_tokens)
+        self.logger.debug("\n%s", new_note)
+        self.logger.info(
+            "Note generation with %s: %d prompt tokens, %d completion tokens",
+            self.backend.identity, prompt_tokens, completion_tokens,
+        )
+
+        request_bytes = sum(len(message["content"].encode('utf-8')) for message in messages)
+        self.note_cache.put(cache_key, new_note, request_bytes, total_time)
+
+        new_note = self.replace_pii_with_labels(new_note, patient_data)
+        return new_note
+
+    def _note_prefix(self, template: NoteTemplate) -> str:
+        """System prompt plus template: byte-identical for every request with this template"""
+        prefix = self._prefixes.get(template.key)
+        if prefix is None:
+            prefix = f"{NOTE_SYSTEM_PROMPT}\n\n{NOTE_INSTRUCTIONS}\n\nHere is the original consultation note template:\n{template.text}"
+            self._prefixes = {template.key: prefix}  # Only the current template is worth keeping
+        return prefix
+
+    def _note_messages(self, template: NoteTemplate, updated_transcription: str, placeholders: list) -> list:
+        """Chat messages asking for the template rewritten from a redacted transcript.
+
+        Everything that varies per request comes last, so providers can reuse
+        their cached computation of the shared prefix.
+        """
+        return [
+            {"role": "system", "content": self._note_prefix(template)},
+            {
+                "role": "user",
+                "content": f"""Please rewrite this consultation note using the following interview transcription:
+{updated_transcription}
+
+These are placeholders that should be used on generated document: {placeholders}
+Use only these placeholders.
+
+Only return the same structured rewritten consultation notes without any additional information, style and formatting."""
+            }
+        ]
+
+    def _summary_messages(self, chunk: str, index: int, total: int, placeholders: list) -> list:
+        return [
+            {
+                "role": "system", "content":
+                    """You condense parts of clinical interview transcripts for a medical documentation assistant.
+                    Keep every clinically relevant fact: symptoms, history, medications, risks, plans, and the patient's own notable words.
+                    Keep placeholders such as {PERSON_1} exactly as written. Leave out small talk. Do not add anything."""
+            },
+            {
+                "role": "user",
+                "content": f"""
+                This is part {index + 1} of {total} of a consultation transcript.
+                Placeholders that may appear: {placeholders}
+
+                {chunk}
+                """
+            }
+        ]
+
+    def _prompt_budget(self) -> int:
+        # Leave room in the context window for the note itself
+        return min(LLM_PROMPT_TOKEN_BUDGET, self.backend.CONTEXT_TOKENS - self.OUTPUT_RESERVE_TOKENS)
+
+    def _condense_transcript(self, transcript: str, template: NoteTemplate, placeholders: list,
+                             budget: int, should_stop=None) -> str:
+        """Map step for over-budget transcripts: summarize sentence-aligned chunks concurrently.
+
+        Summaries are joined in order and condensed again until they fit the
+        room the note prompt leaves for the transcript.
+        """
+        model = self.backend.model
+        available = budget - count_message_tokens(self._note_messages(template, "", placeholders), model)
+        if available <= 0:
+            raise ValueError(f"The template alone exceeds the prompt budget of {budget} tokens")
+        chunk_tokens = min(LLM_MAP_CHUNK_TOKENS, available, self._prompt_budget() // 2)
+
+        text = transcript
+        for round_number in range(1, self.MAX_MAP_ROUNDS + 1):
+            chunks = split_sentences(text, chunk_tokens, model)
+            self.debug_message.emit(
+                f"Transcript is over the token budget; summarizing {len(chunks)} parts (round {round_number})"
+            )
+            text = "\n\n".join(self._map_chunks(chunks, placeholders, should_stop))
+            if count_tokens(text, model) <= available:
+                return text
+        raise ValueError("Transcript is too long to fit the prompt budget even after summarizing")
+
+    def _map_chunks(self, chunks: list, placeholders: list, should_stop=None) -> list:
+        model = self.backend.model
+        requests = [self._summary_messages(chunk, i, len(chunks), placeholders) for i, chunk in enumerate(chunks)]
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=max(1, min(LLM_MAP_CONCURRENCY, len(chunks))),
+                                      thread_name_prefix="llm-map")
+        try:
+            futures = [executor.submit(self.backend.complete, messages) for messages in requests]
+            pending = set(futures)
+            while pending:
+                if should_stop is not None and should_stop():
+                    raise GenerationCancelled()
+                _, pending = wait(pending, timeout=0.2, return_when=FIRST_EXCEPTION)
+                for future in futures:
+                    if future.done() and future.exception() is not None:
+                        raise future.exception()
+            summaries = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        prompt_tokens = sum(count_message_tokens(messages, model) for messages in requests)
+        completion_tokens = sum(count_tokens(summary, model) for summary in summaries)
+        self.logger.info(
+            "Summarized %d transcript parts in %.2fs: %d prompt tokens, %d completion tokens",
+            len(chunks), time.perf_counter() - started, prompt_tokens, completion_tokens,
+        )
+        return summaries
+
     def save_response(self, response_context: str) -> str:
         """
         Save the response to a Word document in the results directory at project root
@@ -239,6 +562,7 @@ class LLMService(QObject):
         try:
             if not response_context:
                 raise ValueError("No content to save")
+            started = time.perf_counter()
 
             # Get project root directory and create results folder
             results_dir = os.path.join(os.path.expanduser('~/Documents'), 'medicalapp', 'results') # Go up to project root
@@ -251,10 +575,11 @@ class LLMService(QObject):
             # Create filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"consultation_note_{timestamp}.docx"
-            output_path = results_dir / filename
+            output_path = Path(results_dir) / filename
 
             # Save the document
             doc.save(str(output_path))
+            DOCX_EXPORT.observe(time.perf_counter() - started)
             self.logger.info(f"Document saved successfully at: {output_path}")
             return str(output_path)
 
@@ -270,17 +595,14 @@ class LLMService(QObject):
         for d in replacements:
             merged_replacements.update(d)
         
-        
-        # Convert all keys to lowercase and values to strings
+        # Convert all values to strings
         merged_replacements = {key: str(value) for key, value in merged_replacements.items()}
-        self.logger.info(f"Merged replacements: {merged_replacements}")
-        
-        # This regex finds text in curly braces
-        pattern = r'\{[A-Z_0-9]+\}'
+        self.logger.debug("Merged replacements: %s", merged_replacements)
         
-        # Replace each occurrence with its corresponding value
-        result = text
-        for key, value in merged_replacements.items():
-            result = result.replace(key, value)
+        # One tokenizing pass; each {ENTITY_n} is looked up rather than searched for
+        result, unresolved = reidentify(text, merged_replacements)
+        if unresolved:
+            self.logger.warning("%d unresolved placeholder(s) in note: %s", len(unresolved), sorted(set(unresolved)))
+            self.debug_message.emit(f"{len(unresolved)} placeholder(s) in the note could not be resolved")
         
-        return result
\ No newline at end of file
+        return result
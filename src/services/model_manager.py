@@ -0,0 +1,216 @@
+from collections import deque
+import gc
+import os
+import platform
+import sys
+import threading
+import time
+from utils.config import setup_logger, WHISPER_IDLE_TTL, WHISPER_MEMORY_LIMIT_MB
+
+
+class WhisperModelManager:
+    """Process-wide cache of loaded Whisper models.
+
+    Models are shared by every TranscriptionService and stay resident between
+    sessions. A model that nobody holds is evicted once it has been idle for
+    `idle_ttl` seconds, or earlier when the resident set exceeds `memory_limit_mb`.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, idle_ttl: float = WHISPER_IDLE_TTL, memory_limit_mb: float = WHISPER_MEMORY_LIMIT_MB):
+        self.logger = setup_logger(__name__)
+        self.idle_ttl = idle_ttl
+        self.memory_limit_mb = memory_limit_mb
+
+        self._lock = threading.RLock()
+        self._load_locks = {}  # model_size -> lock held while that model loads
+        self._inference_locks = {}  # model_size -> lock held while the shared model transcribes
+        self._models = {}      # model_size -> model
+        self._model_bytes = {}
+        self._last_used = {}
+        self._users = {}       # model_size -> number of active holders
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_times = {}   # model_size -> seconds spent in the last load
+        self.wait_times = deque(maxlen=100)  # seconds callers spent blocked behind a load
+
+        if self.idle_ttl > 0:
+            reaper = threading.Thread(target=self._reap_idle, name="whisper-model-reaper", daemon=True)
+            reaper.start()
+
+    def preload(self, model_size: str) -> threading.Thread:
+        """Load a model on a background thread so the first session does not wait"""
+        def _warm():
+            try:
+                self.get(model_size)
+            except Exception as e:
+                self.logger.error(f"Background warm-up of Whisper '{model_size}' failed: {e}")
+
+        thread = threading.Thread(target=_warm, name=f"whisper-preload-{model_size}", daemon=True)
+        thread.start()
+        return thread
+
+    def is_loaded(self, model_size: str) -> bool:
+        return model_size in self._models
+
+    def get(self, model_size: str):
+        """Return the shared model, loading it if needed. Blocks while a load is in progress."""
+        started = time.perf_counter()
+        with self._lock:
+            model = self._models.get(model_size)
+            if model is not None:
+                self.hits += 1
+                self._last_used[model_size] = time.monotonic()
+                return model
+            load_lock = self._load_locks.setdefault(model_size, threading.Lock())
+
+        # Load outside the manager lock; concurrent callers for the same size
+        # (e.g. a session started during warm-up) wait for the one load
+        with load_lock:
+            with self._lock:
+                model = self._models.get(model_size)
+                if model is not None:
+                    self.hits += 1
+                    self._last_used[model_size] = time.monotonic()
+                    self.wait_times.append(time.perf_counter() - started)
+                    return model
+
+            self.misses += 1
+            model = self._load(model_size)
+
+            with self._lock:
+                self._models[model_size] = model
+                self._model_bytes[model_size] = self._estimate_bytes(model)
+                self._last_used[model_size] = time.monotonic()
+                self._users.setdefault(model_size, 0)
+                self._enforce_memory_limit(keep=model_size)
+        return model
+
+    def acquire(self, model_size: str):
+        """Get a model and mark it as in use so it is never evicted under a session"""
+        with self._lock:
+            self._users[model_size] = self._users.get(model_size, 0) + 1
+        try:
+            return self.get(model_size)
+        except Exception:
+            self.release(model_size)
+            raise
+
+    def inference_lock(self, model_size: str) -> threading.Lock:
+        """Lock that serializes transcription on the shared model for callers without their own worker"""
+        with self._lock:
+            return self._inference_locks.setdefault(model_size, threading.Lock())
+
+    def release(self, model_size: str):
+        """Mark a model as no longer in use; it stays resident until evicted"""
+        with self._lock:
+            if self._users.get(model_size, 0) > 0:
+                self._users[model_size] -= 1
+            self._last_used[model_size] = time.monotonic()
+
+    def evict(self, model_size: str) -> bool:
+        with self._lock:
+            if self._users.get(model_size, 0) > 0 or model_size not in self._models:
+                return False
+            del self._models[model_size]
+            self._model_bytes.pop(model_size, None)
+            self._last_used.pop(model_size, None)
+            self.evictions += 1
+        self.logger.info(f"Evicted Whisper model '{model_size}'")
+        gc.collect()
+        return True
+
+    def evict_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                size for size, last_used in self._last_used.items()
+                if self._users.get(size, 0) == 0 and now - last_used >= self.idle_ttl
+            ]
+        for size in idle:
+            self.evict(size)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'load_seconds': dict(self.load_times),
+                'max_wait_seconds': max(self.wait_times, default=0.0),
+                'resident': sorted(self._models),
+                'resident_mb': sum(self._model_bytes.values()) / (1024 * 1024),
+            }
+
+    def _reap_idle(self):
+        interval = max(1.0, min(60.0, self.idle_ttl / 4))
+        while True:
+            time.sleep(interval)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                self.logger.error(f"Error evicting idle Whisper models: {e}")
+
+    def _enforce_memory_limit(self, keep: str):
+        if self.memory_limit_mb <= 0:
+            return
+        limit = self.memory_limit_mb * 1024 * 1024
+        # Evict least recently used models that nobody holds
+        for size in sorted(self._last_used, key=self._last_used.get):
+            if sum(self._model_bytes.values()) <= limit:
+                break
+            if size != keep:
+                self.evict(size)
+
+    def _load(self, model_size: str):
+        model_path = self.model_path()
+        self.logger.info(f"Loading Whisper model '{model_size}' from {model_path}")
+        started = time.perf_counter()
+
+        import whisper
+        model = whisper.load_model(
+            name=model_size,
+            download_root=model_path,
+            in_memory=True,
+        )
+
+        self.load_times[model_size] = time.perf_counter() - started
+        self.logger.info(f"Whisper model '{model_size}' loaded in {self.load_times[model_size]:.2f}s")
+        return model
+
+    def model_path(self) -> str:
+        if getattr(sys, 'frozen', False):
+            # If running from bundle
+            if platform.system() == 'Darwin':  # macOS
+                bundle_dir = os.path.dirname(sys.executable)
+                resources_dir = os.path.join(os.path.dirname(bundle_dir), 'Resources')
+                model_path = os.path.join(resources_dir, 'resources', 'models')
+            else:  # Windows
+                bundle_dir = os.path.dirname(sys.executable)
+                resources_dir = os.path.join(bundle_dir, '_internal')
+                model_path = os.path.join(resources_dir, 'resources', 'models')
+        else:
+            # If running from source
+            model_path = os.path.join(os.path.dirname(__file__), '..', '..', 'resources', 'models')
+
+        # Verify the model directory exists
+        if not os.path.exists(model_path):
+            raise Exception(f"Models directory not found at {model_path}")
+        return model_path
+
+    @staticmethod
+    def _estimate_bytes(model) -> int:
+        try:
+            return sum(p.numel() * p.element_size() for p in model.parameters())
+        except Exception:
+            return 0
@@ -0,0 +1,81 @@
+import hashlib
+import threading
+import time
+import diskcache
+from utils.config import setup_logger, NOTE_CACHE_DIR, NOTE_CACHE_SIZE_MB, NOTE_CACHE_TTL_DAYS
+
+
+class NoteCache:
+    """Content-addressed on-disk cache of generated notes.
+
+    Entries are keyed by a hash of the redacted transcript, the template text,
+    the model and the prompt version, so any change to one of them is a miss.
+    Only the note as returned by the LLM is stored, still containing its
+    {ENTITY_n} placeholders: no patient data is written to disk. Entries are
+    evicted least-recently-used once the cache exceeds its size limit, and
+    expire after the configured age.
+    """
+
+    def __init__(self, directory: str = NOTE_CACHE_DIR, size_limit_mb: float = NOTE_CACHE_SIZE_MB,
+                 ttl_days: float = NOTE_CACHE_TTL_DAYS):
+        self.logger = setup_logger(__name__)
+        self.cache = diskcache.Cache(
+            directory,
+            size_limit=int(size_limit_mb * 1024 * 1024),
+            eviction_policy='least-recently-used',
+        )
+        self.ttl = ttl_days * 24 * 3600 or None
+        self.cache.expire()
+
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0      # Request and response payload not sent to the LLM
+        self.seconds_saved = 0.0  # Generation time of the entries that were hit
+
+    @staticmethod
+    def key_for(redacted_text: str, template_text: str, model: str, prompt_version: str) -> str:
+        digest = hashlib.sha256()
+        for part in (prompt_version, model, template_text, redacted_text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """Return the cached placeholdered note for `key`, or None"""
+        entry = self.cache.get(key)
+        with self._stats_lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.bytes_saved += entry['request_bytes'] + len(entry['note'].encode('utf-8'))
+            self.seconds_saved += entry['generation_seconds']
+        return entry['note']
+
+    def put(self, key: str, note: str, request_bytes: int, generation_seconds: float):
+        self.cache.set(key, {
+            'note': note,
+            'request_bytes': request_bytes,
+            'generation_seconds': generation_seconds,
+            'created': time.time(),
+        }, expire=self.ttl)
+
+    def clear(self):
+        self.cache.clear()
+
+    def close(self):
+        self.cache.close()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.cache),
+                'volume_bytes': self.cache.volume(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'bytes_saved': self.bytes_saved,
+                'seconds_saved': self.seconds_saved,
+            }
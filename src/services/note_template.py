@@ -0,0 +1,66 @@
+import os
+import re
+import threading
+from docx import Document
+
+# Slots a template marks for patient details, e.g. {name}, [Date of birth], ____
+SLOT_PATTERN = re.compile(r'\{[^{}\n]+\}|\[[^\[\]\n]+\]|_{3,}')
+
+
+class NoteTemplate:
+    """A consultation note template parsed once into plain text, sections and slots"""
+
+    def __init__(self, path: str, mtime_ns: int, paragraphs: list, heading_flags: list):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.text = '\n'.join(paragraphs)
+        self.sections = []  # (heading, [body paragraphs]); the heading is None before the first one
+        for paragraph, is_heading in zip(paragraphs, heading_flags):
+            if is_heading or not self.sections:
+                self.sections.append((paragraph if is_heading else None, []))
+                if is_heading:
+                    continue
+            self.sections[-1][1].append(paragraph)
+        self.slots = list(dict.fromkeys(SLOT_PATTERN.findall(self.text)))
+
+    @property
+    def key(self) -> tuple:
+        return (self.path, self.mtime_ns)
+
+    @property
+    def headings(self) -> list:
+        return [heading for heading, _ in self.sections if heading]
+
+
+def _is_heading(paragraph) -> bool:
+    text = paragraph.text.strip()
+    if not text:
+        return False
+    style = paragraph.style.name if paragraph.style is not None else ''
+    if style.startswith('Heading') or style == 'Title':
+        return True
+    # Many templates use short bold lines or "Section:" lines instead of heading styles
+    if len(text) <= 60 and text.endswith(':'):
+        return True
+    return len(text) <= 60 and bool(paragraph.runs) and all(run.bold for run in paragraph.runs if run.text.strip())
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_template(path: str) -> NoteTemplate:
+    """Parse a .docx template, reusing the parsed form until the file changes on disk"""
+    path = os.path.abspath(path)
+    mtime_ns = os.stat(path).st_mtime_ns
+    with _cache_lock:
+        template = _cache.get(path)
+        if template is not None and template.mtime_ns == mtime_ns:
+            return template
+
+    document = Document(path)
+    paragraphs = [paragraph.text for paragraph in document.paragraphs]
+    template = NoteTemplate(path, mtime_ns, paragraphs, [_is_heading(p) for p in document.paragraphs])
+    with _cache_lock:
+        _cache[path] = template
+    return template
@@ -0,0 +1,101 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+from multiprocessing import shared_memory
+import time
+import numpy as np
+from services.vad import split_at_silence
+from utils.config import setup_logger, TRANSCRIBE_WORKERS, TORCH_THREADS_PER_WORKER
+
+# Per-process state of pool workers, set up once by _init_worker
+_model = None
+_audio_buffer = None
+_audio = None
+
+
+def _init_worker(model_size: str, model_path: str, torch_threads: int, shm_name: str, n_samples: int):
+    global _model, _audio_buffer, _audio
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    import whisper
+    _model = whisper.load_model(
+        name=model_size,
+        download_root=model_path,
+        in_memory=True,
+    )
+
+    # The recording lives in shared memory; segments are read without pickling audio
+    _audio_buffer = shared_memory.SharedMemory(name=shm_name)
+    _audio = np.ndarray((n_samples,), dtype=np.float32, buffer=_audio_buffer.buf)
+
+
+def _transcribe_segment(index: int, start: int, end: int):
+    started = time.perf_counter()
+    result = _model.transcribe(_audio[start:end], language='en')
+    text = result.get("text", "").strip() if result else ""
+    return index, text, time.perf_counter() - started
+
+
+class ParallelTranscriber:
+    """Transcribes a long recording by splitting it at silence and fanning the
+    segments out over a process pool, one Whisper model per process."""
+
+    SAMPLE_RATE = 16000
+    SEGMENT_DURATION = 30  # Whisper's native window
+
+    def __init__(self, model_size: str, model_path: str,
+                 workers: int = TRANSCRIBE_WORKERS, torch_threads: int = TORCH_THREADS_PER_WORKER):
+        self.model_size = model_size
+        self.model_path = model_path
+        self.workers = max(1, workers)
+        self.torch_threads = max(1, torch_threads)
+        self.logger = setup_logger(__name__)
+
+    def transcribe(self, audio_data: np.ndarray, progress_callback=None, should_stop=None) -> str:
+        """Transcribe `audio_data` and return the segment texts joined in order.
+
+        `progress_callback(done, total, seconds)` is called as each segment finishes;
+        `should_stop()` is polled so a running job can be abandoned.
+        """
+        segments = split_at_silence(audio_data, self.SAMPLE_RATE, target_s=self.SEGMENT_DURATION)
+        workers = min(self.workers, len(segments))
+        self.logger.info(
+            f"Transcribing {len(audio_data) / self.SAMPLE_RATE:.0f}s in {len(segments)} segments "
+            f"on {workers} process(es) x {self.torch_threads} thread(s)"
+        )
+
+        audio_buffer = shared_memory.SharedMemory(create=True, size=max(1, audio_data.nbytes))
+        shared_audio = None
+        try:
+            shared_audio = np.ndarray((len(audio_data),), dtype=np.float32, buffer=audio_buffer.buf)
+            shared_audio[:] = audio_data
+
+            texts = [""] * len(segments)
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                # Spawn, never fork: the parent holds Qt and PortAudio state
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.model_size, self.model_path, self.torch_threads,
+                          audio_buffer.name, len(audio_data)),
+            ) as pool:
+                futures = [
+                    pool.submit(_transcribe_segment, index, start, end)
+                    for index, (start, end) in enumerate(segments)
+                ]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    if should_stop is not None and should_stop():
+                        for pending in futures:
+                            pending.cancel()
+                        raise RuntimeError("Transcription cancelled")
+                    index, text, seconds = future.result()
+                    texts[index] = text
+                    if progress_callback is not None:
+                        progress_callback(done, len(segments), seconds)
+
+            return " ".join(text for text in texts if text)
+        finally:
+            # Drop the view before closing, or the buffer is still exported
+            shared_audio = None
+            audio_buffer.close()
+            audio_buffer.unlink()
@@ -0,0 +1,89 @@
+import threading
+import time
+from utils import metrics
+from utils.config import setup_logger
+
+ANALYZE = metrics.histogram('pii_analysis_seconds', "Presidio analysis time per call, live chunks included")
+
+
+class PIIAnalyzer:
+    """Process-wide Presidio AnalyzerEngine, built once and reused for every redaction.
+
+    Building the engine loads the spaCy pipeline and every recognizer, which
+    takes seconds; it is done once, ideally in the background at startup.
+    Construction and analysis times are tracked separately.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    LANGUAGE = 'en'
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self.logger = setup_logger(__name__)
+        self._engine = None
+        self._build_lock = threading.Lock()
+
+        self.build_seconds = None
+        self.analyses = 0
+        self.analyze_seconds_total = 0.0
+        self.last_analyze_seconds = None
+
+    def preload(self) -> threading.Thread:
+        """Build the engine on a background thread so the first redaction does not wait"""
+        def _warm():
+            try:
+                self.engine()
+            except Exception as e:
+                self.logger.error(f"Background warm-up of the PII analyzer failed: {e}")
+
+        thread = threading.Thread(target=_warm, name="pii-analyzer-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self) -> bool:
+        return self._engine is not None
+
+    def engine(self):
+        """Return the shared AnalyzerEngine, building it on first use"""
+        if self._engine is not None:
+            return self._engine
+        with self._build_lock:
+            if self._engine is None:
+                started = time.perf_counter()
+                from presidio_analyzer import AnalyzerEngine
+                engine = AnalyzerEngine()
+                # A throwaway call loads the spaCy model lazily held by the engine
+                engine.analyze(text="warm up", language=self.LANGUAGE)
+                self.build_seconds = time.perf_counter() - started
+                self._engine = engine
+                self.logger.info(f"PII analyzer built in {self.build_seconds:.2f}s")
+        return self._engine
+
+    def analyze(self, text: str, **kwargs):
+        """Run Presidio on `text`; the analysis time excludes engine construction"""
+        engine = self.engine()
+        started = time.perf_counter()
+        results = engine.analyze(text=text, language=self.LANGUAGE, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        self.analyses += 1
+        self.analyze_seconds_total += elapsed
+        self.last_analyze_seconds = elapsed
+        ANALYZE.observe(elapsed)
+        return results
+
+    def stats(self) -> dict:
+        return {
+            'ready': self.is_ready(),
+            'build_seconds': self.build_seconds,
+            'analyses': self.analyses,
+            'last_analyze_seconds': self.last_analyze_seconds,
+            'mean_analyze_seconds': self.analyze_seconds_total / self.analyses if self.analyses else None,
+        }
@@ -0,0 +1,80 @@
+import importlib
+import os
+import threading
+import time
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils.config import setup_logger, LLM_BACKEND, WHISPER_MODEL_SIZE
+
+
+class Preloader(QObject):
+    """Imports and warms the heavy stacks on background threads after the window is up.
+
+    'audio' and 'notes' are the app's own service modules (numpy, PyAudio,
+    python-docx, httpx...), which the UI needs before it can attach its
+    services; 'whisper', 'presidio' and 'openai' warm the models and clients
+    used on first recording, redaction and generation. Each stack loads on its
+    own thread and reports `stack_ready(name, seconds)` or `stack_failed(name, error)`.
+    """
+    stack_ready = pyqtSignal(str, float)
+    stack_failed = pyqtSignal(str, str)
+    all_done = pyqtSignal()
+
+    def __init__(self, model_size: str = WHISPER_MODEL_SIZE):
+        super().__init__()
+        self.logger = setup_logger(__name__)
+        self.model_size = model_size
+        self.ready = {}  # stack name -> seconds it took
+        self._lock = threading.Lock()
+        self._remaining = 0
+
+    def stacks(self) -> list:
+        stacks = [
+            ('audio', lambda: self._import('services.audio_service', 'services.transcription_service')),
+            ('notes', lambda: self._import('services.llm_service')),
+            ('whisper', self._load_whisper),
+            ('presidio', self._load_presidio),
+        ]
+        if os.getenv('LLM_BACKEND', LLM_BACKEND).lower() == 'openai':
+            stacks.append(('openai', lambda: self._import('openai')))
+        return stacks
+
+    def start(self):
+        stacks = self.stacks()
+        self._remaining = len(stacks)
+        for name, loader in stacks:
+            threading.Thread(target=self._load, args=(name, loader), name=f"preload-{name}", daemon=True).start()
+
+    def is_ready(self, name: str) -> bool:
+        return name in self.ready
+
+    def _load(self, name: str, loader):
+        started = time.perf_counter()
+        try:
+            loader()
+            elapsed = time.perf_counter() - started
+            self.ready[name] = elapsed
+            self.logger.info("%s ready in %.2fs", name, elapsed)
+            self.stack_ready.emit(name, elapsed)
+        except Exception as e:
+            self.logger.error("Preloading %s failed: %s", name, e)
+            self.stack_failed.emit(name, str(e))
+        finally:
+            with self._lock:
+                self._remaining -= 1
+                done = self._remaining == 0
+            if done:
+                self.all_done.emit()
+
+    @staticmethod
+    def _import(*modules):
+        for module in modules:
+            importlib.import_module(module)
+
+    def _load_whisper(self):
+        from services.model_manager import WhisperModelManager
+        # Imports torch and whisper and loads the default model
+        WhisperModelManager.instance().get(self.model_size)
+
+    def _load_presidio(self):
+        from services.pii_analyzer import PIIAnalyzer
+        PIIAnalyzer.instance().engine()
@@ -0,0 +1,83 @@
+from collections import deque
+from pathlib import Path
+import threading
+import time
+import numpy as np
+import soundfile as sf
+from utils.config import setup_logger
+
+
+class RecordingWriter(threading.Thread):
+    """Streams captured audio to a WAV or FLAC file on a background thread.
+
+    The capture callback hands raw float32 buffers to `write`, which only
+    appends to a deque and never blocks. The thread drains the deque to disk
+    and flushes periodically, so memory use stays constant and a recording
+    interrupted by a crash keeps everything up to the last flush. Closing the
+    file lets libsndfile patch the final header.
+    """
+    FLUSH_INTERVAL = 2.0  # Seconds between flushes to disk
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, file_path: str, sample_rate: int, channels: int = 1):
+        super().__init__(name="recording-writer", daemon=True)
+        self.file_path = file_path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_written = 0
+        self.error = None
+
+        self._pending = deque()
+        self._closing = threading.Event()
+        self.logger = setup_logger(__name__)
+
+    def write(self, data: bytes):
+        """Queue a raw float32 buffer; safe to call from the audio callback"""
+        if self.error is None:
+            self._pending.append(data)
+
+    def close(self, timeout: float = None):
+        """Write whatever is still queued, finalize the file and wait for the thread"""
+        self._closing.set()
+        self.join(timeout)
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        file_format = 'FLAC' if Path(self.file_path).suffix.lower() == '.flac' else 'WAV'
+        try:
+            with sf.SoundFile(
+                self.file_path, mode='w',
+                samplerate=self.sample_rate,
+                channels=self.channels,
+                format=file_format,
+                subtype='PCM_16',
+            ) as f:
+                last_flush = time.monotonic()
+                while True:
+                    closing = self._closing.is_set()
+                    wrote = self._drain(f)
+                    if closing and not self._pending:
+                        break
+                    if time.monotonic() - last_flush >= self.FLUSH_INTERVAL:
+                        f.flush()
+                        last_flush = time.monotonic()
+                    if not wrote:
+                        self._closing.wait(self.POLL_INTERVAL)
+            self.logger.info(
+                f"Recording closed: {self.frames_written / self.sample_rate:.1f}s written to {self.file_path}"
+            )
+        except Exception as e:
+            self.logger.error(f"Recording writer failed: {e}")
+            self.error = e
+
+    def _drain(self, f) -> bool:
+        wrote = False
+        while self._pending:
+            samples = np.frombuffer(self._pending.popleft(), dtype=np.float32)
+            if self.channels > 1:
+                samples = samples.reshape(-1, self.channels)
+            f.write(samples)
+            self.frames_written += len(samples)
+            wrote = True
+        return wrote
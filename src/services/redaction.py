@@ -0,0 +1,239 @@
+import re
+import threading
+import time
+from typing import NamedTuple
+
+SCORE_THRESHOLD = 0.5  # Presidio results at or below this score are ignored
+
+# Placeholders as written by `redact`, e.g. {PERSON_1}, {PHONE_NUMBER_2}
+PLACEHOLDER_PATTERN = re.compile(r'\{[A-Z_0-9]+\}')
+
+
+class RedactedSpan(NamedTuple):
+    """One redacted region, in coordinates of the original text"""
+    start: int
+    end: int
+    entity_type: str
+    placeholder: str
+    score: float
+
+
+class Detection(NamedTuple):
+    """An analyzer result moved into the coordinates of a longer text"""
+    start: int
+    end: int
+    entity_type: str
+    score: float
+
+
+class PlaceholderMap:
+    """Assigns one stable `{ENTITY_n}` placeholder per distinct surface form.
+
+    The same person mentioned ten times, in any casing or spacing, gets one
+    placeholder. Numbering starts at 1 per entity type.
+    """
+
+    def __init__(self):
+        self._by_surface = {}   # (entity_type, normalized surface) -> placeholder
+        self._counters = {}     # entity_type -> last number used
+        self.originals = {}     # placeholder -> first surface form seen
+
+    def __len__(self):
+        return len(self.originals)
+
+    @staticmethod
+    def _normalize(surface: str) -> str:
+        return " ".join(surface.split()).casefold()
+
+    def placeholder_for(self, entity_type: str, surface: str) -> str:
+        key = (entity_type, self._normalize(surface))
+        placeholder = self._by_surface.get(key)
+        if placeholder is None:
+            number = self._counters.get(entity_type, 0) + 1
+            self._counters[entity_type] = number
+            placeholder = f"{{{entity_type}_{number}}}"
+            self._by_surface[key] = placeholder
+            self.originals[placeholder] = surface
+        return placeholder
+
+
+class RedactionResult:
+    """Redacted text plus the span table and placeholder mapping that produced it"""
+
+    def __init__(self, text: str, spans: list, placeholders: dict):
+        self.text = text
+        self.spans = spans                # RedactedSpan list, sorted by start
+        self.placeholders = placeholders  # placeholder -> original text
+
+
+def resolve_overlaps(analyzer_results, threshold: float = SCORE_THRESHOLD) -> list:
+    """Merge overlapping results into disjoint regions sorted by start.
+
+    Each region covers the union of its overlapping results, so no part of a
+    detected entity is left in clear text; it takes the entity type and score
+    of its highest-scoring result (the longer span wins ties). Returns
+    (start, end, entity_type, score) tuples.
+    """
+    candidates = sorted(
+        (r for r in analyzer_results if r.score > threshold and r.end > r.start),
+        key=lambda r: r.start,
+    )
+    regions = []
+    best = None
+    for result in candidates:
+        if best is not None and result.start < end:
+            end = max(end, result.end)
+            if (result.score, result.end - result.start) > (best.score, best.end - best.start):
+                best = result
+            continue
+        if best is not None:
+            regions.append((start, end, best.entity_type, best.score))
+        start, end, best = result.start, result.end, result
+    if best is not None:
+        regions.append((start, end, best.entity_type, best.score))
+    return regions
+
+
+def redact(text: str, analyzer_results, threshold: float = SCORE_THRESHOLD,
+           placeholder_map: PlaceholderMap = None) -> RedactionResult:
+    """Replace detected entities with placeholders in a single pass over `text`.
+
+    Pass a `placeholder_map` to keep placeholders consistent across calls.
+    """
+    if placeholder_map is None:
+        placeholder_map = PlaceholderMap()
+
+    parts = []
+    spans = []
+    position = 0
+    for start, end, entity_type, score in resolve_overlaps(analyzer_results, threshold):
+        placeholder = placeholder_map.placeholder_for(entity_type, text[start:end])
+        parts.append(text[position:start])
+        parts.append(placeholder)
+        spans.append(RedactedSpan(start, end, entity_type, placeholder, score))
+        position = end
+    parts.append(text[position:])
+
+    used = {span.placeholder for span in spans}
+    placeholders = {
+        placeholder: original
+        for placeholder, original in placeholder_map.originals.items()
+        if placeholder in used
+    }
+    return RedactionResult("".join(parts), spans, placeholders)
+
+
+def reidentify(text: str, placeholders: dict):
+    """Put original values back in place of placeholders in one scan of `text`.
+
+    Tokens are matched whole, so {PERSON_1} can never corrupt {PERSON_10}.
+    Returns the restored text and the placeholder tokens that had no mapping
+    (e.g. invented by the LLM), which are left as they are.
+    """
+    unresolved = []
+
+    def _lookup(match):
+        token = match.group(0)
+        value = placeholders.get(token)
+        if value is None:
+            unresolved.append(token)
+            return token
+        return value
+
+    return PLACEHOLDER_PATTERN.sub(_lookup, text), unresolved
+
+
+class StreamingReidentifier:
+    """Re-identifies LLM output as it streams in.
+
+    Text that could be the start of a placeholder split across deltas is held
+    back until the placeholder is complete, so callers only ever see restored text.
+    """
+    MAX_PLACEHOLDER_LENGTH = 64
+
+    def __init__(self, placeholders: dict):
+        self.placeholders = placeholders
+        self.unresolved = []
+        self._carry = ""
+
+    def feed(self, delta: str) -> str:
+        text = self._carry + delta
+        self._carry = ""
+        cut = text.rfind("{")
+        if cut != -1 and "}" not in text[cut:] and len(text) - cut < self.MAX_PLACEHOLDER_LENGTH:
+            text, self._carry = text[:cut], text[cut:]
+        return self._restore(text)
+
+    def flush(self) -> str:
+        text, self._carry = self._carry, ""
+        return self._restore(text)
+
+    def _restore(self, text: str) -> str:
+        if not text:
+            return text
+        restored, unresolved = reidentify(text, self.placeholders)
+        self.unresolved.extend(unresolved)
+        return restored
+
+
+class IncrementalRedactor:
+    """Redacts a transcript while it is being dictated, one chunk at a time.
+
+    Each new chunk is analyzed together with the last `OVERLAP_CHARS` of text
+    before it, so an entity split across two chunks is still detected whole.
+    Detections accumulate for the session and overlaps are merged only when a
+    result is requested, so re-detections in the overlap never lose coverage.
+    One PlaceholderMap is kept for the whole session.
+    """
+    OVERLAP_CHARS = 200
+
+    def __init__(self, analyze, threshold: float = SCORE_THRESHOLD):
+        self.analyze = analyze  # text -> analyzer results with start/end/entity_type/score
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.text = ""
+            self.placeholder_map = PlaceholderMap()
+            self.chunks = 0
+            self.analyze_seconds = 0.0
+            self._detections = []
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def add(self, chunk: str):
+        """Append a chunk of transcript and analyze it with its overlap window"""
+        chunk = self.normalize(chunk)
+        if not chunk:
+            return
+        text = f"{self.text} {chunk}" if self.text else chunk
+        window_start = max(0, len(self.text) - self.OVERLAP_CHARS)
+        if window_start:
+            # Start the window on a word boundary
+            window_start = self.text.rfind(" ", 0, window_start) + 1
+
+        started = time.perf_counter()
+        results = self.analyze(text[window_start:])
+        elapsed = time.perf_counter() - started
+
+        # Text and detections are only committed together, so a failed analysis
+        # leaves the session text behind the transcript rather than unredacted
+        with self._lock:
+            self._detections.extend(
+                Detection(r.start + window_start, r.end + window_start, r.entity_type, r.score)
+                for r in results
+            )
+            self.text = text
+            self.chunks += 1
+            self.analyze_seconds += elapsed
+
+    def result_for(self, transcript: str):
+        """The session's RedactionResult if it covers exactly `transcript` (ignoring whitespace), else None"""
+        with self._lock:
+            if not self.text or self.normalize(transcript) != self.text:
+                return None
+            return redact(self.text, self._detections, self.threshold, self.placeholder_map)
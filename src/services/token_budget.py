@@ -0,0 +1,81 @@
+import functools
+import re
+from utils.config import setup_logger
+
+logger = setup_logger(__name__)
+
+CHARS_PER_TOKEN = 4       # Rough ratio for English, used when no tokenizer is available
+TOKENS_PER_MESSAGE = 4    # Chat formatting overhead per message
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for `model`, or None if it cannot be loaded.
+
+    tiktoken downloads its BPE tables on first use, which fails on offline
+    machines; counts then fall back to a character-based estimate.
+    """
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Not an OpenAI model (e.g. a local Ollama model): close enough for budgeting
+            return tiktoken.get_encoding('o200k_base')
+    except Exception as e:
+        logger.warning(f"No tokenizer for {model} ({e}); estimating token counts")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: list, model: str) -> int:
+    return sum(count_tokens(message['content'], model) + TOKENS_PER_MESSAGE for message in messages)
+
+
+def split_sentences(text: str, max_tokens: int, model: str) -> list:
+    """Split `text` into chunks of at most `max_tokens`, breaking only between sentences.
+
+    A single sentence longer than the budget is split between words.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence in _SENTENCE_END.split(text.strip()):
+        tokens = count_tokens(sentence, model) + 1
+        if tokens > max_tokens:
+            pieces = _split_words(sentence, max_tokens, model)
+        else:
+            pieces = [(sentence, tokens)]
+        for piece, piece_tokens in pieces:
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _split_words(sentence: str, max_tokens: int, model: str) -> list:
+    pieces = []
+    words = []
+    tokens = 0
+    for word in sentence.split():
+        word_tokens = count_tokens(word, model) + 1
+        if words and tokens + word_tokens > max_tokens:
+            pieces.append((" ".join(words), tokens))
+            words, tokens = [], 0
+        words.append(word)
+        tokens += word_tokens
+    if words:
+        pieces.append((" ".join(words), tokens))
+    return pieces
@@ -1,98 +1,232 @@
 from datetime import datetime
+import itertools
 import os
 from pathlib import Path
-import platform
-import sys
+import queue
+import threading
 import time
 import numpy as np
 import soundfile as sf
-from PyQt6.QtCore import QObject, pyqtSignal, QThread
-from utils.config import setup_logger
+from PyQt6.QtCore import QCoreApplication, QObject, QThreadPool, pyqtSignal
+from services.backpressure import BackpressureController
+from services.model_manager import WhisperModelManager
+from services.parallel_transcription import ParallelTranscriber
+from services.vad import SpeechSegmenter
+from utils.config import (
+    setup_logger,
+    LIVE_MAX_LAG,
+    LIVE_MAX_SEGMENT,
+    LIVE_MIN_MODEL_SIZE,
+    LIVE_TARGET_RTF,
+    PARALLEL_MIN_DURATION,
+    TRANSCRIBE_WORKERS,
+    WHISPER_MODEL_SIZE,
+)
+from utils import metrics
+from utils.worker_base import BaseWorker
 
+QUEUE_WAIT = metrics.histogram('transcription_queue_wait_seconds', "Time a job spent queued before inference")
+INFERENCE = metrics.histogram('transcription_inference_seconds', "Whisper inference time per job")
+REAL_TIME_FACTOR = metrics.histogram(
+    'transcription_real_time_factor', "Inference time divided by audio duration",
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 5),
+)
+QUEUE_DEPTH = metrics.gauge('transcription_queue_depth', "Jobs waiting for the transcription worker")
+JOBS = metrics.counter('transcription_jobs_total', "Transcription jobs completed")
+JOB_ERRORS = metrics.counter('transcription_errors_total', "Transcription jobs that failed")
+AUDIO_SECONDS = metrics.counter('transcription_audio_seconds_total', "Seconds of audio sent to Whisper")
+CAPTURE_BACKLOG = metrics.gauge('capture_backlog_seconds', "Live audio waiting in the capture buffer")
+SILENCE_DROPPED = metrics.counter('vad_silence_dropped_seconds_total', "Silence dropped before transcription")
+LIVE_LAG = metrics.histogram('transcription_lag_seconds', "Delay from the end of a live chunk to its text")
+LIVE_RTF = metrics.gauge('transcription_rtf_ewma', "Smoothed real-time factor of the live session")
+LIVE_SEGMENT = metrics.gauge('live_segment_max_seconds', "Current forced-cut length of live segments")
+COALESCED = metrics.counter('transcription_chunks_coalesced_total', "Queued live chunks merged into an earlier job")
+DOWNGRADES = metrics.counter('transcription_model_downgrades_total', "Live sessions switched to a smaller model")
 
-class TranscriptionWorker(QThread):
-    result_ready = pyqtSignal(str)
-    error_occurred = pyqtSignal(str)
-    
-    def __init__(self, model, audio_data):
-        super().__init__()
-        self.model = model
+
+def prepare_audio(audio_data: np.ndarray) -> np.ndarray:
+    """Scale down audio that clips and convert to the float32 Whisper expects (no copy if already fine)"""
+    peak = np.abs(audio_data).max()
+    if peak > 1.0:
+        audio_data = audio_data / peak
+    return np.asarray(audio_data, dtype=np.float32)
+
+
+class TranscriptionJob:
+    """A chunk of audio queued for transcription"""
+    CHUNK = "chunk"  # Live streaming chunk
+    FULL = "full"    # Complete recording loaded from file
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind: str, audio_data: np.ndarray, transcriber=None):
+        self.job_id = next(self._ids)
+        self.kind = kind
         self.audio_data = audio_data
-        self.SAMPLE_RATE = 16000
-        self.is_running = True
+        self.transcriber = transcriber  # Optional ParallelTranscriber; else the shared model
+        self.enqueued_at = time.perf_counter()
+        self.chunks = 1  # Live chunks merged into this job
+
+    @classmethod
+    def merge(cls, jobs: list):
+        """One chunk job covering `jobs` in order; it keeps the id and wait of the oldest"""
+        merged = cls(cls.CHUNK, np.concatenate([job.audio_data for job in jobs]))
+        merged.job_id = jobs[0].job_id
+        merged.enqueued_at = jobs[0].enqueued_at
+        merged.chunks = sum(job.chunks for job in jobs)
+        return merged
+
+
+class TranscriptionWorker(BaseWorker):
+    """Long-lived worker that runs queued transcription jobs one at a time, in order.
+
+    Results are emitted through `signals.result` as a dict with the job id,
+    kind, text and timings; queue depth and per-job latency go to `signals.progress`.
+    When live chunks pile up they are merged into one job of up to
+    `COALESCE_SECONDS`: Whisper pads every call to a 30 s window, so one call
+    on the merged audio costs little more than one on a single short chunk.
+    """
+    SAMPLE_RATE = 16000
+    COALESCE_SECONDS = 30
+
+    def __init__(self, model_provider):
+        super().__init__()
+        # The pool must not delete the worker; the service owns it for the whole session
+        self.setAutoDelete(False)
+        self.model_provider = model_provider
+        self.jobs = queue.Queue()
+        self._held = None  # Job taken off the queue while coalescing that runs next
 
         self.logger = setup_logger(__name__)
-    
+
+    def submit(self, job: TranscriptionJob) -> int:
+        """Queue a job and return the resulting queue depth"""
+        self.jobs.put(job)
+        return self.jobs.qsize()
+
+    def queue_depth(self) -> int:
+        return self.jobs.qsize()
+
     def stop(self):
-        self.is_running = False
-        self.wait()
-    
-    # def _save_audio_chunk(self, audio_data: np.ndarray):
-    #     try:
-    #         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    #         wav_path = f'audio_chunks/{timestamp}.wav'
-    #         sf.write(wav_path, audio_data, self.SAMPLE_RATE)
-    #     except Exception as e:
-    #         self.error_occurred.emit(f"Error saving audio chunk: {e}")
+        super().stop()
+        self.jobs.put(None)  # Wake the worker if it is waiting for a job
 
     def run(self):
+        self.logger.info("Transcription worker started")
         try:
-            if not self.is_running:
-                return
-            
-            self.logger.info("Individual worker thread started")
-            # self._save_audio_chunk(self.audio_data)
-            
-            if len(self.audio_data) < 16000:
-                self.error_occurred.emit("Audio chunk too short")
-                return
+            while self.is_running:
+                job = self._next_job()
+                if job is None:
+                    break
+                self._run_job(job)
+        finally:
+            self.logger.info("Transcription worker finished")
+            self.signals.finished.emit()
 
-            self.logger.info(f"Processing audio chunk of length {len(self.audio_data)}")
-               
-            if np.abs(self.audio_data).max() > 1.0:
-                self.audio_data = self.audio_data / np.abs(self.audio_data).max()
+    def _next_job(self):
+        job, self._held = self._held, None
+        if job is None:
+            job = self.jobs.get()
+        if job is None or job.kind != TranscriptionJob.CHUNK:
+            return job
 
+        batch = [job]
+        samples = len(job.audio_data)
+        limit = self.COALESCE_SECONDS * self.SAMPLE_RATE
+        while True:
             try:
-                self.logger.info("Starting Whisper transcription...")
-                start_time = time.time()
+                queued = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if queued is None:
+                self.jobs.put(None)  # Keep the stop request for the next loop
+                break
+            if queued.kind != TranscriptionJob.CHUNK or samples + len(queued.audio_data) > limit:
+                self._held = queued
+                break
+            batch.append(queued)
+            samples += len(queued.audio_data)
 
-                # Convert audio data to the format Whisper expects
-                audio_float32 = np.array(self.audio_data, dtype=np.float32)
-                result = self.model.transcribe(
+        if len(batch) == 1:
+            return job
+        COALESCED.inc(len(batch) - 1)
+        self.logger.debug("Merged %d queued chunks into job %d (%.1fs)", len(batch), job.job_id, samples / self.SAMPLE_RATE)
+        return TranscriptionJob.merge(batch)
+
+    def _run_job(self, job: TranscriptionJob):
+        started_at = time.perf_counter()
+        wait_time = started_at - job.enqueued_at
+        audio_data = job.audio_data
+        job.audio_data = None
+        audio_seconds = len(audio_data) / self.SAMPLE_RATE
+        text = ""
+
+        try:
+            if len(audio_data) < self.SAMPLE_RATE:
+                self.signals.error.emit("Audio chunk too short")
+                return
+
+            self.logger.debug("Processing job %d (%s) of length %d", job.job_id, job.kind, len(audio_data))
+
+            audio_float32 = prepare_audio(audio_data)
+
+            if job.transcriber is not None:
+                text = job.transcriber.transcribe(
+                    audio_float32,
+                    progress_callback=self._report_segment_progress,
+                    should_stop=lambda: not self.is_running,
+                )
+            else:
+                model = self.model_provider()
+                if model is None:
+                    raise RuntimeError("Whisper model is not loaded")
+
+                result = model.transcribe(
                     audio_float32,
                     language='en'
                 )  # Specify language if needed
 
-                self.logger.info(f"Whisper transcription took {time.time() - start_time} seconds")
-                self.logger.info("Transcription completed:", result)
-                
                 if result and "text" in result:
                     text = result["text"].strip()
-                    if text:
-                        self.logger.info(f"Emitting result: {text}")
-                        self.result_ready.emit(text)
                 else:
-                    self.logger.info("No text in result:", result)
-            except Exception as whisper_error:
-                self.logger.error(f"Whisper transcription error: {whisper_error}")
-                self.error_occurred.emit(f"Whisper transcription error: {whisper_error}")
-            
-            self.logger.info("Worker thread finished")
-
-            # Clear resources after processing
-            del self.audio_data
-            self.audio_data = None
+                    self.logger.info("No text in result: %r", result)
 
         except Exception as e:
-            self.logger.error(f"Error in worker thread: {e}")
-            self.logger.error(f"Error type: {type(e)}")
-            import traceback
-            self.logger.debug(traceback.format_exc())
-            self.error_occurred.emit(f"Transcription error: {e}")
+            JOB_ERRORS.inc()
+            self.logger.error("Whisper transcription error: %s", e, exc_info=True)
+            self.signals.error.emit(f"Whisper transcription error: {e}")
+
         finally:
-            self.is_running = False
-            del self.audio_data
-            self.audio_data = None
+            inference_time = time.perf_counter() - started_at
+            depth = self.jobs.qsize()
+            JOBS.inc()
+            QUEUE_WAIT.observe(wait_time)
+            INFERENCE.observe(inference_time)
+            QUEUE_DEPTH.set(depth)
+            if audio_seconds:
+                AUDIO_SECONDS.inc(audio_seconds)
+                REAL_TIME_FACTOR.observe(inference_time / audio_seconds)
+            self.logger.info(
+                "Job %d (%s) done: waited %.2fs, transcribed in %.2fs, %d job(s) queued",
+                job.job_id, job.kind, wait_time, inference_time, depth,
+            )
+            self.signals.progress.emit(
+                f"Transcribed chunk {job.job_id} in {inference_time:.1f}s "
+                f"(waited {wait_time:.1f}s, queue depth {depth})"
+            )
+            self.signals.result.emit({
+                'job_id': job.job_id,
+                'kind': job.kind,
+                'chunks': job.chunks,
+                'text': text,
+                'audio_seconds': audio_seconds,
+                'wait_time': wait_time,
+                'inference_time': inference_time,
+                'queue_depth': depth,
+            })
+
+    def _report_segment_progress(self, done: int, total: int, seconds: float):
+        self.signals.progress.emit(f"Transcribed segment {done}/{total} ({seconds:.1f}s)")
 
 class TranscriptionService(QObject):
     transcription_chunk_ready = pyqtSignal(str)
@@ -103,177 +237,336 @@ class TranscriptionService(QObject):
     
     SAMPLE_RATE = 16000
     MIN_AUDIO_LENGTH = SAMPLE_RATE
-    OPTIMAL_CHUNK_DURATION = 6
+    MAX_SEGMENT_DURATION = 12  # Continuous speech is cut at this length even without a pause
+    CAPTURE_POLL_INTERVAL = 0.05  # Seconds the capture consumer sleeps when no audio is waiting
     
-    def __init__(self, model_size="small"):
+    def __init__(self, model_size=WHISPER_MODEL_SIZE):
         super().__init__()
         
         self.model = None
         self.model_size = model_size
-        self.buffer = []
-        self.buffer_threshold = self.SAMPLE_RATE * self.OPTIMAL_CHUNK_DURATION
+        self.base_model_size = model_size  # Restored after a session that fell back to a smaller model
+        self._model_lock = threading.Lock()
+        self.session = 0  # Counts live sessions, so a late model switch cannot cross into the next one
+        self.model_manager = WhisperModelManager.instance()
+        # Live audio is cut at pauses; silence is dropped before it reaches the model
+        self.segmenter = SpeechSegmenter(
+            sample_rate=self.SAMPLE_RATE,
+            max_segment_s=self.MAX_SEGMENT_DURATION,
+            min_segment_s=self.MIN_AUDIO_LENGTH / self.SAMPLE_RATE,
+        )
+        # Adapts segment length and model size when live transcription falls behind
+        self.backpressure = BackpressureController(
+            base_segment_s=self.MAX_SEGMENT_DURATION,
+            max_segment_s=LIVE_MAX_SEGMENT,
+            model_size=model_size,
+            min_model_size=LIVE_MIN_MODEL_SIZE,
+            target_rtf=LIVE_TARGET_RTF,
+            max_lag_s=LIVE_MAX_LAG,
+        )
         self.is_processing = False
-        self.worker = None
         self.transcription_text = "" # Store complete transcription      
 
-        # Keep track of workers to prevent garbage collection
-        self.workers = []
+        # A single long-lived worker consumes jobs in order so the model is never
+        # run concurrently; it is started on first use
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(1)
+        self.worker = None
+        self.pending_jobs = 0
+        self._jobs_lock = threading.Lock()  # Jobs are queued from the capture thread too
+
+        # Live audio is read from the capture buffer on its own thread, off the Qt event loop
+        self.capture_buffer = None
+        self.capture_thread = None
         self._ensure_audio_directory()
         
         self.logger = setup_logger(__name__)
-        self.logger.info("AudioService initialized")
+        self.logger.info("TranscriptionService initialized")
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
 
     def _load_model(self):
-        self.logger.info("Loading Whisper model...")
-        self.progress_message.emit("Loading Whisper model...")
-
-        try:           
-            if getattr(sys, 'frozen', False):
-                # If running from bundle
-                if platform.system() == 'Darwin':  # macOS
-                    bundle_dir = os.path.dirname(sys.executable)
-                    resources_dir = os.path.join(os.path.dirname(bundle_dir), 'Resources')
-                    model_path = os.path.join(resources_dir, 'resources', 'models')
-                else:  # Windows
-                    bundle_dir = os.path.dirname(sys.executable)
-                    resources_dir = os.path.join(bundle_dir, '_internal')
-                    model_path = os.path.join(resources_dir, 'resources', 'models')
-            
-                self.logger.info(f"Running as bundled app on {platform.system()}")
-                self.logger.info(f"Loading models from: {model_path}")
-            else:
-                # If running from source
-                model_path = os.path.join(os.path.dirname(__file__), '..', '..', 'resources', 'models')
-                    
-            # Verify the model directory exists
-            if not os.path.exists(model_path):
-                raise Exception(f"Models directory not found at {model_path}")
-            
-            import whisper
-            self.model = whisper.load_model(
-                name=self.model_size,
-                download_root=model_path,
-                in_memory=True,
+        """Acquire the shared Whisper model; only the first session pays for the load"""
+        if self.model is not None:
+            return
+
+        cached = self.model_manager.is_loaded(self.model_size)
+        if not cached:
+            self.logger.info("Loading Whisper model...")
+            self.progress_message.emit("Loading Whisper model...")
+
+        try:
+            started = time.perf_counter()
+            self.model = self.model_manager.acquire(self.model_size)
+            elapsed = time.perf_counter() - started
+
+            stats = self.model_manager.stats()
+            self.logger.info(
+                f"Whisper model ready in {elapsed:.2f}s "
+                f"({'cached' if cached else 'loaded'}; hits={stats['hits']}, misses={stats['misses']})"
             )
-            self.logger.info("Whisper model loaded successfully")
-            self.progress_message.emit("Whisper model loaded successfully")
+            self.progress_message.emit(f"Whisper model ready in {elapsed:.2f}s")
             
         except Exception as e:
             self.error_occurred.emit(f"Failed to load Whisper model: {str(e)}")
             raise
     
     def _unload_model(self):
-        """Safely unload Whisper model"""
-        if self.model is not None:
-            self.logger.info("Unloading Whisper model...")
-            self.progress_message.emit("Unloading Whisper model...")
-            try:
-                del self.model
+        """Release the shared Whisper model; the manager evicts it once idle"""
+        with self._model_lock:
+            if self.model is not None:
                 self.model = None
-                import gc
-                gc.collect()
-                self.logger.debug("Whisper model unloaded successfully")
-                self.progress_message.emit("Whisper model unloaded successfully")
-            except Exception as e:
-                self.logger.error(f"Error unloading Whisper model: {e}")
+                self.model_manager.release(self.model_size)
+                self.logger.debug("Whisper model released")
+            self.model_size = self.base_model_size
+
+    def _switch_model(self, model_size: str, session: int):
+        """Background thread: load a smaller model and hand it to live session `session`"""
+        try:
+            model = self.model_manager.acquire(model_size)
+        except Exception as e:
+            self.logger.error("Could not load Whisper '%s' for the live session: %s", model_size, e)
+            return
+        with self._model_lock:
+            if self.model is None or not self.is_processing or session != self.session:
+                # The session ended while the model loaded; a new one keeps its own model
+                self.model_manager.release(model_size)
+                return
+            previous, self.model, self.model_size = self.model_size, model, model_size
+            self.model_manager.release(previous)
+        DOWNGRADES.inc()
+        self.logger.info("Live transcription switched from '%s' to '%s'", previous, model_size)
+        self.progress_message.emit(f"Switched to the '{model_size}' model to keep up with live audio")
     
     def _ensure_audio_directory(self):
         chunk_dir = os.path.join(os.path.expanduser('~/Documents'), 'medicalapp', 'audio_chunks')
         os.makedirs(chunk_dir, exist_ok=True)
 
+    def attach_capture_buffer(self, capture_buffer):
+        """Read live audio from an SPSCRingBuffer filled by the audio callback"""
+        self.capture_buffer = capture_buffer
+
     def start_processing(self):
         """Start streaming process and load model"""
         try:
             self._load_model()  # Load model once at start
+            with self._model_lock:
+                self.session += 1  # Model switches still loading for an older session are dropped
+            self._ensure_worker()
+            self.backpressure.reset(self.model_size)
+            self._apply_segment_duration()
+            self.segmenter.reset()
+            self.segmenter.reset_stats()
             self.is_processing = True
-            self.buffer = []
+
+            if self.capture_buffer is not None:
+                self.capture_buffer.discard()  # Stale audio from a previous session
+                self.capture_thread = threading.Thread(
+                    target=self._consume_capture, name="capture-consumer", daemon=True
+                )
+                self.capture_thread.start()
             self.processing_status.emit(True)
         except Exception as e:
             self.error_occurred.emit(f"Failed to start processing: {str(e)}")
             self.is_processing = False
 
     def stop_processing(self):
-        """Stop processing and cleanup resources"""
+        """Stop streaming; the session is finalized once queued chunks are transcribed"""
         try:
             self.is_processing = False
+            if self.capture_thread is not None:
+                # The consumer drains what the callback already wrote before it exits
+                self.capture_thread.join()
+                self.capture_thread = None
+                stats = self.capture_buffer.stats()
+                self.logger.info(
+                    f"Capture buffer: peak backlog {stats['peak_fill'] / self.SAMPLE_RATE:.2f}s, "
+                    f"{stats['overruns']} sample(s) dropped, {stats['empty_polls']} empty poll(s)"
+                )
+                if stats['overruns']:
+                    self.progress_message.emit(
+                        f"Warning: {stats['overruns'] / self.SAMPLE_RATE:.1f}s of audio was dropped"
+                    )
             self._process_final_buffer()
 
-            # Clean up workers
-            for worker in self.workers:
-                try:
-                    if worker.isRunning():
-                        worker.stop()
-                    worker.deleteLater()
-                    self.workers.remove(worker)
-                except Exception as e:
-                    self.logger.error(f"Error cleaning up worker: {e}")
-            
-            self.workers.clear()
-            
-            # Emit complete transcription
-            if self.transcription_text:
-                self.transcription_complete.emit(self.transcription_text.strip())
-                self.transcription_text = ""
-
-            # Unload model after all processing is complete
-            self._unload_model()
-            self.processing_status.emit(False)
+            if self.pending_jobs == 0:
+                self._finish_session()
+            else:
+                self.progress_message.emit(f"Waiting for {self.pending_jobs} queued chunk(s)...")
             
         except Exception as e:
             self.error_occurred.emit(f"Error stopping processing: {str(e)}")
 
+    def _finish_session(self):
+        # Emit complete transcription
+        if self.transcription_text:
+            self.transcription_complete.emit(self.transcription_text.strip())
+            self.transcription_text = ""
+
+        # Unload model after all processing is complete
+        self._unload_model()
+        self.processing_status.emit(False)
+
     def process_audio_chunk(self, audio_data: np.ndarray):
         if not self.is_processing:
             return
-        self.buffer.extend(audio_data)
-        
-        if len(self.buffer) >= self.buffer_threshold:
-            self._process_buffer()
+        self._segment_audio(audio_data)
 
-    def _process_buffer(self):
-        if not self.buffer:
-            return
+    def _segment_audio(self, audio_data: np.ndarray):
+        # Resized here, on the thread that feeds the segmenter, never from the result handler
+        if int(self.backpressure.segment_s * self.SAMPLE_RATE) != self.segmenter.max_segment:
+            self._apply_segment_duration()
+        for segment in self.segmenter.process(audio_data):
+            self._submit_segment(segment)
 
-        try:
-            audio_data = np.array(self.buffer, dtype=np.float32)
-            self.buffer = []
+    def _apply_segment_duration(self):
+        self.segmenter.set_max_segment_duration(self.backpressure.segment_s)
+        LIVE_SEGMENT.set(self.backpressure.segment_s)
 
-            self.worker = TranscriptionWorker(self.model, audio_data)
-            self.worker.result_ready.connect(self._handle_transcription)
-            self.worker.error_occurred.connect(self._handle_error)
+    def _consume_capture(self):
+        """Capture thread: feed the segmenter straight from the capture buffer"""
+        while True:
+            streaming = self.is_processing
+            audio_data = self.capture_buffer.read()
+            CAPTURE_BACKLOG.set(self.capture_buffer.available() / self.SAMPLE_RATE)
+            if len(audio_data):
+                self._segment_audio(audio_data)
+            elif not streaming:
+                break
+            else:
+                time.sleep(self.CAPTURE_POLL_INTERVAL)
 
-            # Add debug signals
-            self.worker.finished.connect(lambda: self._cleanup_worker(self.worker))
-            
-            # Keep reference to prevent garbage collection
-            self.workers.append(self.worker)
-            self.worker.start()
-            self.progress_message.emit('Start stream processing...')
+    def _submit_segment(self, segment: np.ndarray):
+        try:
+            self._submit(TranscriptionJob(TranscriptionJob.CHUNK, segment))
         except Exception as e:
             self.error_occurred.emit(f"Buffer processing error: {e}")
 
     def process_full_audio(self, audio_data: np.ndarray):
         self.progress_message.emit('Start full audio processing...')
         try:
-            self._load_model()
+            duration = len(audio_data) / self.SAMPLE_RATE
+            if TRANSCRIBE_WORKERS > 1 and duration >= PARALLEL_MIN_DURATION:
+                # Long recordings are split at silence and transcribed across processes
+                transcriber = ParallelTranscriber(self.model_size, self.model_manager.model_path())
+                self.progress_message.emit(
+                    f"Transcribing {duration / 60:.1f} min of audio on {TRANSCRIBE_WORKERS} processes..."
+                )
+                self._submit(TranscriptionJob(TranscriptionJob.FULL, audio_data, transcriber))
+                return
 
-            worker = TranscriptionWorker(self.model, audio_data)
-            worker.result_ready.connect(self.transcription_complete.emit)
-            worker.error_occurred.connect(self.error_occurred.emit)
-            
-            # Keep reference to prevent garbage collection
-            self.workers.append(worker)
-            worker.finished.connect(lambda: self._cleanup_worker(worker))
-            
-            worker.start()
-            self.logger.info("Thread is started")
-            self.progress_message.emit("Thread is started")
+            if self.model is None:
+                self._load_model()
+            self._submit(TranscriptionJob(TranscriptionJob.FULL, audio_data))
         except Exception as e:
             self.error_occurred.emit(f"Error processing full audio: {e}")
 
+    def transcribe(self, audio_data: np.ndarray, parallel: bool = True, should_stop=None) -> str:
+        """Transcribe a complete recording and return its text, blocking the caller.
+
+        Needs no Qt event loop, so it can serve requests from any thread. Calls
+        on the shared model are serialized through the model manager. With
+        `parallel`, long recordings go to a pool of worker processes that each
+        load their own model; callers that run many jobs at once (the server)
+        pass False so every job shares one model. `should_stop` is polled
+        before inference starts and between parallel segments.
+        """
+        if len(audio_data) < self.MIN_AUDIO_LENGTH:
+            raise ValueError("Audio too short to transcribe")
+        started = time.perf_counter()
+        audio_float32 = prepare_audio(audio_data)
+        duration = len(audio_float32) / self.SAMPLE_RATE
+
+        if parallel and TRANSCRIBE_WORKERS > 1 and duration >= PARALLEL_MIN_DURATION:
+            # Each worker process loads its own model, so the shared one stays free
+            transcriber = ParallelTranscriber(self.model_size, self.model_manager.model_path())
+            text = transcriber.transcribe(audio_float32, should_stop=should_stop)
+        else:
+            model = self.model_manager.acquire(self.model_size)
+            try:
+                with self.model_manager.inference_lock(self.model_size):
+                    # Jobs queue on the lock; one abandoned while waiting never runs
+                    if should_stop is not None and should_stop():
+                        raise RuntimeError("Transcription cancelled")
+                    result = model.transcribe(audio_float32, language='en')
+            finally:
+                self.model_manager.release(self.model_size)
+            text = (result or {}).get('text', "").strip()
+
+        inference_time = time.perf_counter() - started
+        JOBS.inc()
+        INFERENCE.observe(inference_time)
+        AUDIO_SECONDS.inc(duration)
+        REAL_TIME_FACTOR.observe(inference_time / duration)
+        return text
+
+    def _ensure_worker(self):
+        if self.worker is None:
+            self.worker = TranscriptionWorker(lambda: self.model)
+            self.worker.signals.result.connect(self._handle_result)
+            self.worker.signals.error.connect(self._handle_error)
+            self.worker.signals.progress.connect(self.progress_message.emit)
+            self.thread_pool.start(self.worker)
+        return self.worker
+
+    def _submit(self, job: TranscriptionJob):
+        worker = self._ensure_worker()
+        with self._jobs_lock:
+            self.pending_jobs += 1
+        depth = worker.submit(job)
+        QUEUE_DEPTH.set(depth)
+        self.logger.debug("Queued job %d (%s), queue depth %d", job.job_id, job.kind, depth)
+        self.progress_message.emit(f"Queued audio for transcription (queue depth {depth})")
+
     def _process_final_buffer(self):
-        if len(self.buffer) >= self.MIN_AUDIO_LENGTH:
-            self._process_buffer()
+        for segment in self.segmenter.flush():
+            self._submit_segment(segment)
+        stats = self.segmenter.stats()
+        self.logger.info(
+            "VAD kept %.1fs of speech in %d segment(s), dropped %.1fs of silence",
+            stats['speech_seconds'], stats['segments'], stats['silence_dropped_seconds'],
+        )
+        SILENCE_DROPPED.inc(stats['silence_dropped_seconds'])
+
+    def _handle_result(self, result: dict):
+        with self._jobs_lock:
+            self.pending_jobs = max(0, self.pending_jobs - result['chunks'])
+
+        if result['kind'] == TranscriptionJob.FULL:
+            self.transcription_complete.emit(result['text'])
+        else:
+            self._observe_live_result(result)
+            if result['text']:
+                self._handle_transcription(result['text'])
+
+        # Release the model once the queue has drained and we are not streaming
+        if self.pending_jobs == 0 and not self.is_processing:
+            self.logger.debug("No queued jobs, finishing session...")
+            self._finish_session()
+
+    def _observe_live_result(self, result: dict):
+        controller = self.backpressure
+        lag = result['wait_time'] + result['inference_time']
+        LIVE_LAG.observe(lag)
+        if not self.is_processing:
+            return
+        model_size = controller.model_size
+        changed = controller.observe(result['audio_seconds'], result['inference_time'], result['wait_time'])
+        LIVE_RTF.set(controller.rtf)
+        if not changed:
+            return
+
+        self.logger.info(
+            "Live transcription at RTF %.2f with %.1fs lag: segments now up to %.1fs, model '%s'",
+            controller.rtf, lag, controller.segment_s, controller.model_size,
+        )
+        if controller.model_size != model_size:
+            threading.Thread(
+                target=self._switch_model, args=(controller.model_size, self.session),
+                name="whisper-fallback", daemon=True
+            ).start()
 
     def _handle_transcription(self, text: str):
         self.transcription_text += f" {text}"
@@ -282,39 +575,18 @@ class TranscriptionService(QObject):
     def _handle_error(self, error_message: str):
         self.error_occurred.emit(error_message)
 
-    def _cleanup_worker(self, worker):
-        """Clean up the worker after it's done"""
-        try:
-            if worker in self.workers:
-                if worker.isRunning():
-                    worker.stop()
-                worker.deleteLater()
-                self.workers.remove(worker)
-                       
-            # If this was the last worker and we're not streaming, unload the model
-            if not self.workers and not self.is_processing:
-                self.logger.debug("No active workers, unloading model...")
-                self.progress_message.emit("No active workers, unloading model...")
-                self._unload_model()
-        except Exception as e:
-            self.logger.error(f"Error cleaning up worker: {e}")
+    def shutdown(self):
+        """Stop the worker thread; queued jobs are discarded"""
+        if self.worker is not None:
+            self.worker.stop()
+            self.thread_pool.waitForDone()
+            self.worker = None
+        self.pending_jobs = 0
 
     def __del__(self):
         """Ensure proper cleanup on deletion"""
         try:
-            # Stop all workers
-            for worker in self.workers[:]:
-                try:
-                    if worker.isRunning():
-                        worker.stop()
-                    worker.deleteLater()
-                except:
-                    pass
-            self.workers.clear()
-            
-            # Unload model
-            with self.model_lock:
-                if self.model is not None:
-                    self._unload_model()
+            self.shutdown()
+            self._unload_model()
         except:
-            pass
\ No newline at end of file
+            pass
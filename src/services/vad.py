@@ -0,0 +1,211 @@
+import numpy as np
+from utils.ring_buffer import RingBuffer
+
+
+class SpeechSegmenter:
+    """Energy-based voice activity detector that cuts a live stream into speech segments.
+
+    Incoming audio is split into fixed frames whose energy is computed in one
+    vectorized pass. A frame is speech when it is louder than both an absolute
+    floor and an adaptive noise floor. The noise floor is a low percentile of
+    the energy of every frame in the last `noise_window_s`, whatever the frame
+    was classified as (minimum statistics), so it follows a noisy room up as
+    well as a quiet one down. Speech is accumulated into a segment that
+    is emitted once a pause of `min_silence_ms` follows it, or when it reaches
+    `max_segment_s`. Silence between segments never reaches the model.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        min_silence_ms: int = 600,
+        min_speech_ms: int = 250,
+        pad_ms: int = 200,
+        max_segment_s: float = 12,
+        min_segment_s: float = 1.0,
+        threshold_db: float = -45.0,
+        noise_margin_db: float = 10.0,
+        noise_window_s: float = 8.0,
+        noise_percentile: float = 10.0,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.min_silence = int(sample_rate * min_silence_ms / 1000)
+        self.min_speech = int(sample_rate * min_speech_ms / 1000)
+        self.pad = int(sample_rate * pad_ms / 1000)
+        self.min_segment = int(sample_rate * min_segment_s)
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+
+        self.noise_percentile = noise_percentile
+        self.noise_floor_db = threshold_db - noise_margin_db
+        # Energies of recent frames in dB; kept across sessions, the room rarely changes
+        self._energy_history = RingBuffer(max(1, int(noise_window_s * 1000 / frame_ms)))
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._pre_roll = RingBuffer(max(self.pad, 1))
+        self.set_max_segment_duration(max_segment_s)
+        self.reset_stats()
+
+    def set_max_segment_duration(self, seconds: float):
+        """Change the forced cut length; an open segment is kept"""
+        self.max_segment = int(self.sample_rate * seconds)
+        pending = self._segment.read() if getattr(self, '_segment', None) is not None else None
+        # Room for the longest segment plus the trailing silence that closes it
+        capacity = self.max_segment + self.min_silence + self.pad
+        self._segment = RingBuffer(max(capacity, len(pending) if pending is not None else 0))
+        if pending is not None:
+            self._segment.write(pending)
+        else:
+            self.reset()
+
+    def reset(self):
+        self._segment.clear()
+        self._pre_roll.clear()
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._in_speech = False
+        self._speech_in_segment = 0
+        self._trailing_silence = 0
+
+    def reset_stats(self):
+        # Running totals in samples, for reporting
+        self.speech_samples_total = 0
+        self.silence_samples_dropped = 0
+        self.segments_emitted = 0
+
+    def process(self, audio_data: np.ndarray) -> list:
+        """Feed a block of audio; returns any speech segments that were completed"""
+        audio_data = np.asarray(audio_data, dtype=np.float32).reshape(-1)
+        if len(self._remainder):
+            audio_data = np.concatenate((self._remainder, audio_data))
+
+        n_frames = len(audio_data) // self.frame_length
+        usable = n_frames * self.frame_length
+        self._remainder = audio_data[usable:].copy()
+        if n_frames == 0:
+            return []
+
+        frames = audio_data[:usable].reshape(n_frames, self.frame_length)
+        is_speech = self._classify(frames)
+
+        # Walk runs of equal speech/silence frames rather than individual frames
+        segments = []
+        boundaries = np.flatnonzero(np.diff(is_speech)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [n_frames]))
+        for start, end in zip(starts, ends):
+            samples = audio_data[start * self.frame_length:end * self.frame_length]
+            if is_speech[start]:
+                self._on_speech(samples, segments)
+            else:
+                self._on_silence(samples, segments)
+        return segments
+
+    def flush(self) -> list:
+        """Emit the open segment, if any, at the end of a stream"""
+        segments = []
+        if self._in_speech:
+            self._emit(segments)
+        self.reset()
+        return segments
+
+    def stats(self) -> dict:
+        return {
+            'speech_seconds': self.speech_samples_total / self.sample_rate,
+            'silence_dropped_seconds': self.silence_samples_dropped / self.sample_rate,
+            'segments': self.segments_emitted,
+            'noise_floor_db': self.noise_floor_db,
+        }
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        energy_db = 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+        # Pauses between words keep the low percentile at the noise level even
+        # in continuous speech, while steady noise raises it to its own level
+        self._energy_history.write(energy_db)
+        self.noise_floor_db = float(np.percentile(self._energy_history.view(), self.noise_percentile))
+        threshold = max(self.threshold_db, self.noise_floor_db + self.noise_margin_db)
+        return energy_db > threshold
+
+    def _on_speech(self, samples: np.ndarray, segments: list):
+        if not self._in_speech:
+            # Start a segment with a little of the audio that preceded it
+            self._segment.clear()
+            self._segment.write(self._pre_roll.view())
+            self._pre_roll.clear()
+            self._in_speech = True
+            self._speech_in_segment = 0
+        self._trailing_silence = 0
+
+        while len(samples):
+            room = self.max_segment - len(self._segment)
+            if room <= 0:
+                # Continuous speech: force a cut and carry on in a new segment
+                self._emit(segments)
+                self._in_speech = True
+                room = self.max_segment
+            taken = samples[:room]
+            self._segment.write(taken)
+            self._speech_in_segment += len(taken)
+            samples = samples[room:]
+
+    def _on_silence(self, samples: np.ndarray, segments: list):
+        if not self._in_speech:
+            self.silence_samples_dropped += len(samples)
+            self._pre_roll.write(samples)
+            return
+
+        # Keep short pauses inside the segment; a long one closes it
+        needed = self.min_silence - self._trailing_silence
+        self._segment.write(samples[:needed])
+        self._trailing_silence += min(len(samples), needed)
+        if self._trailing_silence >= self.min_silence:
+            self._emit(segments)
+            rest = samples[needed:]
+            self.silence_samples_dropped += len(rest)
+            self._pre_roll.write(rest)
+
+    def _emit(self, segments: list):
+        # Trim the closing pause down to the padding
+        trim = max(0, self._trailing_silence - self.pad)
+        length = len(self._segment) - trim
+        if self._speech_in_segment >= self.min_speech and length > 0:
+            segment = self._segment.view(length)
+            if length < self.min_segment:
+                # Pad very short utterances with silence so they meet the model's minimum
+                segment = np.pad(segment, (0, self.min_segment - length))
+            else:
+                segment = segment.copy()
+            segments.append(segment)
+            self.segments_emitted += 1
+            self.speech_samples_total += self._speech_in_segment
+        self.silence_samples_dropped += trim
+        self._segment.clear()
+        self._in_speech = False
+        self._speech_in_segment = 0
+        self._trailing_silence = 0
+
+
+def split_at_silence(audio_data: np.ndarray, sample_rate: int = 16000, target_s: float = 30.0,
+                     search_s: float = 5.0, frame_ms: int = 30) -> list:
+    """Split a recording into (start, end) sample ranges of roughly `target_s` seconds.
+
+    Each cut is placed at the quietest frame within `search_s` of the target, so
+    words are not split between ranges.
+    """
+    frame_length = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio_data) // frame_length
+    frames = audio_data[:n_frames * frame_length].reshape(n_frames, frame_length)
+    # Row-wise sum of squares without materializing a squared copy of the recording
+    energy = np.einsum('ij,ij->i', frames, frames)
+
+    target = int(target_s * 1000 / frame_ms)
+    search = int(search_s * 1000 / frame_ms)
+    bounds = [0]
+    position = 0
+    while n_frames - position > target + search:
+        low = position + target - search
+        high = position + target + search
+        position = low + int(np.argmin(energy[low:high]))
+        bounds.append(position * frame_length)
+    bounds.append(len(audio_data))
+    return list(zip(bounds[:-1], bounds[1:]))
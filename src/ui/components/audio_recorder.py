@@ -2,8 +2,6 @@ from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QFileDial
 from PyQt6.QtCore import pyqtSignal, Qt, QRect
 from PyQt6.QtGui import QPainter, QBrush, QColor
 from pathlib import Path
-from services.audio_service import AudioService
-from services.transcription_service import TranscriptionService
 
 class AudioRecorderWidget(QWidget):
     recording_finished = pyqtSignal(str)
@@ -16,13 +14,25 @@ class AudioRecorderWidget(QWidget):
         super().__init__()
         self.setup_ui()
         
+        # Services are attached once their modules have loaded, after the window is shown
+        self.audio_service = None
+        self.transcription_service = None
+        self.current_file = None
+        self.record_button.setEnabled(False)
+        self.select_file_button.setEnabled(False)
+        self.status_label.setText("Loading audio services...")
+
+    def attach_services(self):
+        """Create the audio and transcription services; imports numpy, PyAudio and friends"""
+        from services.audio_service import AudioService
+        from services.transcription_service import TranscriptionService
+
         self.audio_service = AudioService()
         self.transcription_service = TranscriptionService()
-        self.current_file = None
         
-        # Connect services
-        self.audio_service.audio_data_ready.connect(
-            self.transcription_service.process_audio_chunk
+        # Connect services; live audio bypasses the event loop through the capture buffer
+        self.transcription_service.attach_capture_buffer(
+            self.audio_service.capture_buffer
         )
         self.transcription_service.transcription_chunk_ready.connect(
             self.handle_transcription
@@ -33,6 +43,10 @@ class AudioRecorderWidget(QWidget):
         self.transcription_service.progress_message.connect(
             self.handle_transcripton_process
         )
+
+        self.record_button.setEnabled(True)
+        self.select_file_button.setEnabled(True)
+        self.status_label.setText("Ready to record")
             
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -118,7 +132,8 @@ class AudioRecorderWidget(QWidget):
     
     def closeEvent(self, event):
         """Handle cleanup when widget is closed"""
-        self.transcription_service.stop_processing()
+        if self.transcription_service is not None:
+            self.transcription_service.stop_processing()
         super().closeEvent(event)
 
     def stop_recording(self):
@@ -127,8 +142,9 @@ class AudioRecorderWidget(QWidget):
         self.status_label.setText("Processing final audio...")
         self.select_file_button.setEnabled(True)
         
-        self.transcription_service.stop_processing()
+        # Stop capture first so the transcription side can drain the last buffers
         self.audio_service.stop_recording()
+        self.transcription_service.stop_processing()
         
     def handle_transcription(self, text: str):
         self.transcription_chunk_ready.emit(text)
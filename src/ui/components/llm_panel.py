@@ -9,19 +9,28 @@ from PyQt6.QtWidgets import (
     QMessageBox,
     QPlainTextEdit
 )
-from PyQt6.QtCore import pyqtSignal
-from services.llm_service import LLMService
-from docx import Document
-from docx.shared import Pt
-import tempfile
-import os
+from PyQt6.QtCore import pyqtSignal, QTimer
+from PyQt6.QtGui import QTextCursor
 
 
 class LLMPanel(QWidget):
+    APPEND_INTERVAL_MS = 100  # Live text and log lines are applied at most this often
+    LOG_MAX_LINES = 2000
+
     def __init__(self):
         super().__init__()
-        self.llm_service = LLMService()
+        self.llm_service = None  # Attached after the window is shown
+        self.service_error = None  # Why attaching the service failed, if it did
+        self.unredacted_chunks = []  # Live text that arrived before the service, replayed on attach
         self.template_content = ""
+        self.pending_input = []
+        self.pending_logs = []
+
+        # One timer coalesces both kinds of appends into a single edit per interval
+        self.append_timer = QTimer(self)
+        self.append_timer.setSingleShot(True)
+        self.append_timer.setInterval(self.APPEND_INTERVAL_MS)
+        self.append_timer.timeout.connect(self.flush_pending)
         self.setup_ui()
         self.setup_connections()
         
@@ -91,6 +100,7 @@ class LLMPanel(QWidget):
         self.log_display = QPlainTextEdit()
         self.log_display.setReadOnly(True)
         self.log_display.setMaximumHeight(150)  # Limit height
+        self.log_display.setMaximumBlockCount(self.LOG_MAX_LINES)  # Oldest lines are dropped
         self.log_display.setStyleSheet("""
             QPlainTextEdit {
                 background-color: palette(base);
@@ -113,19 +123,76 @@ class LLMPanel(QWidget):
         self.template_button.clicked.connect(self.load_template)
         self.process_button.clicked.connect(self.process_transcription)
         self.export_button.clicked.connect(self.export_response)
-        
+
+        # Disabled until the service is attached
+        self.template_button.setEnabled(False)
+        self.process_button.setEnabled(False)
+
+    def attach_service(self) -> bool:
+        """Create the LLM service; imports python-docx, httpx and the note cache"""
+        from services.llm_service import LLMService
+        try:
+            self.llm_service = LLMService()
+        except Exception as e:
+            self.service_error = str(e)
+            self.handle_error(f"Note generation is unavailable: {str(e)}")
+            return False
+
+        # Catch live redaction up with a recording that started before the service existed
+        chunks, self.unredacted_chunks = self.unredacted_chunks, []
+        for chunk in chunks:
+            self.llm_service.add_live_text(chunk)
+
         # Connect LLM service signals
         self.llm_service.response_ready.connect(self.handle_llm_response)
+        self.llm_service.response_chunk.connect(self.append_response_chunk)
+        self.llm_service.generation_running.connect(self.set_generating)
         self.llm_service.debug_message.connect(self.log_message)
         self.llm_service.error_occurred.connect(self.handle_error)
 
+        self.template_button.setEnabled(True)
+        self.process_button.setEnabled(bool(self.input_text.toPlainText()))
+        return True
+
     def log_message(self, message: str):
-        """Add a new log message to the display"""
-        self.log_display.appendPlainText(message)
-        # Auto-scroll to bottom
-        self.log_display.verticalScrollBar().setValue(
-            self.log_display.verticalScrollBar().maximum()
-        )
+        """Queue a log message for the display"""
+        self.pending_logs.append(message)
+        if not self.append_timer.isActive():
+            self.append_timer.start()
+
+    def flush_pending(self):
+        """Apply queued transcript chunks and log lines, one edit each"""
+        if self.pending_input:
+            chunks, self.pending_input = self.pending_input, []
+            self._append_to_input(chunks)
+        if self.pending_logs:
+            lines, self.pending_logs = self.pending_logs, []
+            self.log_display.appendPlainText("\n".join(lines))
+            # Auto-scroll to bottom
+            self.log_display.verticalScrollBar().setValue(
+                self.log_display.verticalScrollBar().maximum()
+            )
+
+    def _append_to_input(self, chunks: list):
+        """Insert text at the end of the document without touching the user's cursor"""
+        document = self.input_text.document()
+        text = " ".join(chunk.strip() for chunk in chunks).strip()
+        if not text:
+            return
+        scroll_bar = self.input_text.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not document.isEmpty():
+            # Each batch gets its own paragraph: Qt lays out per paragraph, so
+            # appending to one ever-growing paragraph would re-wrap all of it
+            cursor.insertBlock()
+        cursor.insertText(text)
+
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+        self.process_button.setEnabled(self.llm_service is not None)
     
     def load_template(self):
         file_name, _ = QFileDialog.getOpenFileName(
@@ -149,13 +216,37 @@ class LLMPanel(QWidget):
                 
     def set_input_text(self, text: str):
         """Set the transcription text - called from outside"""
+        self.pending_input.clear()  # The full text supersedes queued live chunks
         self.input_text.setText(text)
-        self.process_button.setEnabled(bool(text))
+        if not text:
+            # A new recording or file is starting
+            self.unredacted_chunks.clear()
+            if self.llm_service is not None:
+                self.llm_service.reset_live_redaction()
+        self.process_button.setEnabled(bool(text) and self.llm_service is not None)
     
     def process_transcription(self):
+        # The same button cancels a generation in progress
+        if self.llm_service.is_generating():
+            self.llm_service.cancel_generation()
+            return
+        self.flush_pending()
         transcription = self.input_text.toPlainText()
         if transcription:
-            self.llm_service.process_text(transcription)
+            self.response_text.clear()
+            self.export_button.setEnabled(False)
+            self.llm_service.process_text_async(transcription)
+
+    def set_generating(self, running: bool):
+        self.process_button.setText("Cancel" if running else "Process with LLM")
+        self.template_button.setEnabled(not running)
+
+    def append_response_chunk(self, text: str):
+        """Append streamed response text at the end without re-rendering the document"""
+        cursor = self.response_text.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.response_text.setTextCursor(cursor)
 
     def handle_llm_response(self, response: str):
         self.response_text.setText(response)
@@ -181,7 +272,10 @@ class LLMPanel(QWidget):
 
     def append_input_text(self, text: str):
         """Append new transcription text for live updates"""
-        current_text = self.input_text.toPlainText()
-        new_text = f"{current_text} {text}".strip()
-        self.input_text.setText(new_text)
-        self.process_button.setEnabled(bool(new_text))
\ No newline at end of file
+        if self.llm_service is not None:
+            self.llm_service.add_live_text(text)
+        elif self.service_error is None:
+            self.unredacted_chunks.append(text)
+        self.pending_input.append(text)
+        if not self.append_timer.isActive():
+            self.append_timer.start()
\ No newline at end of file
@@ -0,0 +1,60 @@
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLabel
+from PyQt6.QtCore import QTimer
+from utils import metrics
+
+
+def _seconds(value) -> str:
+    if value is None:
+        return "-"
+    return f"{value * 1000:.0f}ms" if value < 1 else f"{value:.1f}s"
+
+
+def _ratio(value) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+class StatsPanel(QWidget):
+    """One-line summary of the pipeline metrics, refreshed from the registry"""
+    REFRESH_INTERVAL_MS = 1000
+
+    # (caption, metric name, field, formatter)
+    FIELDS = (
+        ("RTF", 'transcription_rtf_ewma', 'value', _ratio),
+        ("Queue", 'transcription_queue_depth', 'value', str),
+        ("Wait p95", 'transcription_queue_wait_seconds', 'p95', _seconds),
+        ("Whisper p50", 'transcription_inference_seconds', 'p50', _seconds),
+        ("Lag", 'transcription_lag_seconds', 'last', _seconds),
+        ("PII p50", 'pii_analysis_seconds', 'p50', _seconds),
+        ("First token", 'llm_time_to_first_token_seconds', 'last', _seconds),
+        ("LLM", 'llm_round_trip_seconds', 'last', _seconds),
+        ("Cache hits", 'note_cache_hits_total', 'value', str),
+        ("Dropped audio", 'audio_capture_dropped_seconds_total', 'value', _seconds),
+    )
+
+    def __init__(self, registry: metrics.MetricsRegistry = metrics.REGISTRY):
+        super().__init__()
+        self.registry = registry
+        self.labels = {}
+        self.setup_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+
+    def setup_ui(self):
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        for caption, name, _, _ in self.FIELDS:
+            label = QLabel()
+            label.setStyleSheet("color: palette(mid); font-size: 11px;")
+            self.labels[name] = label
+            layout.addWidget(label)
+        layout.addStretch()
+        self.refresh()
+
+    def refresh(self):
+        for caption, name, field, formatter in self.FIELDS:
+            metric = self.registry.get(name)
+            value = metric.snapshot()[field] if metric is not None else None
+            self.labels[name].setText(f"{caption}: {'-' if value is None else formatter(value)}")
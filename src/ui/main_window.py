@@ -2,8 +2,17 @@ from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout
 from PyQt6.QtCore import Qt
 from .components.audio_recorder import AudioRecorderWidget
 from .components.llm_panel import LLMPanel
+from .components.stats_panel import StatsPanel
 
 class MainWindow(QMainWindow):
+    STACK_LABELS = {
+        'audio': "Audio services",
+        'notes': "Note generation services",
+        'whisper': "Speech recognition model",
+        'presidio': "PII analyzer",
+        'openai': "OpenAI client",
+    }
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Audio Transcription & Analysis Tool")
@@ -16,6 +25,7 @@ class MainWindow(QMainWindow):
         # Initialize components
         self.audio_recorder = AudioRecorderWidget()
         self.llm_panel = LLMPanel()
+        self.stats_panel = StatsPanel()
         
         # Connect signals for both live and recorded transcription
         self.audio_recorder.transcription_chunk_ready.connect(
@@ -30,8 +40,35 @@ class MainWindow(QMainWindow):
         # Layout
         layout.addWidget(self.audio_recorder, stretch=1)
         layout.addWidget(self.llm_panel, stretch=2)
+        layout.addWidget(self.stats_panel)
         
         self.setup_window_properties()
+        self.preloader = None
         
     def setup_window_properties(self):
         pass
+
+    def start_preloading(self):
+        """Load services and the heavy model stacks in the background; call after show()"""
+        from services.preloader import Preloader
+        self.preloader = Preloader()
+        self.preloader.stack_ready.connect(self.handle_stack_ready)
+        self.preloader.stack_failed.connect(self.handle_stack_failed)
+        self.llm_panel.log_message("Loading services...")
+        self.preloader.start()
+
+    def handle_stack_ready(self, name: str, seconds: float):
+        # Modules are imported by now, so constructing the services is quick
+        try:
+            if name == 'audio':
+                self.audio_recorder.attach_services()
+            elif name == 'notes' and not self.llm_panel.attach_service():
+                self.handle_stack_failed(name, self.llm_panel.service_error)
+                return
+        except Exception as e:
+            self.handle_stack_failed(name, str(e))
+            return
+        self.llm_panel.log_message(f"{self.STACK_LABELS.get(name, name)} ready ({seconds:.1f}s)")
+
+    def handle_stack_failed(self, name: str, error: str):
+        self.llm_panel.log_message(f"{self.STACK_LABELS.get(name, name)} failed to load: {error}")
@@ -1,21 +1,109 @@
+import atexit
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-def setup_logger(name):
-    # Create logs directory in user's Documents
-    log_dir = os.path.join(os.path.expanduser('~/Documents'), 'medicalapp', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Create log file path
-    log_file = os.path.join(log_dir, 'app.log')
-    
-    # Create logger
-    logger = logging.getLogger(name)
-    
-    # Only add handlers if they haven't been added already
-    if not logger.handlers:
-        logger.setLevel(logging.DEBUG)
+# Whisper model residency (see services.model_manager)
+WHISPER_MODEL_SIZE = os.getenv('WHISPER_MODEL_SIZE', 'small')
+WHISPER_IDLE_TTL = float(os.getenv('WHISPER_IDLE_TTL', 15 * 60))  # Seconds; 0 keeps models resident
+WHISPER_MEMORY_LIMIT_MB = float(os.getenv('WHISPER_MEMORY_LIMIT_MB', 0))  # 0 disables the limit
+
+# Parallel transcription of imported files (see services.parallel_transcription)
+TRANSCRIBE_WORKERS = int(os.getenv('TRANSCRIBE_WORKERS', max(1, min(4, (os.cpu_count() or 2) // 2))))
+TORCH_THREADS_PER_WORKER = int(os.getenv('TORCH_THREADS_PER_WORKER', max(1, (os.cpu_count() or 2) // TRANSCRIBE_WORKERS)))
+PARALLEL_MIN_DURATION = float(os.getenv('PARALLEL_MIN_DURATION', 120))  # Seconds; shorter files use the shared model
+
+# Live transcription backpressure (see services.backpressure)
+LIVE_TARGET_RTF = float(os.getenv('LIVE_TARGET_RTF', 0.8))  # Inference time / audio time to stay under
+LIVE_MAX_LAG = float(os.getenv('LIVE_MAX_LAG', 10))  # Seconds a chunk may wait plus transcribe
+LIVE_MAX_SEGMENT = float(os.getenv('LIVE_MAX_SEGMENT', 28))  # Longest segment when behind; Whisper windows are 30s
+LIVE_MIN_MODEL_SIZE = os.getenv('LIVE_MIN_MODEL_SIZE', 'base')  # Smallest model to fall back to; set to WHISPER_MODEL_SIZE to disable
+
+# Note generation backend (see services.llm_backends): 'openai' or 'ollama'
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'openai').lower()
+LLM_MODEL = os.getenv('LLM_MODEL', '')  # Empty uses the backend's default model
+OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', 10))  # Seconds
+LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', 120))  # Seconds between streamed chunks
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 3))  # Attempts at opening a request
+
+# Token budgeting of note prompts (see services.token_budget)
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv('LLM_PROMPT_TOKEN_BUDGET', 16000))  # Longer transcripts are map-reduced
+LLM_MAP_CHUNK_TOKENS = int(os.getenv('LLM_MAP_CHUNK_TOKENS', 4000))
+LLM_MAP_CONCURRENCY = int(os.getenv('LLM_MAP_CONCURRENCY', 4))
+
+# On-disk cache of generated notes (see services.note_cache)
+NOTE_CACHE_DIR = os.getenv('NOTE_CACHE_DIR', os.path.join(os.path.expanduser('~/Documents'), 'medicalapp', 'cache', 'notes'))
+NOTE_CACHE_SIZE_MB = float(os.getenv('NOTE_CACHE_SIZE_MB', 64))
+NOTE_CACHE_TTL_DAYS = float(os.getenv('NOTE_CACHE_TTL_DAYS', 30))  # 0 keeps entries until evicted for size
+
+# Format of saved recordings: 'wav' or 'flac'
+RECORDING_FORMAT = os.getenv('RECORDING_FORMAT', 'wav').lower()
+
+# Headless HTTP service (see server.py)
+SERVER_HOST = os.getenv('SERVER_HOST', '127.0.0.1')
+SERVER_PORT = int(os.getenv('SERVER_PORT', 8765))
+SERVER_CONCURRENCY = int(os.getenv('SERVER_CONCURRENCY', 2))  # Jobs processed at once; Whisper calls are serialized regardless
+SERVER_MAX_QUEUED = int(os.getenv('SERVER_MAX_QUEUED', 16))  # Unfinished jobs accepted before uploads get 503
+SERVER_JOB_TTL = float(os.getenv('SERVER_JOB_TTL', 3600))  # Seconds finished jobs, transcripts included, are kept
+NOTE_TEMPLATE_PATH = os.getenv('NOTE_TEMPLATE_PATH', '')  # Template used for server-generated notes
+
+# Pipeline metrics exporters (see utils.metrics), both off by default
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # Serves /metrics on 127.0.0.1 when set
+METRICS_JSON_PATH = os.getenv('METRICS_JSON_PATH', '')  # Rolling JSON-lines snapshot file
+METRICS_JSON_INTERVAL = float(os.getenv('METRICS_JSON_INTERVAL', 10))  # Seconds between snapshots
+
+# Logging: LOG_LEVEL applies everywhere unless LOG_LEVELS names a more specific
+# subsystem, e.g. LOG_LEVELS="services.transcription_service=DEBUG,services.llm_backends=WARNING"
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+LOG_CONSOLE_LEVEL = os.getenv('LOG_CONSOLE_LEVEL', 'INFO').upper()
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Hands records to the listener unformatted, so formatting happens off the caller's thread"""
+    def prepare(self, record):
+        return record
+
+
+_log_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _subsystem_levels() -> dict:
+    levels = {}
+    for entry in LOG_LEVELS.split(','):
+        name, _, level = entry.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _level_for(name: str) -> str:
+    """Level of the most specific LOG_LEVELS entry covering `name`, else LOG_LEVEL"""
+    levels = _subsystem_levels()
+    while name:
+        if name in levels:
+            return levels[name]
+        name = name.rpartition('.')[0]
+    return LOG_LEVEL
+
+
+def _start_listener():
+    """Start the single thread that formats records and writes them to file and console"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        # Create logs directory in user's Documents
+        log_dir = os.path.join(os.path.expanduser('~/Documents'), 'medicalapp', 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+        
+        # Create log file path
+        log_file = os.path.join(log_dir, 'app.log')
         
         # Create handlers
         file_handler = RotatingFileHandler(
@@ -24,6 +112,7 @@ def setup_logger(name):
             backupCount=5
         )
         console_handler = logging.StreamHandler()
+        console_handler.setLevel(LOG_CONSOLE_LEVEL)
         
         # Create formatters and add it to handlers
         log_format = logging.Formatter(
@@ -31,9 +120,28 @@ def setup_logger(name):
         )
         file_handler.setFormatter(log_format)
         console_handler.setFormatter(log_format)
-        
-        # Add handlers to the logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+
+        _listener = QueueListener(_log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        # Drain what is still queued when the interpreter exits
+        atexit.register(_listener.stop)
+
+
+def setup_logger(name):
+    """Logger for `name` whose records are written by a background listener thread.
+
+    Callers only enqueue the record; pass arguments %-style (not f-strings)
+    on hot paths so the message is only built if the level is enabled.
+    """
+    _start_listener()
+    
+    # Create logger
+    logger = logging.getLogger(name)
+    
+    # Only add handlers if they haven't been added already
+    if not logger.handlers:
+        logger.setLevel(_level_for(name))
+        logger.addHandler(_DeferredQueueHandler(_log_queue))
+        logger.propagate = False
     
-    return logger
\ No newline at end of file
+    return logger
@@ -0,0 +1,238 @@
+from collections import deque
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+from utils.config import setup_logger, METRICS_PORT, METRICS_JSON_PATH, METRICS_JSON_INTERVAL
+
+# Upper bounds in seconds; suits everything from a capture callback to an LLM round trip
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+PREFIX = 'medapp_'
+
+
+class Counter:
+    """Monotonically increasing total"""
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> dict:
+        return {'value': self.value}
+
+
+class Gauge:
+    """Value that goes up and down, e.g. a queue depth"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self.peak = 0
+
+    def set(self, value):
+        self.value = value
+        self.peak = max(self.peak, value)
+
+    def snapshot(self) -> dict:
+        return {'value': self.value, 'peak': self.peak}
+
+
+class Histogram:
+    """Bucketed distribution plus a window of recent samples for percentiles"""
+    kind = 'histogram'
+    RECENT = 256
+
+    def __init__(self, name: str, help_text: str = "", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=self.RECENT)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            self.recent.append(value)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.bucket_counts[index] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def percentile(self, fraction: float):
+        with self._lock:
+            samples = sorted(self.recent)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'last': self.recent[-1] if self.recent else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+        }
+
+
+class MetricsRegistry:
+    """Process-wide collection of named metrics, created on first use"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, metric_class, name: str, help_text: str, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = metric_class(name, help_text, **kwargs)
+                    self._metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            full_name = PREFIX + name
+            if metric.help:
+                lines.append(f"# HELP {full_name} {metric.help}")
+            lines.append(f"# TYPE {full_name} {metric.kind}")
+            if metric.kind == 'histogram':
+                cumulative = 0
+                for bound, count in zip(metric.buckets, metric.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{full_name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{full_name}_bucket{{le="+Inf"}} {metric.count}')
+                lines.append(f"{full_name}_sum {metric.sum}")
+                lines.append(f"{full_name}_count {metric.count}")
+            else:
+                lines.append(f"{full_name} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help_text: str = "") -> Counter:
+    return REGISTRY.counter(name, help_text)
+
+
+def gauge(name: str, help_text: str = "") -> Gauge:
+    return REGISTRY.gauge(name, help_text)
+
+
+def histogram(name: str, help_text: str = "", buckets=DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.histogram(name, help_text, buckets)
+
+
+def start_http_exporter(port: int, host: str = '127.0.0.1', registry: MetricsRegistry = REGISTRY):
+    """Serve /metrics (Prometheus text) and /metrics.json on localhost from a daemon thread"""
+    # Imported here so the exporter costs nothing at startup when disabled
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body = registry.prometheus_text().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            elif self.path == '/metrics.json':
+                body = json.dumps(registry.snapshot()).encode('utf-8')
+                content_type = 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes would flood the application log
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class JsonFileExporter(threading.Thread):
+    """Appends a snapshot as one JSON line every `interval` seconds, rolling the file over at `max_bytes`"""
+
+    def __init__(self, path: str, interval: float = 10, max_bytes: int = 5 * 1024 * 1024,
+                 registry: MetricsRegistry = REGISTRY):
+        super().__init__(name="metrics-json", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.registry = registry
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        while not self._stopped.wait(self.interval):
+            self.write_snapshot()
+        self.write_snapshot()
+
+    def write_snapshot(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            os.replace(self.path, self.path + '.1')
+        line = json.dumps({'time': time.time(), 'metrics': self.registry.snapshot()})
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+
+def start_exporters():
+    """Start whichever exporters are configured; both are off by default"""
+    logger = setup_logger(__name__)
+    if METRICS_PORT:
+        try:
+            start_http_exporter(METRICS_PORT)
+            logger.info("Metrics served at http://127.0.0.1:%d/metrics", METRICS_PORT)
+        except OSError as e:
+            logger.error("Could not start the metrics endpoint on port %d: %s", METRICS_PORT, e)
+    if METRICS_JSON_PATH:
+        JsonFileExporter(METRICS_JSON_PATH, METRICS_JSON_INTERVAL).start()
+        logger.info("Metrics written to %s every %ss", METRICS_JSON_PATH, METRICS_JSON_INTERVAL)
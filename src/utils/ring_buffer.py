@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer of audio samples backed by a single ndarray.
+
+    Every sample is mirrored into a storage array of twice the capacity, so
+    any window of up to ``capacity`` samples is one contiguous slice and can
+    be handed out as a view without copying or reassembling wrapped halves.
+    Live transcription audio is held in these by SpeechSegmenter: the open
+    segment, its pre-roll and the noise-floor energy history.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(2 * self.capacity, dtype=self.dtype)
+        self._start = 0  # Index of the oldest sample, always < capacity
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self._size
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    def write(self, samples: np.ndarray) -> int:
+        """Append samples, overwriting the oldest ones when full.
+
+        Returns the number of samples that were overwritten.
+        """
+        samples = np.asarray(samples, dtype=self.dtype).reshape(-1)
+        count = len(samples)
+        if count == 0:
+            return 0
+
+        # Only the newest `capacity` samples can ever be retained
+        if count > self.capacity:
+            dropped = count - self.capacity + self._size
+            samples = samples[-self.capacity:]
+            count = self.capacity
+            self._start = 0
+            self._size = 0
+        else:
+            dropped = max(0, self._size + count - self.capacity)
+            if dropped:
+                self.consume(dropped)
+
+        end = (self._start + self._size) % self.capacity
+        first = min(count, self.capacity - end)
+        rest = count - first
+
+        self._data[end:end + first] = samples[:first]
+        self._data[end + self.capacity:end + self.capacity + first] = samples[:first]
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[self.capacity:self.capacity + rest] = samples[first:]
+
+        self._size += count
+        return dropped
+
+    def view(self, count: int = None) -> np.ndarray:
+        """Zero-copy view of the oldest `count` samples (all by default).
+
+        The view aliases internal storage and is only valid until the next
+        write; copy it before handing it to another thread.
+        """
+        if count is None or count > self._size:
+            count = self._size
+        return self._data[self._start:self._start + count]
+
+    def consume(self, count: int):
+        """Discard the oldest `count` samples"""
+        count = min(count, self._size)
+        self._start = (self._start + count) % self.capacity
+        self._size -= count
+        if self._size == 0:
+            self._start = 0
+
+    def read(self, count: int = None) -> np.ndarray:
+        """Remove and return the oldest `count` samples as an owned array"""
+        data = self.view(count).copy()
+        self.consume(len(data))
+        return data
@@ -0,0 +1,89 @@
+import numpy as np
+
+
+class SPSCRingBuffer:
+    """Single-producer/single-consumer ring buffer of float32 samples.
+
+    The producer (the PortAudio callback) only ever advances `_write_index`
+    and the consumer only ever advances `_read_index`. Both are monotonically
+    increasing ints, and a store to an attribute is atomic under the GIL, so
+    neither side needs a lock. The producer publishes its index only after the
+    samples are copied in, so the consumer never sees a half-written block.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self._write_index = 0  # Total samples ever written; producer-owned
+        self._read_index = 0   # Total samples ever read; consumer-owned
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.overruns = 0   # Samples dropped because the consumer fell behind
+        self.empty_polls = 0  # Reads that found no data; normal for a polling consumer
+        self.peak_fill = 0  # Largest backlog seen by the producer, in samples
+
+    def available(self) -> int:
+        return self._write_index - self._read_index
+
+    # Producer side
+
+    def write(self, samples: np.ndarray) -> int:
+        """Copy samples in; returns how many were dropped for lack of space"""
+        write_index = self._write_index
+        free = self.capacity - (write_index - self._read_index)
+        count = len(samples)
+        dropped = max(0, count - free)
+        if dropped:
+            # Never overwrite unread data: the newest samples are dropped instead
+            self.overruns += dropped
+            samples = samples[:free]
+            count = free
+        if count == 0:
+            return dropped
+
+        position = write_index % self.capacity
+        first = min(count, self.capacity - position)
+        self._data[position:position + first] = samples[:first]
+        if count > first:
+            self._data[:count - first] = samples[first:]
+
+        self._write_index = write_index + count
+        self.peak_fill = max(self.peak_fill, self._write_index - self._read_index)
+        return dropped
+
+    # Consumer side
+
+    def read(self, max_samples: int = None) -> np.ndarray:
+        """Remove and return up to `max_samples` of the oldest samples as a new array"""
+        read_index = self._read_index
+        count = self._write_index - read_index
+        if max_samples is not None:
+            count = min(count, max_samples)
+        if count <= 0:
+            self.empty_polls += 1
+            return np.zeros(0, dtype=np.float32)
+
+        position = read_index % self.capacity
+        first = min(count, self.capacity - position)
+        if first == count:
+            samples = self._data[position:position + count].copy()
+        else:
+            samples = np.concatenate((self._data[position:], self._data[:count - first]))
+
+        self._read_index = read_index + count
+        return samples
+
+    def discard(self):
+        """Drop everything written so far, e.g. stale audio from a previous session"""
+        self._read_index = self._write_index
+
+    def stats(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'available': self.available(),
+            'peak_fill': self.peak_fill,
+            'overruns': self.overruns,
+            'empty_polls': self.empty_polls,
+        }
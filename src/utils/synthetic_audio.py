@@ -0,0 +1,32 @@
+"""Deterministic speech-like audio for the test and benchmark suites"""
+import numpy as np
+
+
+def synthetic_speech(seconds: float, sample_rate: int = 16000, seed: int = 0,
+                     noise_db: float = None) -> np.ndarray:
+    """Float32 audio of voiced bursts of 1-4 s separated by 0.3-1.5 s pauses.
+
+    The pauses are silent, or steady white noise at `noise_db` dBFS RMS.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    if noise_db is None:
+        audio = np.zeros(total, dtype=np.float32)
+    else:
+        audio = rng.normal(0, 10 ** (noise_db / 20), total).astype(np.float32)
+    position = 0
+    while position < total:
+        burst = min(int(rng.uniform(1, 4) * sample_rate), total - position)
+        t = np.arange(burst) / sample_rate
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)  # Syllable rate
+        audio[position:position + burst] += (0.2 * voiced * envelope).astype(np.float32)
+        position += burst + int(rng.uniform(0.3, 1.5) * sample_rate)
+    return audio
+
+
+def noise(seconds: float, level_db: float, sample_rate: int = 16000, seed: int = 1) -> np.ndarray:
+    """Steady white noise at `level_db` dBFS RMS"""
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, 10 ** (level_db / 20), int(seconds * sample_rate)).astype(np.float32)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('LOG_CONSOLE_LEVEL', 'ERROR')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.synthetic_audio import noise, synthetic_speech  # Shared with the benchmarks
+
+SAMPLE_RATE = 16000
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from conftest import SAMPLE_RATE
+from services.audio_decoder import decode_with_ffmpeg, iter_ffmpeg_blocks, load_wav
+
+
+def tone(frequency: float, seconds: float, rate: int, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def level_at(audio: np.ndarray, frequency: float, rate: int = SAMPLE_RATE) -> float:
+    """Amplitude of the spectral peak nearest `frequency`"""
+    spectrum = np.abs(np.fft.rfft(audio * np.hanning(len(audio)))) / (len(audio) / 4)
+    frequencies = np.fft.rfftfreq(len(audio), 1 / rate)
+    band = np.abs(frequencies - frequency) < 20
+    return float(spectrum[band].max())
+
+
+def write(path, audio, rate, subtype='PCM_16'):
+    sf.write(str(path), audio, rate, subtype=subtype)
+    return str(path)
+
+
+@pytest.mark.parametrize('rate', [44100, 48000])
+def test_downsampling_keeps_speech_band(tmp_path, rate):
+    audio = load_wav(write(tmp_path / 'a.wav', tone(1000, 2, rate), rate))
+    assert len(audio) == pytest.approx(2 * SAMPLE_RATE, abs=1)
+    assert level_at(audio, 1000) == pytest.approx(0.5, rel=0.05)
+
+
+@pytest.mark.parametrize('rate', [44100, 48000])
+def test_downsampling_does_not_alias(tmp_path, rate):
+    # Without a low-pass, 12 kHz folds back to 4 kHz at 16 kHz
+    audio = load_wav(write(tmp_path / 'a.wav', tone(12000, 2, rate), rate))
+    alias = SAMPLE_RATE - 12000
+    assert level_at(audio, alias) < 0.005  # At least 40 dB down
+
+
+def test_block_edges_match_a_single_block(tmp_path):
+    rate = 48000
+    rng = np.random.default_rng(0)
+    path = write(tmp_path / 'a.wav', (0.3 * rng.standard_normal(3 * rate)).astype(np.float32), rate, 'FLOAT')
+    whole = load_wav(path, block_seconds=10)
+    blocked = load_wav(path, block_seconds=0.37)
+    np.testing.assert_allclose(blocked, whole, atol=1e-5)
+
+
+def test_same_rate_is_passed_through(tmp_path):
+    audio = tone(440, 1, SAMPLE_RATE) + 0.1
+    loaded = load_wav(write(tmp_path / 'a.wav', audio, SAMPLE_RATE, 'FLOAT'))
+    np.testing.assert_allclose(loaded, audio - audio.mean(), atol=1e-5)
+
+
+def fake_ffmpeg(tmp_path, stderr_bytes: int, samples: int, returncode: int = 0) -> str:
+    """An executable that chats on stderr before writing `samples` float32 ones to stdout"""
+    script = tmp_path / 'ffmpeg'
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"sys.stderr.write('x' * {stderr_bytes})\n"
+        "sys.stderr.flush()\n"
+        f"sys.stdout.buffer.write(b'\\x00\\x00\\x80\\x3f' * {samples})\n"
+        f"sys.exit({returncode})\n"
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="needs an executable script")
+def test_ffmpeg_stderr_does_not_block_decoding(tmp_path):
+    # Far more than a pipe buffer holds
+    ffmpeg = fake_ffmpeg(tmp_path, stderr_bytes=1 << 20, samples=SAMPLE_RATE)
+    audio = decode_with_ffmpeg('in.mp3', ffmpeg)
+    np.testing.assert_array_equal(audio, np.ones(SAMPLE_RATE, dtype=np.float32))
+    assert sum(len(block) for block in iter_ffmpeg_blocks('in.mp3', ffmpeg, block_seconds=0.25)) == SAMPLE_RATE
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="needs an executable script")
+def test_ffmpeg_failure_quotes_stderr_tail(tmp_path):
+    ffmpeg = fake_ffmpeg(tmp_path, stderr_bytes=1 << 20, samples=0, returncode=1)
+    with pytest.raises(RuntimeError, match=r"ffmpeg failed \(1\): x+$") as error:
+        decode_with_ffmpeg('in.mp3', ffmpeg)
+    assert len(str(error.value)) < 5000
@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from services.backpressure import BackpressureController, smaller_model
+
+
+def controller(**kwargs) -> BackpressureController:
+    settings = dict(base_segment_s=12, max_segment_s=27, model_size='small', min_model_size='tiny',
+                    target_rtf=0.8, max_lag_s=10)
+    settings.update(kwargs)
+    return BackpressureController(**settings)
+
+
+def observe(control: BackpressureController, rtf: float, chunks: int = 1, audio_s: float = 10, wait_s: float = 0):
+    """Feed `chunks` finished chunks that each ran at `rtf`; returns how many changed the settings"""
+    return sum(control.observe(audio_s, rtf * audio_s, wait_s) for _ in range(chunks))
+
+
+@pytest.mark.parametrize('model_size, floor, expected', [
+    ('large-v3', 'tiny', 'medium'),
+    ('turbo', 'tiny', 'medium'),
+    ('medium', 'tiny', 'small'),
+    ('small.en', 'tiny', 'base.en'),
+    ('base', 'tiny', 'tiny'),
+    ('tiny', 'tiny', None),
+    ('small', 'small', None),
+    ('base', 'small', None),  # Already below the floor
+    ('distil-large', 'tiny', None),
+])
+def test_smaller_model_ladder(model_size, floor, expected):
+    assert smaller_model(model_size, floor) == expected
+
+
+def test_rtf_is_an_exponentially_weighted_average():
+    control = controller(target_rtf=10, max_lag_s=1000)  # Never adjusts
+    observe(control, 0.5)
+    assert control.rtf == pytest.approx(0.5)  # The first chunk seeds it
+    observe(control, 1.5)
+    assert control.rtf == pytest.approx(0.3 * 1.5 + 0.7 * 0.5)
+    observe(control, 1.5, chunks=20)
+    assert control.rtf == pytest.approx(1.5, abs=1e-3)
+
+
+def test_ignores_empty_chunks():
+    control = controller()
+    assert not control.observe(0, 5, 0)
+    assert control.rtf is None
+
+
+def test_slow_chunks_grow_segments_then_downgrade_the_model():
+    control = controller()
+    assert observe(control, 1.2) == 1
+    assert control.segment_s == pytest.approx(18)
+    # Each adjustment is followed by a cooldown before the next one
+    assert observe(control, 1.2, chunks=BackpressureController.COOLDOWN_CHUNKS) == 0
+    observe(control, 1.2)
+    assert control.segment_s == pytest.approx(27)  # 12 x 1.5 x 1.5, capped at the maximum
+    assert control.model_size == 'small'
+
+    observe(control, 1.2, chunks=BackpressureController.COOLDOWN_CHUNKS + 1)
+    assert control.model_size == 'base'
+    observe(control, 1.2, chunks=BackpressureController.COOLDOWN_CHUNKS + 1)
+    assert control.model_size == 'tiny'
+    # Nothing left to give up
+    assert observe(control, 1.2, chunks=10) == 0
+    assert control.adjustments == 4
+
+
+def test_lag_alone_triggers_escalation():
+    control = controller()
+    assert control.observe(10, 2, wait_seconds=15)
+    assert control.segment_s > 12
+
+
+def test_segments_shrink_back_once_caught_up():
+    control = controller()
+    observe(control, 1.2, chunks=1 + BackpressureController.COOLDOWN_CHUNKS + 1)
+    assert control.segment_s == pytest.approx(27)
+
+    observe(control, 0.1, chunks=30)
+    assert control.segment_s == pytest.approx(12)
+    assert control.model_size == 'small'  # Never upgraded mid-session
+
+
+def test_reset_restores_base_settings():
+    control = controller()
+    observe(control, 1.2, chunks=10)
+    control.reset('small')
+    assert control.stats() == {
+        'rtf': None, 'lag_seconds': 0.0, 'max_lag_seconds': 0.0, 'segment_seconds': 12,
+        'model_size': 'small', 'adjustments': 0,
+    }
+
+
+class FakeModelManager:
+    """Loads instantly, except sizes listed in `blocked`, which wait for `resume`"""
+
+    def __init__(self, blocked=()):
+        self.blocked = set(blocked)
+        self.resume = threading.Event()
+        self.released = []
+
+    def is_loaded(self, model_size: str) -> bool:
+        return True
+
+    def acquire(self, model_size: str):
+        if model_size in self.blocked:
+            self.resume.wait(timeout=10)
+        return f"model:{model_size}"
+
+    def release(self, model_size: str):
+        self.released.append(model_size)
+
+    def stats(self) -> dict:
+        return {'hits': 0, 'misses': 0}
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    from services.transcription_service import TranscriptionService
+    monkeypatch.setenv('HOME', str(tmp_path))  # Audio chunks folder
+    service = TranscriptionService('small')
+    service.model_manager = FakeModelManager(blocked={'base'})
+    yield service
+    service.model_manager.resume.set()
+    service.shutdown()
+
+
+def test_model_switch_reaches_its_own_session(service):
+    service.model_manager.blocked.clear()
+    service.start_processing()
+    service._switch_model('base', service.session)
+    assert (service.model, service.model_size) == ("model:base", 'base')
+    assert service.model_manager.released == ['small']
+
+
+def test_late_model_switch_is_dropped_by_the_next_session(service):
+    service.start_processing()
+    switch = threading.Thread(target=service._switch_model, args=('base', service.session))
+    switch.start()
+
+    # The user stops and starts again while the smaller model is still loading
+    service.stop_processing()
+    service.start_processing()
+    service.model_manager.resume.set()
+    switch.join(timeout=10)
+
+    assert (service.model, service.model_size) == ("model:small", 'small')
+    assert service.model_manager.released.count('base') == 1
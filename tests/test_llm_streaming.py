@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.llm_backends import OllamaBackend, OpenAIBackend
+from services.llm_service import GenerationCancelled, LLMService
+from services.note_cache import NoteCache
+from services.note_template import NoteTemplate
+from services.redaction import RedactionResult, StreamingReidentifier
+
+# {PERSON_1} arrives split across two deltas; {DATE_1} has no mapping
+DELTAS = ["Reviewed ", "{PERS", "ON_1} today", " with {PERSON_10}", " and {DATE_1}."]
+PLACEHOLDERS = {'{PERSON_1}': "Jane Doe", '{PERSON_10}': "Dr Smith"}
+RESTORED = "Reviewed Jane Doe today with Dr Smith and {DATE_1}."
+DELTA_INTERVAL = 0.02
+
+
+class StreamingHandler(BaseHTTPRequestHandler):
+    """Streams DELTAS as Ollama NDJSON on /api/chat and as OpenAI SSE elsewhere"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        assert body['stream']
+        if self.path == '/api/chat':
+            content_type = 'application/x-ndjson'
+            events = [json.dumps({'message': {'content': delta}, 'done': False}) + "\n" for delta in DELTAS]
+            events.append(json.dumps({'done': True}) + "\n")
+        else:
+            content_type = 'text/event-stream'
+            events = [f"data: {json.dumps(self._openai_chunk(delta))}\n\n" for delta in DELTAS]
+            events.append("data: [DONE]\n\n")
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for index, event in enumerate(events):
+                if index == self.server.stall_after:
+                    self.server.resume.wait(timeout=10)
+                data = event.encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+                time.sleep(DELTA_INTERVAL)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.disconnects += 1  # The client closed the stream early
+
+    @staticmethod
+    def _openai_chunk(delta: str) -> dict:
+        return {
+            'id': "chatcmpl-test", 'object': "chat.completion.chunk", 'created': 0, 'model': "test",
+            'choices': [{'index': 0, 'delta': {'content': delta}, 'finish_reason': None}],
+        }
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def llm_server(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StreamingHandler)
+    server.disconnects = 0
+    server.stall_after = None  # Index of the event to hold back until `resume` is set
+    server.resume = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv('OLLAMA_HOST', url)
+    monkeypatch.setenv('OPENAI_BASE_URL', url + "/v1")
+    monkeypatch.setenv('OPENAI_API_KEY', "test")
+    yield server
+    server.resume.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def backend(llm_server):
+    backend = OllamaBackend("test")
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def service(backend, tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))  # Its output folder lives under ~/Documents
+    service = LLMService(backend=backend, note_cache=NoteCache(str(tmp_path / 'cache')))
+    yield service
+    service.note_cache.close()
+
+
+TEMPLATE = NoteTemplate("template.docx", 0, ["Impression", "Plan"], [True, True])
+REDACTION = RedactionResult("{PERSON_1} was seen with {PERSON_10}.", [], PLACEHOLDERS)
+
+
+def test_ollama_backend_streams_deltas(backend):
+    assert list(backend.stream_chat([{'role': 'user', 'content': "hi"}])) == DELTAS
+
+
+def test_openai_backend_streams_sse_deltas(llm_server):
+    pytest.importorskip('openai')
+    backend = OpenAIBackend("test")
+    try:
+        assert list(backend.stream_chat([{'role': 'user', 'content': "hi"}])) == DELTAS
+    finally:
+        backend.close()
+
+
+def test_reidentifier_holds_back_split_placeholder():
+    reidentifier = StreamingReidentifier(PLACEHOLDERS)
+    visible = [reidentifier.feed(delta) for delta in DELTAS]
+    assert visible[1] == ""  # "{PERS" could be the start of a placeholder
+    assert visible[2] == "Jane Doe today"
+    assert "".join(visible) + reidentifier.flush() == RESTORED
+    assert reidentifier.unresolved == ['{DATE_1}']
+
+
+def test_reidentifier_flushes_unclosed_brace():
+    reidentifier = StreamingReidentifier(PLACEHOLDERS)
+    assert reidentifier.feed("Score {") == "Score "
+    assert reidentifier.flush() == "{"
+
+
+def test_generate_note_streams_reidentified_text(service):
+    tokens = []
+    note = service.generate_note("transcript", on_token=tokens.append, template=TEMPLATE, redaction=REDACTION)
+
+    assert note == RESTORED
+    assert "".join(tokens) == RESTORED
+    assert not any("{PERS" in token for token in tokens)
+
+
+def test_generate_note_cancelled_mid_stream(service, llm_server):
+    tokens = []
+
+    with pytest.raises(GenerationCancelled):
+        service.generate_note(
+            "transcript", on_token=tokens.append, should_stop=lambda: len(tokens) >= 1,
+            template=TEMPLATE, redaction=REDACTION,
+        )
+    assert tokens == ["Reviewed "]
+
+    # The stream is closed, so the server's next writes fail
+    deadline = time.monotonic() + 2
+    while llm_server.disconnects == 0 and time.monotonic() < deadline:
+        time.sleep(DELTA_INTERVAL)
+    assert llm_server.disconnects == 1
+    # Nothing is cached for a cancelled note
+    assert service.generate_note("transcript", template=TEMPLATE, redaction=REDACTION) == RESTORED
+    assert service.note_cache.hits == 0
+
+
+def test_generate_note_cancelled_while_backend_stalls(service, llm_server):
+    llm_server.stall_after = 1
+    stop = threading.Event()
+
+    def on_token(text):
+        stop.set()  # Stop is pressed while the backend sends nothing more
+
+    started = time.monotonic()
+    with pytest.raises(GenerationCancelled):
+        service.generate_note("transcript", on_token=on_token, should_stop=stop.is_set,
+                              template=TEMPLATE, redaction=REDACTION)
+    assert time.monotonic() - started < 2
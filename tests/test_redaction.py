@@ -0,0 +1,222 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from services.redaction import (
+    Detection, IncrementalRedactor, PlaceholderMap, redact, reidentify, resolve_overlaps,
+)
+
+ENTITIES = re.compile(r"(?P<PERSON>Jane Doe|John Smith)|(?P<PHONE_NUMBER>\d{3}-\d{4})")
+
+
+class FakeAnalyzer:
+    """Finds whole names and phone numbers only; fails on texts containing `fail_on` once"""
+
+    def __init__(self, fail_on: str = None):
+        self.fail_on = fail_on
+        self.texts = []
+        self.last_analyze_seconds = self.build_seconds = 0.0
+
+    def is_ready(self) -> bool:
+        return True
+
+    def analyze(self, text: str):
+        self.texts.append(text)
+        if self.fail_on is not None and self.fail_on in text:
+            self.fail_on = None
+            raise RuntimeError("Analyzer failed")
+        return [Detection(m.start(), m.end(), m.lastgroup, 0.9) for m in ENTITIES.finditer(text)]
+
+
+def test_overlapping_results_cover_their_union():
+    # "Dr Jane Doe": a low-scoring wide span and a high-scoring narrow one
+    results = [Detection(0, 11, 'PERSON', 0.6), Detection(3, 7, 'LOCATION', 0.9)]
+    assert resolve_overlaps(results) == [(0, 11, 'LOCATION', 0.9)]
+
+
+def test_chained_overlaps_merge_into_one_region():
+    results = [Detection(0, 5, 'PERSON', 0.7), Detection(4, 9, 'PERSON', 0.8), Detection(8, 12, 'DATE_TIME', 0.6)]
+    assert resolve_overlaps(results) == [(0, 12, 'PERSON', 0.8)]
+
+
+def test_score_ties_go_to_the_longer_span():
+    results = [Detection(0, 4, 'LOCATION', 0.8), Detection(0, 8, 'PERSON', 0.8)]
+    assert resolve_overlaps(results) == [(0, 8, 'PERSON', 0.8)]
+
+
+def test_adjacent_and_weak_results_are_not_merged():
+    results = [
+        Detection(10, 14, 'DATE_TIME', 0.9),
+        Detection(0, 5, 'PERSON', 0.9),
+        Detection(5, 10, 'PERSON', 0.9),
+        Detection(20, 25, 'PERSON', 0.5),  # At the threshold: ignored
+        Detection(30, 30, 'PERSON', 0.9),  # Empty
+    ]
+    assert resolve_overlaps(results) == [
+        (0, 5, 'PERSON', 0.9), (5, 10, 'PERSON', 0.9), (10, 14, 'DATE_TIME', 0.9),
+    ]
+
+
+def test_placeholder_map_folds_case_and_whitespace():
+    placeholders = PlaceholderMap()
+    first = placeholders.placeholder_for('PERSON', "Jane Doe")
+    assert placeholders.placeholder_for('PERSON', "jane  DOE") == first
+    assert placeholders.placeholder_for('PERSON', " Jane\nDoe ") == first
+    assert placeholders.placeholder_for('PERSON', "John Doe") == '{PERSON_2}'
+    assert placeholders.placeholder_for('LOCATION', "Jane Doe") == '{LOCATION_1}'
+    assert first == '{PERSON_1}'
+    assert placeholders.originals[first] == "Jane Doe"  # The first form seen
+    assert len(placeholders) == 3
+
+
+def test_redact_reuses_placeholders_across_mentions():
+    text = "Jane Doe called. JANE DOE lives in Leeds."
+    results = [
+        Detection(0, 8, 'PERSON', 0.9),
+        Detection(17, 25, 'PERSON', 0.9),
+        Detection(35, 40, 'LOCATION', 0.8),
+    ]
+    redaction = redact(text, results)
+    assert redaction.text == "{PERSON_1} called. {PERSON_1} lives in {LOCATION_1}."
+    assert redaction.placeholders == {'{PERSON_1}': "Jane Doe", '{LOCATION_1}': "Leeds"}
+    assert [span.start for span in redaction.spans] == [0, 17, 35]
+
+
+def test_shared_map_keeps_numbering_and_reports_only_used_placeholders():
+    placeholders = PlaceholderMap()
+    redact("Jane Doe", [Detection(0, 8, 'PERSON', 0.9)], placeholder_map=placeholders)
+    redaction = redact("Ask John Smith", [Detection(4, 14, 'PERSON', 0.9)], placeholder_map=placeholders)
+    assert redaction.text == "Ask {PERSON_2}"
+    assert redaction.placeholders == {'{PERSON_2}': "John Smith"}
+
+
+def test_reidentify_matches_whole_tokens():
+    placeholders = {'{PERSON_1}': "Jane Doe", '{PERSON_10}': "Dr Smith"}
+    text, unresolved = reidentify("{PERSON_10} saw {PERSON_1}; {PERSON_1} agreed.", placeholders)
+    assert text == "Dr Smith saw Jane Doe; Jane Doe agreed."
+    assert unresolved == []
+
+
+def test_reidentify_leaves_unknown_tokens():
+    text, unresolved = reidentify("{PERSON_1} on {DATE_TIME_3} with {PERSON_2}", {'{PERSON_1}': "Jane Doe"})
+    assert text == "Jane Doe on {DATE_TIME_3} with {PERSON_2}"
+    assert unresolved == ['{DATE_TIME_3}', '{PERSON_2}']
+
+
+def test_reidentify_does_not_rescan_restored_values():
+    # An original value that looks like a placeholder is inserted as is
+    text, _ = reidentify("{PERSON_1} and {PERSON_2}", {'{PERSON_1}': "{PERSON_2}", '{PERSON_2}': "Jane"})
+    assert text == "{PERSON_2} and Jane"
+
+
+def test_reidentify_ignores_lowercase_template_slots():
+    text, unresolved = reidentify("Dear {name}, {PERSON_1}", {'{PERSON_1}': "Jane Doe"})
+    assert text == "Dear {name}, Jane Doe"
+    assert unresolved == []
+
+
+def test_redact_then_reidentify_round_trips():
+    text = "Jane Doe, 555-0100, saw Dr John Smith."
+    results = [Detection(0, 8, 'PERSON', 0.9), Detection(10, 18, 'PHONE_NUMBER', 0.7), Detection(27, 37, 'PERSON', 0.85)]
+    redaction = redact(text, results)
+    assert reidentify(redaction.text, redaction.placeholders) == (text, [])
+
+
+PADDING = "The patient describes the week in some detail. " * 6  # Longer than OVERLAP_CHARS
+CHUNKS = [PADDING + "Her name is Jane", "Doe and she can be reached on 555-0100.", "John Smith came too."]
+TRANSCRIPT = " ".join(CHUNKS)
+
+
+def assert_same_redaction(result, expected):
+    assert result.text == expected.text
+    assert result.spans == expected.spans
+    assert result.placeholders == expected.placeholders
+
+
+def test_entity_split_across_chunks_is_found_in_the_overlap():
+    analyzer = FakeAnalyzer()
+    redactor = IncrementalRedactor(analyzer.analyze)
+    for chunk in CHUNKS[:2]:
+        redactor.add(chunk)
+
+    # The second analysis sees a window ending the previous chunk, not the whole session
+    assert len(analyzer.texts[1]) < len(redactor.text)
+    assert analyzer.texts[1].endswith(CHUNKS[1]) and "Jane Doe" in analyzer.texts[1]
+
+    result = redactor.result_for(" ".join(CHUNKS[:2]))
+    assert result.text.endswith("Her name is {PERSON_1} and she can be reached on {PHONE_NUMBER_1}.")
+    assert "Jane" not in result.text
+
+
+def test_result_matches_one_shot_redaction():
+    redactor = IncrementalRedactor(FakeAnalyzer().analyze)
+    for chunk in CHUNKS:
+        redactor.add(chunk)
+    one_shot = redact(TRANSCRIPT, FakeAnalyzer().analyze(TRANSCRIPT))
+    assert_same_redaction(redactor.result_for(TRANSCRIPT), one_shot)
+    # Whitespace differences from the editor do not matter
+    assert_same_redaction(redactor.result_for(TRANSCRIPT.replace(" ", "\n ", 3)), one_shot)
+
+
+def test_no_result_for_an_edited_transcript():
+    redactor = IncrementalRedactor(FakeAnalyzer().analyze)
+    for chunk in CHUNKS:
+        redactor.add(chunk)
+    assert redactor.result_for(TRANSCRIPT.replace("John Smith", "Dr John Smith")) is None
+    assert redactor.result_for(TRANSCRIPT + " More.") is None
+
+
+def test_no_result_after_a_failed_chunk():
+    redactor = IncrementalRedactor(FakeAnalyzer(fail_on="555-0100").analyze)
+    redactor.add(CHUNKS[0])
+    with pytest.raises(RuntimeError):
+        redactor.add(CHUNKS[1])
+    redactor.add(CHUNKS[2])
+    assert redactor.result_for(TRANSCRIPT) is None
+
+
+@pytest.fixture
+def notes(monkeypatch, tmp_path):
+    """An LLMService whose PII analyzer is a FakeAnalyzer, set as `notes.analyzer`"""
+    from services.llm_service import LLMService
+    from services.note_cache import NoteCache
+    from services.pii_analyzer import PIIAnalyzer
+
+    monkeypatch.setenv('HOME', str(tmp_path))
+    analyzer = FakeAnalyzer()
+    monkeypatch.setattr(PIIAnalyzer, 'instance', classmethod(lambda cls: analyzer))
+    service = LLMService(backend=SimpleNamespace(identity="stub:model"),
+                         note_cache=NoteCache(str(tmp_path / 'cache')))
+    service.analyzer = analyzer
+    yield service
+    service.note_cache.close()
+
+
+def live_session(notes, chunks):
+    notes.reset_live_redaction()
+    for chunk in chunks:
+        notes.add_live_text(chunk)
+
+
+def test_live_redaction_is_reused_for_the_same_transcript(notes):
+    live_session(notes, CHUNKS)
+    result = notes.redact_transcript(TRANSCRIPT)
+    assert TRANSCRIPT not in notes.analyzer.texts  # No full pass
+    assert_same_redaction(result, redact(TRANSCRIPT, FakeAnalyzer().analyze(TRANSCRIPT)))
+
+
+def test_edited_transcript_gets_a_full_pass(notes):
+    live_session(notes, CHUNKS)
+    edited = TRANSCRIPT.replace("came too", "came along")
+    result = notes.redact_transcript(edited)
+    assert notes.analyzer.texts[-1] == edited
+    assert_same_redaction(result, redact(edited, FakeAnalyzer().analyze(edited)))
+
+
+def test_failed_live_chunk_gets_a_full_pass(notes):
+    notes.analyzer.fail_on = "555-0100"
+    live_session(notes, CHUNKS)
+    result = notes.redact_transcript(TRANSCRIPT)
+    assert notes.analyzer.texts[-1] == TRANSCRIPT
+    assert "555-0100" not in result.text and "Jane" not in result.text
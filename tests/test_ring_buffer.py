@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from utils.ring_buffer import RingBuffer
+
+
+def ramp(start: int, count: int) -> np.ndarray:
+    return np.arange(start, start + count, dtype=np.float32)
+
+
+def test_wrapped_window_is_one_contiguous_view():
+    buffer = RingBuffer(8)
+    buffer.write(ramp(0, 6))
+    buffer.consume(5)
+    buffer.write(ramp(6, 6))  # Wraps past the end of the capacity
+    view = buffer.view()
+    np.testing.assert_array_equal(view, ramp(5, 7))
+    assert view.base is not None  # A view into storage, not a reassembled copy
+
+
+def test_write_overwrites_oldest_when_full():
+    buffer = RingBuffer(5)
+    assert buffer.write(ramp(0, 4)) == 0
+    assert buffer.write(ramp(4, 3)) == 2
+    np.testing.assert_array_equal(buffer.view(), ramp(2, 5))
+
+
+def test_oversized_write_keeps_newest_samples():
+    buffer = RingBuffer(4)
+    buffer.write(ramp(0, 2))
+    assert buffer.write(ramp(2, 10)) == 8
+    np.testing.assert_array_equal(buffer.view(), ramp(8, 4))
+
+
+def test_read_returns_owned_copy():
+    buffer = RingBuffer(4)
+    buffer.write(ramp(0, 4))
+    first = buffer.read(3)
+    buffer.write(ramp(4, 3))
+    np.testing.assert_array_equal(first, ramp(0, 3))
+    np.testing.assert_array_equal(buffer.read(), ramp(3, 4))
+    assert len(buffer) == 0 and buffer.free == 4
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
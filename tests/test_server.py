@@ -0,0 +1,243 @@
+import asyncio
+import io
+import os
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp.test_utils import TestClient, TestServer
+
+from conftest import SAMPLE_RATE
+from server import PipelineServer, ServerJob, create_app
+
+
+class StubTranscriber:
+    """Returns a fixed transcript once `release` is set"""
+
+    def __init__(self, blocked: bool = False):
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+        self.calls = []
+
+    def transcribe(self, audio_data, parallel=True, should_stop=None):
+        self.calls.append({'parallel': parallel})
+        self.release.wait(timeout=10)
+        self.stopped = should_stop()
+        return f"Patient seen for {len(audio_data) / SAMPLE_RATE:.0f} seconds."
+
+
+class StubNotes:
+    note_cache = SimpleNamespace(close=lambda: None)
+    backend = SimpleNamespace(close=lambda: None)
+
+    def redact_transcript(self, transcript):
+        return SimpleNamespace(text=transcript.replace("Patient", "{PERSON_1}"))
+
+    def generate_note(self, transcript, should_stop=None, template=None, redaction=None):
+        return "Note"
+
+
+def wav_bytes(seconds: float = 1.0) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32), SAMPLE_RATE,
+             format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+
+def run_with_client(server: PipelineServer, scenario):
+    async def main():
+        async with TestClient(TestServer(create_app(server))) as client:
+            await scenario(client)
+    asyncio.run(main())
+
+
+def make_server(transcriber=None, **kwargs) -> PipelineServer:
+    return PipelineServer(template_path=None, transcription=transcriber or StubTranscriber(),
+                          notes=StubNotes(), **kwargs)
+
+
+async def upload(client, seconds: float = 1.0):
+    return await client.post('/jobs?filename=visit.wav&note=0', data=wav_bytes(seconds))
+
+
+async def wait_finished(client, location: str) -> dict:
+    for _ in range(200):
+        status = await (await client.get(location)).json()
+        if status['status'] in (ServerJob.DONE, ServerJob.FAILED):
+            return status
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"{location} did not finish")
+
+
+def test_upload_runs_job_to_completion():
+    async def scenario(client):
+        response = await upload(client, seconds=2)
+        assert response.status == 202
+        location = response.headers['Location']
+        assert location == f"/jobs/{(await response.json())['id']}"
+
+        status = await wait_finished(client, location)
+        assert status['status'] == ServerJob.DONE
+        assert await (await client.get(location + '/transcript')).text() == "Patient seen for 2 seconds."
+        assert await (await client.get(location + '/redacted')).text() == "{PERSON_1} seen for 2 seconds."
+        # Note generation was not requested
+        assert (await client.get(location + '/note')).status == 409
+
+    run_with_client(make_server(), scenario)
+
+
+def test_jobs_use_the_shared_model():
+    transcriber = StubTranscriber()
+
+    async def scenario(client):
+        await wait_finished(client, (await upload(client)).headers['Location'])
+        assert transcriber.calls == [{'parallel': False}]
+
+    run_with_client(make_server(transcriber), scenario)
+
+
+def test_results_are_409_until_produced():
+    transcriber = StubTranscriber(blocked=True)
+
+    async def scenario(client):
+        location = (await upload(client)).headers['Location']
+        response = await client.get(location + '/transcript')
+        assert response.status == 409
+        assert (await response.json())['error'] is None
+
+        transcriber.release.set()
+        await wait_finished(client, location)
+        assert (await client.get(location + '/transcript')).status == 200
+
+    run_with_client(make_server(transcriber), scenario)
+
+
+def test_upload_rejected_when_queue_is_full():
+    transcriber = StubTranscriber(blocked=True)
+
+    async def scenario(client):
+        for _ in range(2):
+            assert (await upload(client)).status == 202
+        response = await upload(client)
+        assert response.status == 503
+        assert response.headers['Retry-After'] == '30'
+
+        transcriber.release.set()
+
+    run_with_client(make_server(transcriber, max_queued=2), scenario)
+
+
+async def wait_task(job: ServerJob):
+    await asyncio.wait([job.task], timeout=10)
+    assert job.task.done()
+
+
+def test_delete_stops_running_job_and_removes_upload():
+    transcriber = StubTranscriber(blocked=True)
+    server = make_server(transcriber)
+
+    async def scenario(client):
+        location = (await upload(client)).headers['Location']
+        job = next(iter(server.jobs.values()))
+        upload_path = job.audio_path
+        while not transcriber.calls:
+            await asyncio.sleep(0.01)
+
+        assert (await client.delete(location)).status == 204
+        assert (await client.get(location)).status == 404
+        assert (await client.delete(location)).status == 404
+
+        # The worker thread is told to stop; the upload goes once it has returned
+        transcriber.release.set()
+        await wait_task(job)
+        assert job.task.cancelled()
+        assert transcriber.stopped
+        assert not os.path.exists(upload_path)
+
+    run_with_client(server, scenario)
+
+
+def test_deleted_queued_job_never_starts():
+    transcriber = StubTranscriber(blocked=True)
+    server = make_server(transcriber, concurrency=1)
+
+    async def scenario(client):
+        await upload(client)
+        location = (await upload(client)).headers['Location']
+        queued = server.jobs[location.rsplit('/', 1)[1]]
+        upload_path = queued.audio_path
+
+        assert (await client.delete(location)).status == 204
+        await wait_task(queued)
+        assert not os.path.exists(upload_path)
+        transcriber.release.set()
+        await wait_finished(client, '/jobs/' + next(iter(server.jobs)))
+        assert len(transcriber.calls) == 1
+
+    run_with_client(server, scenario)
+
+
+def test_delete_succeeds_when_upload_cannot_be_removed(monkeypatch):
+    transcriber = StubTranscriber(blocked=True)
+    server = make_server(transcriber)
+
+    def locked(path):
+        raise PermissionError(13, "The process cannot access the file", path)
+
+    async def scenario(client):
+        location = (await upload(client)).headers['Location']
+        job = next(iter(server.jobs.values()))
+        monkeypatch.setattr(os, 'remove', locked)
+
+        assert (await client.delete(location)).status == 204
+        transcriber.release.set()
+        await wait_task(job)
+        assert job.audio_path is None  # Logged and given up on, not raised
+        monkeypatch.undo()
+
+    run_with_client(server, scenario)
+
+
+def test_multipart_upload():
+    async def scenario(client):
+        form = aiohttp.FormData()
+        form.add_field('audio', wav_bytes(2), filename='visit.wav', content_type='audio/wav')
+        response = await client.post('/jobs?note=0', data=form)
+        assert response.status == 202
+        status = await wait_finished(client, response.headers['Location'])
+        assert status['audio_seconds'] == 2
+
+    run_with_client(make_server(), scenario)
+
+
+def test_finished_jobs_pruned_after_ttl():
+    server = make_server(job_ttl=60)
+
+    async def scenario(client):
+        location = (await upload(client)).headers['Location']
+        await wait_finished(client, location)
+        assert server.prune_expired() == 0
+
+        server.job_ttl = 0
+        assert server.prune_expired() == 1
+        assert (await client.get(location)).status == 404
+
+    run_with_client(server, scenario)
+
+
+def test_unfinished_jobs_are_not_pruned():
+    transcriber = StubTranscriber(blocked=True)
+    server = make_server(transcriber, job_ttl=0)
+
+    async def scenario(client):
+        location = (await upload(client)).headers['Location']
+        assert server.prune_expired() == 0
+        assert (await client.get(location)).status == 200
+        transcriber.release.set()
+
+    run_with_client(server, scenario)
@@ -0,0 +1,85 @@
+import numpy as np
+
+from utils.spsc_buffer import SPSCRingBuffer
+
+
+def ramp(start: int, count: int) -> np.ndarray:
+    return np.arange(start, start + count, dtype=np.float32)
+
+
+def test_reads_return_samples_in_order():
+    buffer = SPSCRingBuffer(16)
+    buffer.write(ramp(0, 5))
+    buffer.write(ramp(5, 5))
+    np.testing.assert_array_equal(buffer.read(3), ramp(0, 3))
+    np.testing.assert_array_equal(buffer.read(), ramp(3, 7))
+    assert buffer.available() == 0
+
+
+def test_wraparound_keeps_order():
+    buffer = SPSCRingBuffer(8)
+    expected = 0
+    written = 0
+    # 5-sample writes against an 8-sample ring cross the end on most passes
+    for _ in range(20):
+        assert buffer.write(ramp(written, 5)) == 0
+        written += 5
+        samples = buffer.read()
+        np.testing.assert_array_equal(samples, ramp(expected, len(samples)))
+        expected += len(samples)
+    assert expected == written
+    assert buffer.overruns == 0
+
+
+def test_read_split_across_the_end():
+    buffer = SPSCRingBuffer(8)
+    buffer.write(ramp(0, 6))
+    buffer.read(6)
+    buffer.write(ramp(6, 7))  # Positions 6, 7, then 0-4
+    np.testing.assert_array_equal(buffer.read(), ramp(6, 7))
+
+
+def test_overrun_drops_newest_samples():
+    buffer = SPSCRingBuffer(8)
+    assert buffer.write(ramp(0, 6)) == 0
+    assert buffer.write(ramp(6, 5)) == 3
+    # Unread data is never overwritten; the tail of the second write is lost
+    np.testing.assert_array_equal(buffer.read(), ramp(0, 8))
+    assert buffer.overruns == 3
+    assert buffer.peak_fill == 8
+
+
+def test_drop_accounting_accumulates_until_reset():
+    buffer = SPSCRingBuffer(4)
+    buffer.write(ramp(0, 4))
+    assert buffer.write(ramp(4, 3)) == 3
+    assert buffer.write(ramp(7, 2)) == 2
+    assert buffer.stats()['overruns'] == 5
+
+    buffer.read()
+    assert buffer.write(ramp(9, 2)) == 0
+    assert buffer.overruns == 5
+
+    buffer.reset_stats()
+    assert buffer.stats() == {
+        'capacity': 4, 'available': 2, 'peak_fill': 0, 'overruns': 0, 'empty_polls': 0,
+    }
+
+
+def test_empty_polls_count_only_reads_that_found_nothing():
+    buffer = SPSCRingBuffer(8)
+    assert len(buffer.read()) == 0
+    buffer.write(ramp(0, 3))
+    buffer.read(2)
+    buffer.read()
+    assert len(buffer.read()) == 0
+    assert buffer.empty_polls == 2
+
+
+def test_discard_skips_unread_samples():
+    buffer = SPSCRingBuffer(8)
+    buffer.write(ramp(0, 5))
+    buffer.discard()
+    assert buffer.available() == 0
+    buffer.write(ramp(5, 2))
+    np.testing.assert_array_equal(buffer.read(), ramp(5, 2))
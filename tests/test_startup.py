@@ -0,0 +1,46 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+STARTUP_BUDGET_S = float(os.getenv('STARTUP_BUDGET_S', 2.0))
+
+# Loaded by the background preloader, never on the way to the first window
+HEAVY_MODULES = ('torch', 'whisper', 'presidio_analyzer', 'spacy', 'openai', 'docx')
+
+WINDOW_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from ui.main_window import MainWindow
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+# Taken before the event loop runs, which is when the preloader starts
+loaded = [name for name in {heavy!r} if name in sys.modules]
+app.processEvents()
+print(json.dumps({{'shown': time.perf_counter() - started, 'loaded': loaded}}))
+"""
+
+
+@pytest.fixture(scope='module')
+def startup():
+    """Time to window and heavy modules loaded by then, from a fresh interpreter"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', PYTHONPATH=SRC_DIR, LOG_CONSOLE_LEVEL='ERROR')
+    result = subprocess.run(
+        [sys.executable, '-c', WINDOW_SNIPPET.format(heavy=HEAVY_MODULES)],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_window_shows_within_budget(startup):
+    assert startup['shown'] <= STARTUP_BUDGET_S
+
+
+def test_no_heavy_module_imported_before_window(startup):
+    assert startup['loaded'] == []
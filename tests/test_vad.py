@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from conftest import SAMPLE_RATE, noise, synthetic_speech
+from services.vad import SpeechSegmenter
+
+BLOCK = 4096  # Samples per capture callback
+
+
+def segment(audio: np.ndarray):
+    segmenter = SpeechSegmenter(sample_rate=SAMPLE_RATE)
+    segments = []
+    for start in range(0, len(audio), BLOCK):
+        segments += segmenter.process(audio[start:start + BLOCK])
+    segments += segmenter.flush()
+    return segmenter, segments
+
+
+def seconds(segments) -> float:
+    return sum(len(s) for s in segments) / SAMPLE_RATE
+
+
+@pytest.fixture(scope='module')
+def speech():
+    return synthetic_speech(120)
+
+
+def test_clean_speech_keeps_speech_and_drops_pauses(speech):
+    segmenter, segments = segment(speech + noise(120, -60))
+    stats = segmenter.stats()
+    assert segments
+    assert seconds(segments) > 90
+    assert stats['silence_dropped_seconds'] > 10
+    assert stats['noise_floor_db'] < -50
+
+
+@pytest.mark.parametrize('level_db', [-40, -30])
+def test_noisy_room_raises_the_floor_and_still_drops_pauses(speech, level_db):
+    clean_seconds = seconds(segment(speech + noise(120, -60))[1])
+    segmenter, segments = segment(speech + noise(120, level_db))
+    stats = segmenter.stats()
+    assert stats['noise_floor_db'] == pytest.approx(level_db, abs=2)
+    assert stats['silence_dropped_seconds'] > 10
+    assert seconds(segments) > 0.9 * clean_seconds
+
+
+@pytest.mark.parametrize('level_db', [-60, -40, -30])
+def test_pure_noise_produces_no_segments(level_db):
+    segmenter, segments = segment(noise(60, level_db))
+    assert segments == []
+    assert segmenter.stats()['silence_dropped_seconds'] == pytest.approx(60, abs=0.1)
+
+
+def test_floor_follows_the_room_down_again():
+    segmenter = SpeechSegmenter(sample_rate=SAMPLE_RATE, noise_window_s=4)
+    for audio in (noise(10, -30), noise(10, -60, seed=2)):
+        for start in range(0, len(audio), BLOCK):
+            segmenter.process(audio[start:start + BLOCK])
+    assert segmenter.stats()['noise_floor_db'] == pytest.approx(-60, abs=2)